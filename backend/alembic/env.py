@@ -0,0 +1,38 @@
+# File: alembic/env.py
+from logging.config import fileConfig
+
+from alembic import context
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, pool
+
+load_dotenv(".env")  # DATABASE_URL, as app.main loads it; read when app.db.session is imported
+
+from app.db.base_class import Base
+from app.db.session import DB_URL
+import app.models  # noqa: F401 -- registers every table on Base.metadata
+import app.models.user  # noqa: F401 -- not re-exported by app.models
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# The schema is described by the ORM models; the URL comes from DATABASE_URL like the app's.
+target_metadata = Base.metadata
+
+def run_migrations_offline() -> None:
+    """Emits the migration SQL to stdout (`alembic upgrade head --sql`) instead of running it."""
+    context.configure(url=DB_URL, target_metadata=target_metadata, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    connectable = create_engine(DB_URL, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -1,8 +1,9 @@
 # File: app/api/analytics_router.py
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.services.analytics_service import get_analytics_data
+from app.services.analytics_service import PANELS, get_analytics_data
+from app.services.response_cache_service import cached_response
 from app.core import deps
 from app.models.user import User
 
@@ -12,14 +13,25 @@ router = APIRouter()
 #! CHANGE: The path is now "" instead of "/".
 @router.get("")
 def analytics(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(deps.get_current_active_user),
     time_period: str = Query("6m"), 
-    include_capital_transfers: bool = Query(False)
+    include_capital_transfers: bool = Query(False),
+    # ✅ --- NEW: Comma-separated panel keys (e.g. "overview,transactionHeatmap"); omit for all ---
+    panels: str | None = Query(None)
 ):
-    return get_analytics_data(
+    selected = None
+    if panels:
+        selected = tuple(sorted({panel.strip() for panel in panels.split(",") if panel.strip()})) or None
+        unknown = [panel for panel in selected or () if panel not in PANELS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown analytics panels: {', '.join(unknown)}. Valid panels: {', '.join(PANELS)}.")
+    params = {"time_period": time_period, "include_capital_transfers": include_capital_transfers, "panels": selected}
+    return cached_response(current_user, "analytics", params, lambda: get_analytics_data(
         db, 
         time_period=time_period, 
         include_capital_transfers=include_capital_transfers,
-        user_id=current_user.id
-    )
\ No newline at end of file
+        user_id=current_user.id,
+        panels=selected
+    ), headers=response.headers)
\ No newline at end of file
@@ -1,5 +1,6 @@
 # File: app/api/api_router.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from app.core import deps
 from . import (
     account_router, alert_router, analytics_router, budget_plan_router,
     category_router, dashboard_router, goal_router, merchant_router,
@@ -17,27 +18,31 @@ api_router = APIRouter(redirect_slashes=False)
 # ###########################################################################
 
 
+# ✅ --- NEW: GETs on these routers carry an ETag from the user's data version and answer a
+# matching If-None-Match with 304 (upload job status changes without a write, so it isn't) ---
+conditional_get = [Depends(deps.check_etag)]
+
 # --- Include all other routers as before ---
 
 # Authentication and User Routes
 api_router.include_router(auth_router.router, prefix="/auth")
-api_router.include_router(users_router.router, prefix="/users")
+api_router.include_router(users_router.router, prefix="/users", dependencies=conditional_get)
 
 # Application-Specific, Screen-Based Endpoints
-api_router.include_router(dashboard_router.router, prefix="/dashboard")
-api_router.include_router(budget_plan_router.router, prefix="/budgets")
-api_router.include_router(analytics_router.router, prefix="/analytics")
+api_router.include_router(dashboard_router.router, prefix="/dashboard", dependencies=conditional_get)
+api_router.include_router(budget_plan_router.router, prefix="/budgets", dependencies=conditional_get)
+api_router.include_router(analytics_router.router, prefix="/analytics", dependencies=conditional_get)
 api_router.include_router(upload_router.router, prefix="/settings")
 
 # Core CRUD Endpoints for Individual Resources
-api_router.include_router(transaction_router.router, prefix="/transactions")
-api_router.include_router(account_router.router, prefix="/accounts")
-api_router.include_router(category_router.router, prefix="/categories")
-api_router.include_router(merchant_router.router, prefix="/merchants")
-api_router.include_router(goal_router.router, prefix="/goals")
-api_router.include_router(tag_router.router, prefix="/tags")
-api_router.include_router(transaction_tag_router.router, prefix="/transaction-tags")
-api_router.include_router(alert_router.router, prefix="/alerts")
+api_router.include_router(transaction_router.router, prefix="/transactions", dependencies=conditional_get)
+api_router.include_router(account_router.router, prefix="/accounts", dependencies=conditional_get)
+api_router.include_router(category_router.router, prefix="/categories", dependencies=conditional_get)
+api_router.include_router(merchant_router.router, prefix="/merchants", dependencies=conditional_get)
+api_router.include_router(goal_router.router, prefix="/goals", dependencies=conditional_get)
+api_router.include_router(tag_router.router, prefix="/tags", dependencies=conditional_get)
+api_router.include_router(transaction_tag_router.router, prefix="/transaction-tags", dependencies=conditional_get)
+api_router.include_router(alert_router.router, prefix="/alerts", dependencies=conditional_get)
 
 # Utility Endpoints
 api_router.include_router(test_router.router, prefix="/test")
\ No newline at end of file
@@ -1,8 +1,10 @@
 # File: app/api/budget_plan_router.py
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.services.budget_plan_service import get_budget_plan, update_budget_plan, delete_budget_plan
+from app.services.budget_plan_service import SUGGESTION_STATISTIC, SUGGESTION_WINDOW, get_budget_plan, update_budget_plan, delete_budget_plan
+from app.services.category_average_service import ROLLING_WINDOWS, STATISTICS
+from app.services.response_cache_service import cached_response
 from app.schemas.budget_plan_schema import BudgetPlanUpdate
 from app.core import deps #! NEW: Import dependencies
 from app.models.user import User #! NEW: Import User model for type hint
@@ -12,11 +14,22 @@ router = APIRouter()
 #! CHANGE: Add dependency to all routes
 @router.get("/plan")
 def get_user_budget_plan(
+    response: Response,
     month: str = Query(..., description="Month in YYYY-MM format"), 
     db: Session = Depends(get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    current_user: User = Depends(deps.get_current_active_user),
+    # ✅ --- NEW: How the empty state suggests budgets: months looked back and average or median ---
+    window: int = Query(SUGGESTION_WINDOW),
+    statistic: str = Query(SUGGESTION_STATISTIC)
 ):
-    return get_budget_plan(db, month=month, user_id=current_user.id)
+    if window not in ROLLING_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"Unsupported window: {window}. Valid windows: {', '.join(map(str, ROLLING_WINDOWS))}.")
+    if statistic not in STATISTICS:
+        raise HTTPException(status_code=400, detail=f"Unknown statistic: {statistic}. Valid statistics: {', '.join(STATISTICS)}.")
+    params = {"month": month, "window": window, "statistic": statistic}
+    return cached_response(current_user, "budget_plan", params, lambda: get_budget_plan(
+        db, month=month, user_id=current_user.id, window=window, statistic=statistic
+    ), headers=response.headers)
 
 @router.post("/plan")
 def save_user_budget_plan(
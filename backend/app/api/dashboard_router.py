@@ -1,8 +1,9 @@
 # File: app/api/dashboard_router.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.services.dashboard_service import get_dashboard_data
+from app.services.response_cache_service import cached_response
 from app.core import deps
 from app.models.user import User
 
@@ -13,7 +14,9 @@ router = APIRouter()
 @router.get("")
 def dashboard(
     month: str, 
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(deps.get_current_active_user)
 ):
-    return get_dashboard_data(db, month=month, user_id=current_user.id)
\ No newline at end of file
+    return cached_response(current_user, "dashboard", {"month": month},
+                           lambda: get_dashboard_data(db, month=month, user_id=current_user.id), headers=response.headers)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.db.dependency import get_db
+from app.services.response_cache_service import RESPONSE_CACHE_MAX_BYTES, response_cache
 
 router = APIRouter()
 
@@ -8,3 +9,9 @@ router = APIRouter()
 def test_db_connection(db: Session = Depends(get_db)):
     # Just testing if session is working
     return {"db_status": "Connection successful!"}
+
+# ✅ --- NEW: Response cache metrics of this worker process ---
+@router.get("/cache-stats")
+def response_cache_stats():
+    # Counts only, no user data; each worker process has its own cache and counters.
+    return {"enabled": RESPONSE_CACHE_MAX_BYTES > 0, **response_cache.stats()}
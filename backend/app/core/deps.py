@@ -1,5 +1,5 @@
 # File: app/core/deps.py
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
@@ -8,6 +8,7 @@ from app.db.session import get_db
 from app.models.user import User
 from app.crud import user_crud
 from app.core.security import SECRET_KEY, ALGORITHM
+from app.services.response_cache_service import data_etag, etag_matches
 
 # This is the central definition of our security scheme.
 # It tells FastAPI where to look for the token.
@@ -37,4 +38,22 @@ def get_current_active_user(
     user = user_crud.get_user_by_email(db, email=email)
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    return user
+
+#! NEW: Conditional GETs for the read endpoints
+def check_etag(
+    request: Request, response: Response, current_user: User = Depends(get_current_active_user)
+):
+    """
+    Router-level dependency. For a GET it tags the response with an ETag derived from the
+    user's data version and the URL, and answers a matching If-None-Match with 304 before the
+    endpoint runs. `no-cache` makes the browser revalidate every time instead of reusing the
+    body blindly. Endpoints that return a Response themselves must pass on `response.headers`.
+    """
+    if request.method != "GET":
+        return
+    etag = data_etag(current_user, request.url.path, request.query_params.multi_items())
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
@@ -2,6 +2,7 @@
 from sqlalchemy.orm import Session
 from app.models.account import Account
 from app.schemas.account_schema import AccountCreate, AccountUpdate
+from app.services.response_cache_service import bump_data_version
 
 #! CHANGE: All functions now require a user_id
 def get_all_accounts(db: Session, user_id: int):
@@ -11,6 +12,7 @@ def create_account(db: Session, account_in: AccountCreate, user_id: int):
     # Automatically assign the account to the current user
     account = Account(**account_in.model_dump(), user_id=user_id)
     db.add(account)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(account)
     return account
@@ -23,6 +25,7 @@ def update_account(db: Session, account_id: int, account_in: AccountUpdate, user
     account_data = account_in.model_dump(exclude_unset=True)
     for key, value in account_data.items():
         setattr(account, key, value)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(account)
     return account
@@ -32,5 +35,6 @@ def delete_account(db: Session, account_id: int, user_id: int):
     account = db.query(Account).filter(Account.id == account_id, Account.user_id == user_id).first()
     if account:
         db.delete(account)
+        bump_data_version(db, user_id)
         db.commit()
     return account
\ No newline at end of file
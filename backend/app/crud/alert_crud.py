@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session, joinedload
 from app.schemas.alert_schema import AlertCreate
 from fastapi import HTTPException
 from datetime import datetime
+from app.services.response_cache_service import bump_data_version
 
 # ✅ THIS IS THE FIX: Import Alert and Goal from their correct, separate model files.
 from app.models.alert import Alert
@@ -27,6 +28,7 @@ def create_alert(db: Session, alert_in: dict, user_id: int):
 
     alert = Alert(**alert_in, user_id=user_id, triggered_at=datetime.utcnow(), type='budget')
     db.add(alert)
+    bump_data_version(db, user_id)
     return alert
 
 def create_new_category_alert(db: Session, user_id: int, category_name: str):
@@ -43,6 +45,7 @@ def create_new_category_alert(db: Session, user_id: int, category_name: str):
 
     alert = Alert(user_id=user_id, type='new_category', context={"category_name": category_name}, triggered_at=datetime.utcnow())
     db.add(alert)
+    bump_data_version(db, user_id)
     return alert
 
 def get_unread_alerts(db: Session, user_id: int):
@@ -55,6 +58,7 @@ def acknowledge_alert(db: Session, alert_id: int, user_id: int):
     alert = db.query(Alert).filter(Alert.id == alert_id, Alert.user_id == user_id).first()
     if alert:
         alert.is_acknowledged = True
+        bump_data_version(db, user_id)
         db.commit()
         db.refresh(alert)
     return alert
\ No newline at end of file
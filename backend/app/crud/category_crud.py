@@ -3,6 +3,9 @@ from sqlalchemy.orm import Session
 from app.models.category import Category
 from app.models.transaction import Transaction
 from app.schemas.category_schema import CategoryCreate, CategoryUpdate
+from app.services.categorization_service import invalidate_category_matcher
+from app.services import month_snapshot_service, spend_rollup_service
+from app.services.response_cache_service import bump_data_version
 from fastapi import HTTPException
 
 #! CHANGE: All functions now require a user_id
@@ -23,8 +26,12 @@ def create_category(db: Session, category_in: CategoryCreate, user_id: int):
     # Automatically assign the category to the current user
     category = Category(**category_in.model_dump(), user_id=user_id)
     db.add(category)
+    # Every month's budget plan lists the user's categories.
+    month_snapshot_service.invalidate_snapshots(db, user_id)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(category)
+    invalidate_category_matcher(user_id)
     return category
 
 def update_category(db: Session, category_id: int, category_in: CategoryUpdate, user_id: int):
@@ -48,8 +55,12 @@ def update_category(db: Session, category_id: int, category_in: CategoryUpdate,
     for key, value in update_data.items():
         setattr(category, key, value)
     
+    # Names and icons are part of every snapshot.
+    month_snapshot_service.invalidate_snapshots(db, user_id)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(category)
+    invalidate_category_matcher(user_id)
     return category
 
 def delete_category(db: Session, category_id: int, user_id: int):
@@ -61,6 +72,9 @@ def delete_category(db: Session, category_id: int, user_id: int):
             Transaction.category_id == category_id, 
             Transaction.user_id == user_id
         ).update({Transaction.category_id: None}, synchronize_session=False)
+        spend_rollup_service.refresh_daily_spend(db, user_id)
         db.delete(category)
+        bump_data_version(db, user_id)
         db.commit()
+        invalidate_category_matcher(user_id)
     return category
\ No newline at end of file
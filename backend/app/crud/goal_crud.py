@@ -1,48 +1,63 @@
 # File: app/crud/goal_crud.py
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models.goal import Goal
 from app.models.category import Category
 from app.schemas.goal_schema import GoalCreate, GoalUpdate
+from app.services.response_cache_service import bump_data_version
+from app.services import alert_service, month_snapshot_service
+from datetime import datetime
 from fastapi import HTTPException
 
+def _invalidate_month(db: Session, month: str, user_id: int):
+    """Budgets only feed the snapshot of their own month."""
+    month_start = datetime.strptime(month, "%Y-%m").date()
+    month_snapshot_service.invalidate_snapshots(db, user_id, month_start, month_start, months_after=0)
+
 #! CHANGE: All functions now require a user_id for scoping
-def upsert_budget_for_category(db: Session, category_id: int, month: str, limit_amount: float, user_id: int):
+def upsert_budgets(db: Session, month: str, limits: dict, user_id: int):
     """
-    Finds a goal for a given category and month FOR A SPECIFIC USER.
-    - If it exists, it updates the limit_amount.
-    - If the new limit_amount is 0, it deletes the goal.
-    - If it does not exist and the limit_amount is > 0, it creates a new goal.
+    Sets the user's budgets for `month` from {category_id: limit_amount} in a fixed number of
+    statements, whatever the number of categories:
+    - One query checks that every category belongs to the user.
+    - One INSERT ... ON CONFLICT creates or updates the budgets with a limit_amount > 0.
+    - One DELETE removes those set to 0.
     """
-    # Validate that the category belongs to the user
-    category = db.query(Category).filter(Category.id == category_id, Category.user_id == user_id).first()
-    if not category:
+    if not limits:
+        return
+    owned = db.query(func.count(Category.id)).filter(Category.id.in_(limits), Category.user_id == user_id).scalar()
+    if owned != len(limits):
         raise HTTPException(status_code=404, detail="Category not found for the current user.")
 
-    # Scope the goal search to the current user
-    existing_goal = db.query(Goal).filter(
-        Goal.category_id == category_id,
-        Goal.month == month,
-        Goal.user_id == user_id
-    ).first()
-
-    if existing_goal:
-        if limit_amount > 0:
-            existing_goal.limit_amount = limit_amount
-        else:
-            db.delete(existing_goal)
-    elif limit_amount > 0:
-        new_goal = Goal(
-            category_id=category_id, 
-            month=month, 
-            limit_amount=limit_amount,
-            user_id=user_id # Assign to the current user
+    rows = [{"category_id": category_id, "month": month, "limit_amount": limit_amount, "user_id": user_id}
+            for category_id, limit_amount in limits.items() if limit_amount > 0]
+    if rows:
+        stmt = pg_insert(Goal)
+        stmt = stmt.on_conflict_do_update(
+            constraint="_goal_user_month_category_uc",
+            set_={"limit_amount": stmt.excluded.limit_amount, "updated_at": func.now()},
         )
-        db.add(new_goal)
+        # RETURNING with populate_existing refreshes Goal objects already loaded in the session.
+        db.scalars(stmt.returning(Goal), rows, execution_options={"populate_existing": True}).all()
+    zeroed = [category_id for category_id, limit_amount in limits.items() if limit_amount <= 0]
+    if zeroed:
+        db.query(Goal).filter(Goal.user_id == user_id, Goal.month == month, Goal.category_id.in_(zeroed)).delete()
+    _invalidate_month(db, month, user_id)
+    bump_data_version(db, user_id)
     # The commit is handled by the calling service/router.
 
+def upsert_budget_for_category(db: Session, category_id: int, month: str, limit_amount: float, user_id: int):
+    """
+    Sets one category's budget FOR A SPECIFIC USER: creates or updates it, or deletes it
+    when the new limit_amount is 0.
+    """
+    upsert_budgets(db, month, {category_id: limit_amount}, user_id)
+
 def create_goal(db: Session, goal_in: GoalCreate, user_id: int):
     # Pass user_id to the core upsert logic
     upsert_budget_for_category(db, goal_in.category_id, goal_in.month, goal_in.limit_amount, user_id)
+    alert_service.evaluate_budget_alerts(db, user_id, datetime.strptime(goal_in.month, "%Y-%m").date())
     # Since upsert doesn't return the object, we can refetch it or just return a success message.
     # For consistency with the service, let's assume the calling function will handle the response.
     # The router might refetch or return the input.
@@ -75,8 +90,14 @@ def update_goal(db: Session, goal_id: int, goal_in: GoalUpdate, user_id: int):
     if not goal:
         return None # Return None to indicate not found
     
+    if goal_in.limit_amount <= 0:
+        # A zero limit deletes the budget; like `delete_goal`, return the deleted goal.
+        goal.category # Loaded now, so the response can still serialize it once the goal is gone
     # Use the consistent upsert logic to perform the update
     upsert_budget_for_category(db, goal.category_id, goal.month, goal_in.limit_amount, user_id)
+    alert_service.evaluate_budget_alerts(db, user_id, datetime.strptime(goal.month, "%Y-%m").date())
+    if goal_in.limit_amount <= 0:
+        return goal
     db.refresh(goal) # Refresh the instance to get latest data (like updated_at)
     return goal
 
@@ -86,6 +107,8 @@ def delete_goal(db: Session, goal_id: int, user_id: int):
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found.")
     db.delete(goal)
+    _invalidate_month(db, goal.month, user_id)
+    bump_data_version(db, user_id)
     db.commit()
     return goal # Return the deleted object for confirmation
 
@@ -97,5 +120,7 @@ def delete_goals_by_month(db: Session, month: str, user_id: int):
         Goal.month == month,
         Goal.user_id == user_id
     ).delete(synchronize_session=False)
+    _invalidate_month(db, month, user_id)
+    bump_data_version(db, user_id)
     db.commit()
     return num_deleted
\ No newline at end of file
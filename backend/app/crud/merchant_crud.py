@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.models.merchant import Merchant
 from app.models.category import Category
 from app.schemas.merchant_schema import MerchantCreate, MerchantUpdate
+from app.services.response_cache_service import bump_data_version
 from fastapi import HTTPException
 
 #! CHANGE: All functions now require a user_id
@@ -27,6 +28,7 @@ def create_merchant(db: Session, merchant_in: MerchantCreate, user_id: int):
     # Assign the new merchant to the current user
     merchant = Merchant(**merchant_in.model_dump(), user_id=user_id)
     db.add(merchant)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(merchant)
     return merchant
@@ -65,6 +67,7 @@ def update_merchant(db: Session, merchant_id: int, merchant_in: MerchantUpdate,
     # Update the merchant data
     merchant.name = merchant_in.name
     merchant.category_id = merchant_in.category_id
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(merchant)
     return merchant
@@ -77,5 +80,6 @@ def delete_merchant(db: Session, merchant_id: int, user_id: int):
     ).first()
     if merchant:
         db.delete(merchant)
+        bump_data_version(db, user_id)
         db.commit()
     return merchant
\ No newline at end of file
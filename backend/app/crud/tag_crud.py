@@ -2,6 +2,8 @@
 from sqlalchemy.orm import Session
 from app.models.tag import Tag
 from app.schemas.tag_schema import TagCreate, TagUpdate
+from app.services import spend_rollup_service
+from app.services.response_cache_service import bump_data_version
 from fastapi import HTTPException
 
 #! CHANGE: All functions now require a user_id
@@ -23,6 +25,7 @@ def create_tag(db: Session, tag_in: TagCreate, user_id: int):
     # Assign the tag to the current user
     tag = Tag(**tag_in.model_dump(), user_id=user_id)
     db.add(tag)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(tag)
     return tag
@@ -39,7 +42,12 @@ def update_tag(db: Session, tag_id: int, tag_in: TagUpdate, user_id: int):
         if existing:
             raise ValueError(f"You already have a tag named '{tag_in.name}'.")
 
+    renamed_exclusion = spend_rollup_service.EXCLUDE_TAG_NAME in (tag.name, tag_in.name) and tag.name != tag_in.name
     tag.name = tag_in.name
+    if renamed_exclusion:
+        spend_rollup_service.refresh_excluded_flags(db, user_id)
+        spend_rollup_service.refresh_daily_spend(db, user_id)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(tag)
     return tag
@@ -53,5 +61,9 @@ def delete_tag(db: Session, tag_id: int, user_id: int):
     # Deleting the tag will automatically delete the TransactionTag mappings
     # because of the `cascade="all, delete-orphan"` setting in the Tag model.
     db.delete(tag)
+    if tag.name == spend_rollup_service.EXCLUDE_TAG_NAME:
+        spend_rollup_service.refresh_excluded_flags(db, user_id)
+        spend_rollup_service.refresh_daily_spend(db, user_id)
+    bump_data_version(db, user_id)
     db.commit()
     return tag
\ No newline at end of file
@@ -1,7 +1,5 @@
 # File: app/crud/transaction_crud.py
 from sqlalchemy.orm import Session
-import re
-from thefuzz import process as fuzzy_process
 
 from app.models.transaction import Transaction
 from app.models.tag import Tag
@@ -9,8 +7,11 @@ from app.models.account import Account
 from app.models.category import Category
 from app.models.transaction_tag import TransactionTag
 from app.schemas.transaction_schema import TransactionCreate, TransactionUpdate
-from app.services.alert_service import check_and_create_budget_alerts
+from app.services.alert_service import evaluate_budget_alerts
 from app.crud import alert_crud
+from app.services.categorization_service import REMARK_PATTERN, get_category_matcher
+from app.services import ingest_history_service, spend_rollup_service
+from app.services.response_cache_service import bump_data_version
 from fastapi import HTTPException
 
 # ✅ --- NEW HELPER FUNCTION ---
@@ -19,32 +20,19 @@ def _get_smart_category(db: Session, description: str, user_id: int):
     """
     Analyzes a transaction description to find a category ID.
     - Parses remarks like /category/.
-    - Uses fuzzy matching and aliases.
+    - Uses fuzzy matching and aliases (via the user's cached category matcher).
     - Creates alerts for new, unrecognized categories.
     """
-    CATEGORY_ALIASES = { "miscellaneous": ["misc", "miscelleaneous"], "entertainment": ["ent"], "transportation": ["transport"] }
-    
-    user_categories_db = db.query(Category).filter(Category.user_id == user_id).all()
-    user_categories_map = {cat.id: cat.name for cat in user_categories_db}
-
-    choices = {}
-    for cat_id, cat_name in user_categories_map.items():
-        cat_name_lower = cat_name.lower()
-        choices[cat_name_lower] = cat_id
-        if cat_name_lower in CATEGORY_ALIASES:
-            for alias in CATEGORY_ALIASES[cat_name_lower]:
-                choices[alias] = cat_id
-
-    remark_match = re.search(r'/([^/]+)/', description, re.IGNORECASE)
-    if remark_match:
-        user_remark = remark_match.group(1).lower().strip()
-        best_match = fuzzy_process.extractOne(user_remark, choices.keys())
-        
-        if best_match and best_match[1] >= 85:
-            return choices[best_match[0]]
-        else:
-            alert_crud.create_new_category_alert(db, user_id=user_id, category_name=user_remark.title())
-            
+    remark_match = REMARK_PATTERN.search(description)
+    if not remark_match:
+        return None
+
+    user_categories_map = dict(db.query(Category.id, Category.name).filter(Category.user_id == user_id).all())
+    user_remark = remark_match.group(1)
+    matched_id = get_category_matcher(user_id, user_categories_map).match(user_remark)
+    if matched_id:
+        return matched_id
+    alert_crud.create_new_category_alert(db, user_id=user_id, category_name=user_remark.lower().strip().title())
     return None
 
 
@@ -68,14 +56,16 @@ def create_transaction(db: Session, txn_in: TransactionCreate, user_id: int):
             raise HTTPException(status_code=400, detail="One or more tags are invalid or do not belong to the user.")
         for tag in tags:
             txn.tags_association.append(TransactionTag(tag=tag, user_id=user_id))
+        txn.excluded = spend_rollup_service.is_excluded(tags)
             
     db.add(txn)
+    spend_rollup_service.refresh_days(db, user_id, [txn.txn_date])
+    #! CHANGE: Budget alerts are evaluated in the write's own transaction
+    evaluate_budget_alerts(db, user_id, txn.txn_date)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(txn)
 
-    check_and_create_budget_alerts(db, user_id, txn)
-    db.commit() 
-
     return txn
 
 def update_transaction(db: Session, txn_id: int, txn_in: TransactionUpdate, user_id: int):
@@ -84,6 +74,7 @@ def update_transaction(db: Session, txn_id: int, txn_in: TransactionUpdate, user
         return None
 
     update_data = txn_in.model_dump(exclude_unset=True)
+    previous_date = txn.txn_date
     
     if "category_id" in update_data and update_data["category_id"] is None:
         description = update_data.get("description", txn.description)
@@ -97,6 +88,7 @@ def update_transaction(db: Session, txn_id: int, txn_in: TransactionUpdate, user
 
     if "tag_ids" in update_data:
         txn.tags_association = []
+        txn.excluded = False
         db.flush()
         if update_data["tag_ids"]:
             tags = db.query(Tag).filter(Tag.id.in_(update_data["tag_ids"]), Tag.user_id == user_id).all()
@@ -104,13 +96,15 @@ def update_transaction(db: Session, txn_id: int, txn_in: TransactionUpdate, user
                 raise HTTPException(status_code=400, detail="One or more tags are invalid or do not belong to the user.")
             for tag in tags:
                 txn.tags_association.append(TransactionTag(tag=tag, user_id=user_id))
+            txn.excluded = spend_rollup_service.is_excluded(tags)
 
+    spend_rollup_service.refresh_days(db, user_id, [previous_date, txn.txn_date])
+    # Spend can only have grown in the month the row is now in.
+    evaluate_budget_alerts(db, user_id, txn.txn_date)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(txn)
 
-    check_and_create_budget_alerts(db, user_id, txn)
-    db.commit()
-
     return txn
 
 def get_transaction_by_id(db: Session, txn_id: int, user_id: int):
@@ -119,6 +113,10 @@ def get_transaction_by_id(db: Session, txn_id: int, user_id: int):
 def delete_transaction(db: Session, txn_id: int, user_id: int):
     txn = db.query(Transaction).filter(Transaction.id == txn_id, Transaction.user_id == user_id).first()
     if txn:
+        # An imported row must come back if its statement is uploaded again.
+        ingest_history_service.forget_ingested_range(db, user_id, txn.account_id, txn.source, txn.txn_date)
         db.delete(txn)
+        spend_rollup_service.refresh_days(db, user_id, [txn.txn_date])
+        bump_data_version(db, user_id)
         db.commit()
     return txn
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlalchemy import text
+from app.db.session import engine
+
+def add_user_data_version():
+    """
+    Adds the `users.data_version` counter the response cache is keyed on.
+    Safe to run more than once.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS data_version INTEGER NOT NULL DEFAULT 0"))
+    print("users.data_version is in place.")
+
+if __name__ == "__main__":
+    add_user_data_version()
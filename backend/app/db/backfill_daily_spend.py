@@ -0,0 +1,28 @@
+from app.db.session import SessionLocal, engine
+from app.models.daily_spend import DailySpend
+from app.models.category_spend_average import CategorySpendAverage
+from app.models.monthly_spend import MonthlySpend
+from app.models.user import User
+from app.services.spend_rollup_service import refresh_daily_spend
+
+def backfill_daily_spend():
+    """
+    Creates the `daily_spend` rollup table if needed and rebuilds it for every user from
+    `transactions`, along with `monthly_spend` and `category_spend_averages`. Safe to run more than once; each
+    user is rebuilt in its own transaction.
+    """
+    DailySpend.__table__.create(bind=engine, checkfirst=True)
+    MonthlySpend.__table__.create(bind=engine, checkfirst=True)
+    CategorySpendAverage.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id).all()]
+        for user_id in user_ids:
+            refresh_daily_spend(db, user_id)
+            db.commit()
+        print(f"Rebuilt daily_spend for {len(user_ids)} users.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_daily_spend()
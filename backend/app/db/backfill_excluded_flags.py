@@ -0,0 +1,26 @@
+from sqlalchemy import text
+from app.db.session import SessionLocal, engine
+from app.models.user import User
+from app.services.spend_rollup_service import refresh_excluded_flags
+
+def backfill_excluded_flags():
+    """
+    Adds `transactions.excluded` and its index if needed and sets the flag on every row
+    tagged "Exclude from Analytics". Safe to run more than once; each user is updated in
+    its own transaction. `daily_spend` already splits on the same tag, so it is left as is.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS excluded BOOLEAN NOT NULL DEFAULT false"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_transactions_user_excluded_date ON transactions (user_id, excluded, txn_date)"))
+    db = SessionLocal()
+    try:
+        user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id).all()]
+        for user_id in user_ids:
+            refresh_excluded_flags(db, user_id)
+            db.commit()
+        print(f"Set transactions.excluded for {len(user_ids)} users.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_excluded_flags()
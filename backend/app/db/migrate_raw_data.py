@@ -0,0 +1,31 @@
+from sqlalchemy import inspect, text
+from app.db.session import engine
+from app.models.transaction_raw_data import TransactionRawData
+
+def migrate_raw_data():
+    """
+    Moves `transactions.raw_data` into the `transaction_raw_data` side table.
+    Safe to run more than once; does nothing when the column is already gone.
+    """
+    TransactionRawData.__table__.create(bind=engine, checkfirst=True)
+    columns = {c["name"] for c in inspect(engine).get_columns("transactions")}
+    if "raw_data" not in columns:
+        print("transactions.raw_data already migrated.")
+        return
+
+    with engine.begin() as conn:
+        moved = conn.execute(text(
+            "INSERT INTO transaction_raw_data (transaction_id, data) "
+            "SELECT id, raw_data::jsonb FROM transactions WHERE raw_data IS NOT NULL "
+            "ON CONFLICT (transaction_id) DO NOTHING"
+        )).rowcount
+        conn.execute(text("ALTER TABLE transactions DROP COLUMN raw_data"))
+    print(f"Moved raw_data of {moved} transactions to transaction_raw_data.")
+
+    # Dropping a column doesn't shrink the table; rewrite it to reclaim the space.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM FULL ANALYZE transactions"))
+    print("Rewrote the transactions table.")
+
+if __name__ == "__main__":
+    migrate_raw_data()
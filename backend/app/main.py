@@ -1,14 +1,29 @@
 # File: app/main.py
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api_router import api_router
+from app.services import alert_sweep_service, upload_job_service
 from dotenv import load_dotenv
 
 # Load a standard .env file for consistency. Render will use its own environment variables.
 load_dotenv(".env")
 
-app = FastAPI(title="Personal Finance Tracker API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick up statement uploads that were still queued or in progress when the server stopped.
+    try:
+        upload_job_service.resume_pending_upload_jobs()
+    except Exception as e:
+        print(f"Could not resume pending upload jobs. Error: {e}")
+    upload_job_service.start_upload_job_watchdog()
+    alert_sweep_service.start_budget_alert_sweep()
+    yield
+    alert_sweep_service.stop_budget_alert_sweep()
+    upload_job_service.stop_upload_job_watchdog()
+
+app = FastAPI(title="Personal Finance Tracker API", lifespan=lifespan)
 
 # ✅ --- THIS IS THE CRITICAL FIX ---
 # This list defines which frontend URLs are allowed to make requests to your API.
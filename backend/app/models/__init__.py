@@ -1,8 +1,15 @@
 from .account import Account
 from .category import Category
 from .transaction import Transaction
+from .transaction_raw_data import TransactionRawData
 from .transaction_tag import TransactionTag
 from .merchant import Merchant
 from .goal import Goal
 from .tag import Tag
 from .alert import Alert
+from .upload_job import UploadJob, UploadJobFile
+from .ingested_range import IngestedRange
+from .daily_spend import DailySpend
+from .month_snapshot import MonthSnapshot
+from .category_spend_average import CategorySpendAverage
+from .monthly_spend import MonthlySpend
@@ -1,5 +1,5 @@
 # File: app/models/alert.py
-from sqlalchemy import Column, Integer, ForeignKey, Boolean, DateTime, Numeric, String
+from sqlalchemy import Column, Integer, ForeignKey, Boolean, DateTime, Numeric, String, Index
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -25,4 +25,7 @@ class Alert(Base):
     is_acknowledged = Column(Boolean, default=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
-    goal = relationship("Goal")
\ No newline at end of file
+    goal = relationship("Goal")
+
+    # Budget alert de-duplication looks up (user, goal, threshold).
+    __table_args__ = (Index('ix_alerts_user_goal_threshold', 'user_id', 'goal_id', 'threshold_percentage'),)
\ No newline at end of file
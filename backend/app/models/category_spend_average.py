@@ -0,0 +1,34 @@
+# File: app/models/category_spend_average.py
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
+from app.db.base_class import Base
+
+class CategorySpendAverage(Base):
+    """
+    A category's debit spend as seen from `month` (NULL category: uncategorized spend), for the
+    budget suggestions: the month's own total, the totals of the 12 months before it and their
+    rolling 3/6/12-month averages and medians. One row per category with spend in the month or
+    the 12 before it. Rebuilt by `category_average_service` whenever `daily_spend` is, so a
+    month's suggestions are one lookup on the unique key.
+    """
+    __tablename__ = "category_spend_averages"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    month = Column(Date, nullable=False) # First day of the month
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+
+    month_total = Column(Float, nullable=True) # NULL if the month has no spend in the category
+    # Totals of the 12 months before `month`, most recent first; NULL for a month without spend.
+    history = Column(ARRAY(Float), nullable=False)
+    # Over the last 3/6/12 months of `history`, months without spend counting as 0.
+    average_3 = Column(Float, nullable=False)
+    average_6 = Column(Float, nullable=False)
+    average_12 = Column(Float, nullable=False)
+    median_3 = Column(Float, nullable=False)
+    median_6 = Column(Float, nullable=False)
+    median_12 = Column(Float, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'month', 'category_id', name='_category_spend_average_key_uc'),
+    )
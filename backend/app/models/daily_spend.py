@@ -0,0 +1,32 @@
+# File: app/models/daily_spend.py
+from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, UniqueConstraint, Index
+from app.db.base_class import Base
+
+class DailySpend(Base):
+    """
+    Transactions rolled up per (user, day, category, type, excluded). `excluded` copies
+    `Transaction.excluded` (tagged "Exclude from Analytics"). Dashboard, analytics and budget totals are read from
+    here, so they cost one row per day and category instead of one per transaction.
+    Maintained by `spend_rollup_service` in the same transaction as every write.
+    """
+    __tablename__ = "daily_spend"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    type = Column(String, nullable=False)
+    excluded = Column(Boolean, nullable=False, default=False)
+
+    total = Column(Float, nullable=False, default=0)
+    txn_count = Column(Integer, nullable=False, default=0)
+    # Split of `total` into transactions under / at or over SMALL_SPEND_LIMIT.
+    small_total = Column(Float, nullable=False, default=0)
+    large_total = Column(Float, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'day', 'category_id', 'type', 'excluded', name='_daily_spend_key_uc'),
+        # Every reader filters (user, 'debit', not excluded, day range); covering, so they are index-only.
+        Index('ix_daily_spend_user_type_day', 'user_id', 'type', 'excluded', 'day',
+              postgresql_include=['category_id', 'total', 'txn_count', 'small_total', 'large_total']),
+    )
@@ -1,5 +1,5 @@
 # File: app/models/goal.py
-from sqlalchemy import Column, Integer, ForeignKey, String, Numeric, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, String, Numeric, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -19,4 +19,10 @@ class Goal(Base):
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     
-    category = relationship("Category", back_populates="goals")
\ No newline at end of file
+    category = relationship("Category", back_populates="goals")
+
+    __table_args__ = (
+        # One budget per category and month; the target of the budget plan's bulk upsert. Month
+        # second, so it also serves the (user, month) lookups.
+        UniqueConstraint('user_id', 'month', 'category_id', name='_goal_user_month_category_uc'),
+    )
\ No newline at end of file
@@ -0,0 +1,26 @@
+# File: app/models/ingested_range.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class IngestedRange(Base):
+    """
+    A span of statement rows already imported for one (account, source) pair, e.g. the
+    HDFC statement rows of the "HDFC Bank" account from first_txn_date to last_txn_date.
+    Overlapping and touching spans are merged, so each pair has a few disjoint rows.
+    """
+    __tablename__ = "ingested_ranges"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False)
+    # The transaction source the rows came from ('HDFC', 'ICICI', or the provider for Paytm rows).
+    source = Column(String, nullable=False)
+
+    first_txn_date = Column(DateTime, nullable=False)
+    last_txn_date = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_ingested_ranges_user_account_source', 'user_id', 'account_id', 'source'),
+    )
@@ -0,0 +1,27 @@
+# File: app/models/month_snapshot.py
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class MonthSnapshot(Base):
+    """
+    The finished payload of a closed month's view (`kind` 'dashboard' or 'budget_plan'), so
+    navigating history is one lookup on the unique key. Written by `month_snapshot_service`
+    the first time the month is viewed after it closed; deleted by the writes that touch
+    data the payload was built from.
+    """
+    __tablename__ = "month_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    month = Column(Date, nullable=False) # First day of the month
+    kind = Column(String, nullable=False)
+    # JSON rather than JSONB, so the payload comes back with its keys in the original order.
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Month second, so invalidating a range of months for a user is a range scan.
+        UniqueConstraint('user_id', 'month', 'kind', name='_month_snapshot_key_uc'),
+    )
@@ -0,0 +1,27 @@
+# File: app/models/monthly_spend.py
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, UniqueConstraint
+from app.db.base_class import Base
+
+class MonthlySpend(Base):
+    """
+    Running counter of a category's budgeted spend (debit, not excluded) per (user, month,
+    category; NULL category: uncategorized). Moved by the totals of the `daily_spend` rows each
+    rollup refresh removes and inserts, so a create, edit (amount, date or category), delete or
+    upload adjusts only the months it touched. Budget checks and the rolling category averages
+    read one row per category from here. Rows whose count drops to 0 are deleted.
+    `python -m app.services.spend_counter_service` reconciles it with `transactions`.
+    """
+    __tablename__ = "monthly_spend"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    month = Column(Date, nullable=False) # First day of the month
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+
+    total = Column(Float, nullable=False, default=0)
+    txn_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # NULLS NOT DISTINCT, so uncategorized spend has one row to upsert into.
+        UniqueConstraint('user_id', 'month', 'category_id', name='_monthly_spend_key_uc', postgresql_nulls_not_distinct=True),
+    )
@@ -1,9 +1,9 @@
 # File: app/models/transaction.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
-from sqlalchemy.dialects.postgresql import JSON
+from app.models.transaction_raw_data import TransactionRawData
 from sqlalchemy.ext.associationproxy import association_proxy
 
 class Transaction(Base):
@@ -23,8 +23,10 @@ class Transaction(Base):
     
     upi_ref = Column(String, nullable=True, index=True)
     unique_key = Column(String, nullable=True, index=True) 
+    # True while the row carries the user's "Exclude from Analytics" tag; kept in sync by
+    # transaction_crud and tag_crud so readers filter on it instead of joining tags.
+    excluded = Column(Boolean, nullable=False, default=False, server_default="false")
 
-    raw_data = Column(JSON, nullable=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     # --- Relationships (No changes here) ---
@@ -36,9 +38,21 @@ class Transaction(Base):
     tags_association = relationship("TransactionTag", back_populates="transaction", cascade="all, delete-orphan")
     tags = association_proxy("tags_association", "tag")
 
+    # The original statement row is kept in a side table and only loaded on access.
+    raw_record = relationship("TransactionRawData", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    raw_data = association_proxy(
+        "raw_record", "data", creator=lambda data: TransactionRawData(data=data), cascade_scalar_deletes=True
+    )
+
     # ✅ --- THIS IS THE FIX ---
     # We now ONLY enforce uniqueness on the combination of user_id and our constructed unique_key.
     # The constraint on upi_ref has been removed.
     __table_args__ = (
         UniqueConstraint('user_id', 'unique_key', name='_user_id_unique_key_uc'),
+        Index('ix_transactions_user_excluded_date', 'user_id', 'excluded', 'txn_date'),
+        # Date-range reads; covers the daily_spend rebuild so it never visits the heap.
+        Index('ix_transactions_user_date', 'user_id', 'txn_date',
+              postgresql_include=['type', 'category_id', 'excluded', 'amount']),
+        Index('ix_transactions_user_type_date', 'user_id', 'type', 'txn_date'),
+        Index('ix_transactions_user_category', 'user_id', 'category_id'),
     )
\ No newline at end of file
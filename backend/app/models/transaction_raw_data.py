@@ -0,0 +1,15 @@
+# File: app/models/transaction_raw_data.py
+from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+from app.db.base_class import Base
+
+class TransactionRawData(Base):
+    """
+    The original statement row of an imported transaction. It lives outside `transactions`
+    so list, dashboard and analytics queries don't read or transfer it; it is only loaded
+    when a single transaction's details are requested.
+    """
+    __tablename__ = "transaction_raw_data"
+
+    transaction_id = Column(Integer, ForeignKey("transactions.id", ondelete="CASCADE"), primary_key=True)
+    data = Column(JSONB, nullable=False)
@@ -7,7 +7,8 @@ class TransactionTag(Base):
     __tablename__ = "transaction_tags"
 
     transaction_id = Column(Integer, ForeignKey("transactions.id", ondelete="CASCADE"), primary_key=True)
-    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    # The primary key leads with transaction_id; tag_id is indexed for lookups by tag.
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # ✅ THIS IS THE FIX
@@ -0,0 +1,64 @@
+# File: app/models/upload_job.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class UploadJob(Base):
+    __tablename__ = "upload_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # 'queued' -> 'processing' -> 'completed' | 'failed'
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    error = Column(Text, nullable=True)
+
+    total_rows = Column(Integer, nullable=False, default=0)
+    inserted_count = Column(Integer, nullable=False, default=0)
+    skipped_count = Column(Integer, nullable=False, default=0)
+    # Rows never parsed or inserted because they had already been imported (see UploadJobFile).
+    already_ingested_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    # Bumped on every progress update; a 'processing' job that stops moving is picked up again.
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+    files = relationship("UploadJobFile", back_populates="job", cascade="all, delete-orphan", order_by="UploadJobFile.id")
+
+    @property
+    def total_files(self) -> int:
+        return len(self.files)
+
+    @property
+    def processed_files(self) -> int:
+        return sum(1 for f in self.files if f.status in ("completed", "skipped", "failed"))
+
+class UploadJobFile(Base):
+    __tablename__ = "upload_job_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("upload_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+
+    # The upload, staged on disk under UPLOAD_STAGING_DIR until the file is processed so a
+    # restart can resume the job.
+    storage_path = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # sha256 of the content
+    # Hash of content_hash and the accounts the file was parsed against; a file whose
+    # fingerprint matches an already completed one is not processed again.
+    fingerprint = Column(String(64), nullable=True, index=True)
+    duplicate_of_id = Column(Integer, ForeignKey("upload_job_files.id", ondelete="SET NULL"), nullable=True)
+
+    # 'queued' -> 'processing' -> 'completed' | 'skipped' | 'failed'
+    status = Column(String(20), nullable=False, default="queued")
+    row_count = Column(Integer, nullable=False, default=0)
+    inserted_count = Column(Integer, nullable=False, default=0)
+    skipped_count = Column(Integer, nullable=False, default=0)
+    # Rows skipped before categorization: the whole file for a duplicate, otherwise the rows
+    # falling inside an already imported range of their account.
+    already_ingested_count = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+
+    job = relationship("UploadJob", back_populates="files")
@@ -11,6 +11,9 @@ class User(Base):
     email = Column(String(255), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     created_at = Column(DateTime, server_default=func.now())
+    # Bumped by every write to the user's transactions, tags, categories or goals; cached
+    # responses built under an older version are never served (see response_cache_service).
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     #! CHANGE: Add relationships to other models
     accounts = relationship("Account", back_populates="user", cascade="all, delete-orphan")
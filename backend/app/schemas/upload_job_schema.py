@@ -0,0 +1,36 @@
+# File: app/schemas/upload_job_schema.py
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class UploadJobFileOut(BaseModel):
+    id: int
+    filename: str
+    status: str
+    row_count: int
+    inserted_count: int
+    skipped_count: int
+    already_ingested_count: int = 0
+    duplicate_of_id: Optional[int] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class UploadJobOut(BaseModel):
+    id: int
+    status: str
+    error: Optional[str] = None
+    total_files: int
+    processed_files: int
+    total_rows: int
+    inserted_count: int
+    skipped_count: int
+    already_ingested_count: int = 0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    files: List[UploadJobFileOut] = []
+
+    class Config:
+        from_attributes = True
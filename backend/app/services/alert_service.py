@@ -1,80 +1,111 @@
 # File: app/services/alert_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models import Transaction, Goal, Alert, Category, Tag, TransactionTag
-from app.crud import alert_crud
-from datetime import date
+from sqlalchemy import text
+from app.models import Goal, MonthlySpend, Category
+from app.services.response_cache_service import bump_data_version
+from datetime import date, datetime
+from dateutil.relativedelta import relativedelta
 from decimal import Decimal
 
 # Define the thresholds at which we want to create alerts
 BUDGET_THRESHOLDS = [Decimal("100.0"), Decimal("90.0"), Decimal("75.0")]
 
-def get_total_spend_for_category_in_month(db: Session, user_id: int, category_id: int, month: str) -> Decimal:
-    """Calculates the total debit spend for a specific category and month, excluding certain transactions."""
-    
-    # Find the tag used for excluding transactions from analytics
-    exclude_tag = db.query(Tag).filter(Tag.name == "Exclude from Analytics", Tag.user_id == user_id).first()
-    transactions_to_exclude = []
-    if exclude_tag:
-        transactions_to_exclude = [
-            t.transaction_id for t in db.query(TransactionTag.transaction_id)
-            .filter(TransactionTag.tag_id == exclude_tag.id, TransactionTag.user_id == user_id)
-            .all()
-        ]
-
-    # Calculate the sum
-    total_spend = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == user_id,
-        Transaction.category_id == category_id,
-        Transaction.type == 'debit',
-        func.to_char(Transaction.txn_date, 'YYYY-MM') == month,
-        Transaction.id.notin_(transactions_to_exclude)
-    ).scalar()
+# Serializes budget alert evaluation per user (pg_advisory_xact_lock(class, user_id)), so two
+# writes or a write and the sweep can't both insert the same alert. Writes take it last, after
+# the rollup and snapshot locks.
+ALERT_LOCK_CLASS = 1103
 
-    return Decimal(total_spend or 0)
+# One row per (goal, threshold) due, skipping those already alerted (acknowledged or not).
+CREATE_BUDGET_ALERTS = text("""
+    INSERT INTO alerts (type, goal_id, threshold_percentage, triggered_at, is_acknowledged, user_id)
+    SELECT 'budget', due.goal_id, due.threshold, :triggered_at, false, :user_id
+    FROM unnest(CAST(:goal_ids AS int[]), CAST(:thresholds AS numeric[])) AS due(goal_id, threshold)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM alerts a
+        WHERE a.user_id = :user_id AND a.goal_id = due.goal_id AND a.threshold_percentage = due.threshold
+    )
+""")
 
-def check_and_create_budget_alerts(db: Session, user_id: int, transaction: Transaction):
+# --- BATCHED BUDGET EVALUATION ---
+def evaluate_budgets(db: Session, user_id: int, month: str, goals: list | None = None) -> list:
     """
-    Checks if a new transaction has triggered any budget alerts and creates them if necessary.
+    Budget status of each of the user's expense categories in `month` (YYYY-MM), as
+    {"category", "goal" (or None), "budget", "spent"} dicts with Decimal amounts. Costs three
+    queries however many categories there are, spend being one counter row per category
+    (`monthly_spend`); pass `goals` if the month's goals are loaded.
     """
-    if not transaction.category_id:
-        return
+    month_start = datetime.strptime(month, "%Y-%m").date()
+    if goals is None:
+        goals = db.query(Goal).filter(Goal.month == month, Goal.user_id == user_id).all()
+    goal_map = {goal.category_id: goal for goal in goals}
+    spent_map = dict(db.query(MonthlySpend.category_id, MonthlySpend.total).filter(
+        MonthlySpend.user_id == user_id, MonthlySpend.month == month_start
+    ).all())
+    categories = db.query(Category).filter(Category.is_income == False, Category.user_id == user_id).all()
+    evaluations = []
+    for cat in categories:
+        goal = goal_map.get(cat.id)
+        evaluations.append({
+            "category": cat, "goal": goal,
+            "budget": Decimal(goal.limit_amount) if goal else Decimal(0),
+            "spent": Decimal(spent_map.get(cat.id, 0)),
+        })
+    return evaluations
 
-    month_str = transaction.txn_date.strftime('%Y-%m')
+def reached_threshold(spent: Decimal, budget: Decimal) -> Decimal | None:
+    """The highest of BUDGET_THRESHOLDS that `spent` has reached, or None (also for no budget)."""
+    if budget <= 0:
+        return None
+    spent_percentage = (spent / budget) * 100
+    return next((threshold for threshold in BUDGET_THRESHOLDS if spent_percentage >= threshold), None)
 
-    # Find the budget goal for this category and month
-    goal = db.query(Goal).filter(
-        Goal.user_id == user_id,
-        Goal.category_id == transaction.category_id,
-        Goal.month == month_str
-    ).first()
+def create_budget_alerts(db: Session, user_id: int, evaluations: list) -> int:
+    """
+    Creates, in one INSERT, the alert for the highest threshold each budgeted category has
+    reached, unless the goal was already alerted at that threshold. Returns how many were created.
+    """
+    due = [(e["goal"].id, threshold) for e in evaluations
+           if e["goal"] is not None and (threshold := reached_threshold(e["spent"], e["budget"])) is not None]
+    if not due:
+        return 0
+    created = db.execute(CREATE_BUDGET_ALERTS, {
+        "user_id": user_id, "triggered_at": datetime.utcnow(),
+        "goal_ids": [goal_id for goal_id, _ in due], "thresholds": [threshold for _, threshold in due],
+    }).rowcount
+    if created:
+        bump_data_version(db, user_id)
+    return created
 
-    if not goal or goal.limit_amount <= 0:
-        return
+def evaluate_budget_alerts(db: Session, user_id: int, first_day: date, last_day: date | None = None) -> int:
+    """
+    Creates the budget alerts due in the months of first_day..last_day (dates or datetimes)
+    that have goals; returns how many. Called by the writes that can push spend or budgets
+    over a threshold, after the rollup is refreshed and before the commit, and by the sweep.
+    A range without goals costs one query.
+    """
+    first_month, last_month = _month_start(first_day), _month_start(last_day or first_day)
+    months = []
+    while first_month <= last_month:
+        months.append(first_month.strftime("%Y-%m"))
+        first_month += relativedelta(months=1)
+    goals = db.query(Goal).filter(Goal.user_id == user_id, Goal.month.in_(months)).all()
+    if not goals:
+        return 0
+    db.execute(text("SELECT pg_advisory_xact_lock(:lock_class, :user_id)"), {"lock_class": ALERT_LOCK_CLASS, "user_id": user_id})
+    created = 0
+    for month in sorted({goal.month for goal in goals}):
+        month_goals = [goal for goal in goals if goal.month == month]
+        created += create_budget_alerts(db, user_id, evaluate_budgets(db, user_id, month, goals=month_goals))
+    return created
 
-    # Get the new total spend for this category
-    total_spend = get_total_spend_for_category_in_month(db, user_id, transaction.category_id, month_str)
-    
-    # Calculate the percentage of the budget spent
-    spent_percentage = (total_spend / Decimal(goal.limit_amount)) * 100
+def _month_start(value) -> date:
+    return (value.date() if isinstance(value, datetime) else value).replace(day=1)
 
-    # Check against each threshold
-    for threshold in BUDGET_THRESHOLDS:
-        if spent_percentage >= threshold:
-            # Check if an alert for this goal and threshold already exists
-            alert_exists = db.query(Alert).filter(
-                Alert.user_id == user_id,
-                Alert.goal_id == goal.id,
-                Alert.threshold_percentage == threshold
-            ).first()
+def get_total_spend_for_category_in_month(db: Session, user_id: int, category_id: int, month: str) -> Decimal:
+    """The category's budgeted spend in `month` (YYYY-MM): one lookup of its running counter."""
+    month_start = datetime.strptime(month, "%Y-%m").date()
+    total_spend = db.query(MonthlySpend.total).filter(
+        MonthlySpend.user_id == user_id, MonthlySpend.month == month_start, MonthlySpend.category_id == category_id
+    ).scalar()
 
-            # If it doesn't exist, create it
-            if not alert_exists:
-                alert_crud.create_alert(db, user_id=user_id, alert_in={
-                    "goal_id": goal.id,
-                    "threshold_percentage": threshold,
-                    "is_acknowledged": False
-                })
-                # We only create one alert at a time to avoid spamming.
-                # The next transaction will trigger the check for the next threshold.
-                break
\ No newline at end of file
+    return Decimal(total_spend or 0)
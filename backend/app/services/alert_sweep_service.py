@@ -0,0 +1,60 @@
+# File: app/services/alert_sweep_service.py
+import os
+import threading
+import traceback
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+
+from app.db.session import SessionLocal
+from app.models.goal import Goal
+from app.services.alert_service import evaluate_budget_alerts
+
+# Budget alerts are created by the writes that move spend or budgets; this periodic sweep
+# catches what they don't see (e.g. tag or category edits). 0 disables the background sweep.
+BUDGET_ALERT_SWEEP_MINUTES = int(os.getenv("BUDGET_ALERT_SWEEP_MINUTES", "60"))
+
+_stop = threading.Event()
+
+def sweep_budget_alerts() -> int:
+    """
+    Evaluates the budgets of last month and this month for every user who has any, each
+    user in its own transaction. Returns the number of alerts created; safe to run anywhere
+    at any time, since evaluation never creates an alert twice.
+    """
+    first_month = date.today().replace(day=1) - relativedelta(months=1)
+    db = SessionLocal()
+    try:
+        user_ids = [user_id for (user_id,) in db.query(Goal.user_id).filter(
+            Goal.month >= first_month.strftime("%Y-%m")
+        ).distinct().order_by(Goal.user_id).all()]
+        created = 0
+        for user_id in user_ids:
+            created += evaluate_budget_alerts(db, user_id, first_month, date.today())
+            db.commit()
+        return created
+    finally:
+        db.close()
+
+def _sweep_periodically():
+    # The first sweep runs at startup, for alerts that came due while the server was down.
+    while not _stop.is_set():
+        try:
+            created = sweep_budget_alerts()
+            if created:
+                print(f"Budget alert sweep created {created} alert(s).")
+        except Exception as e:
+            print(f"Budget alert sweep failed. Error: {e}")
+            traceback.print_exc()
+        _stop.wait(BUDGET_ALERT_SWEEP_MINUTES * 60)
+
+def start_budget_alert_sweep():
+    if BUDGET_ALERT_SWEEP_MINUTES > 0:
+        _stop.clear()
+        threading.Thread(target=_sweep_periodically, name="budget-alert-sweep", daemon=True).start()
+
+def stop_budget_alert_sweep():
+    _stop.set()
+
+if __name__ == "__main__":
+    print(f"Created {sweep_budget_alerts()} budget alert(s).")
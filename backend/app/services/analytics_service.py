@@ -1,44 +1,100 @@
 # File: app/services/analytics_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text, case, Integer
+from sqlalchemy import text
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 import calendar
-import pandas as pd
-import math
-
-from app.models.transaction import Transaction
-from app.models.category import Category
-from app.models.tag import Tag
-from app.models.transaction_tag import TransactionTag
-
-def clean_nan_values(data):
-    if isinstance(data, dict): return {k: clean_nan_values(v) for k, v in data.items()}
-    if isinstance(data, list): return [clean_nan_values(i) for i in data]
-    if pd.isna(data) or (isinstance(data, float) and math.isnan(data)): return None
-    return data
-
-def get_cumulative_spend_for_period(db: Session, start_date: date, end_date: date, excluded_ids: list, user_id: int) -> pd.DataFrame:
-    query_text = """
-        WITH daily_totals AS (
-            SELECT EXTRACT(DAY FROM txn_date)::integer AS day, SUM(amount) AS total
-            FROM transactions 
-            WHERE user_id = :user_id AND type = 'debit' AND txn_date >= :start_date AND txn_date < :end_date
-            AND id NOT IN :excluded_ids
-            GROUP BY 1
-        ),
-        all_days AS (SELECT generate_series(1, 31) AS day)
-        SELECT d.day, COALESCE(SUM(t.total) OVER (ORDER BY d.day), 0) AS cumulative_spend
-        FROM all_days d LEFT JOIN daily_totals t ON d.day = t.day
-    """
-    result = db.execute(text(query_text), {
-        "user_id": user_id, "start_date": start_date, "end_date": end_date, 
-        "excluded_ids": tuple(excluded_ids) if excluded_ids else (0,)
+
+# One pass over the user's debit rollup rows feeds every panel: the (day) grouping set gives
+# all-time daily totals, the (category) set gives per-category totals within [start, end).
+# When only some panels are asked for, only the grouping sets they read are computed.
+_SCAN_SQL = """
+    WITH spend AS (
+        SELECT {keys},
+               SUM(total) AS total, SUM(small_total) AS small_total, SUM(large_total) AS large_total,
+               SUM(total) FILTER (WHERE day >= :start_date AND day < :end_date) AS range_total,
+               SUM(txn_count) FILTER (WHERE day >= :start_date AND day < :end_date) AS range_count
+        FROM daily_spend
+        WHERE user_id = :user_id AND type = 'debit' AND (:include_excluded OR NOT excluded)
+        GROUP BY {grouping}
+    )
+    SELECT s.*, c.name, c.icon_name
+    FROM spend s LEFT JOIN categories c ON s.by_category AND c.id = s.category_id
+"""
+ANALYTICS_SCAN = text(_SCAN_SQL.format(keys="GROUPING(day) = 1 AS by_category, day, category_id", grouping="GROUPING SETS ((day), (category_id))"))
+DAY_SCAN = text(_SCAN_SQL.format(keys="false AS by_category, day, NULL::int AS category_id", grouping="day"))
+CATEGORY_SCAN = text(_SCAN_SQL.format(keys="true AS by_category, NULL::date AS day, category_id", grouping="category_id"))
+
+# Panel keys of the payload, in payload order; the category panels read the (category) set,
+# every other panel the (day) set.
+PANELS = ("overview", "spendingVelocity", "spendingComposition", "habitIdentifier",
+          "categoryDistribution", "transactionHeatmap", "monthlyBreakdown")
+CATEGORY_PANELS = {"habitIdentifier", "categoryDistribution"}
+
+def scan_spend(db: Session, start_date: date, end_date: date, include_excluded: bool, user_id: int,
+               by_day: bool = True, by_category: bool = True):
+    """Returns ({day: row} for all time, [row per category with spend in [start_date, end_date)])."""
+    days, categories = {}, []
+    if not (by_day or by_category):
+        return days, categories
+    scan = ANALYTICS_SCAN if by_day and by_category else DAY_SCAN if by_day else CATEGORY_SCAN
+    rows = db.execute(scan, {
+        "user_id": user_id, "start_date": start_date, "end_date": end_date, "include_excluded": include_excluded
     }).fetchall()
-    df = pd.DataFrame(result, columns=['day', 'cumulative_spend']).ffill()
-    return df
+    for row in rows:
+        if not row.by_category:
+            days[row.day] = row
+        elif row.category_id is not None and row.range_count:
+            categories.append(row)
+    return days, categories
+
+def get_cumulative_spend_for_period(days: dict, start_date: date, end_date: date) -> list:
+    """Cumulative spend by day of month 1..31 over the days in [start_date, end_date)."""
+    daily = [0.0] * 32
+    for day, row in days.items():
+        if start_date <= day < end_date:
+            daily[day.day] += row.total
+    cumulative, running = [], 0.0
+    for day in range(1, 32):
+        running += daily[day]
+        cumulative.append(running)
+    return cumulative
+
+def _spending_velocity(days: dict, start_date: date, today: date) -> list:
+    """Cumulative spend per day of month for this month, last month and the average of the months before."""
+    current_month_start_for_velocity = today.replace(day=1)
+    current_month_end_for_velocity = current_month_start_for_velocity + relativedelta(months=1)
+    current = get_cumulative_spend_for_period(days, current_month_start_for_velocity, current_month_end_for_velocity)
+    prev_month_start = current_month_start_for_velocity - relativedelta(months=1)
+    previous = get_cumulative_spend_for_period(days, prev_month_start, current_month_start_for_velocity)
 
-def get_analytics_data(db: Session, time_period: str, include_capital_transfers: bool, user_id: int):
+    # Average cumulative curve of the historical months. Days of the month with no spend in
+    # any of them have no average.
+    historical = [day for day in days if start_date <= day < current_month_start_for_velocity]
+    num_historical_months = len({(day.year, day.month) for day in historical})
+    if num_historical_months:
+        spend_by_day_of_month = {}
+        for day in historical:
+            spend_by_day_of_month[day.day] = spend_by_day_of_month.get(day.day, 0) + days[day].total
+        average, running = {}, 0.0
+        for day_of_month in sorted(spend_by_day_of_month):
+            running += spend_by_day_of_month[day_of_month]
+            average[day_of_month] = running / num_historical_months
+    else:
+        average = dict.fromkeys(range(1, 32), 0)
+
+    return [{
+        "day": day_of_month,
+        "current": current[day_of_month - 1] if day_of_month <= today.day else None,
+        "previous": previous[day_of_month - 1],
+        "average": average.get(day_of_month),
+    } for day_of_month in range(1, 32)]
+
+def get_analytics_data(db: Session, time_period: str, include_capital_transfers: bool, user_id: int, panels=None):
+    """
+    Builds the analytics payload. `panels` (keys of PANELS) limits it to those sections, and
+    only the rollup grouping sets they read are queried; None builds every panel.
+    """
     today = date.today()
     is_monthly_view = not (time_period.endswith('m') or time_period.endswith('y') or time_period == "all")
 
@@ -54,41 +110,29 @@ def get_analytics_data(db: Session, time_period: str, include_capital_transfers:
             start_date = today.replace(day=1) - relativedelta(months=num_months - 1)
         end_date = today + relativedelta(days=1)
 
-    transactions_to_exclude = []
-    if not include_capital_transfers:
-        exclude_tag = db.query(Tag).filter(Tag.name == "Exclude from Analytics", Tag.user_id == user_id).first()
-        if exclude_tag:
-            transactions_to_exclude = [t.transaction_id for t in db.query(TransactionTag.transaction_id).filter(TransactionTag.tag_id == exclude_tag.id).all()]
-
-    base_query = db.query(Transaction).filter(
-        Transaction.user_id == user_id,
-        Transaction.type == 'debit',
-        Transaction.txn_date >= start_date,
-        Transaction.txn_date < end_date,
-        Transaction.id.notin_(transactions_to_exclude)
-    )
-    
-    all_time_query = db.query(Transaction).filter(
-        Transaction.user_id == user_id,
-        Transaction.type == 'debit',
-        Transaction.id.notin_(transactions_to_exclude)
-    )
-    monthly_spending_rows = all_time_query.with_entities(
-        func.to_char(Transaction.txn_date, 'YYYY-MM').label('month'),
-        func.sum(Transaction.amount).label('total')
-    ).group_by('month').all()
-
-    highest_spend_month_data = None
-    average_spend_per_month = 0
-    if monthly_spending_rows:
-        df_monthly = pd.DataFrame(monthly_spending_rows, columns=['month', 'total'])
-        df_monthly['total'] = pd.to_numeric(df_monthly['total'])
-        if not df_monthly.empty:
-            highest_month_row = df_monthly.loc[df_monthly['total'].idxmax()]
-            highest_spend_month_data = {"month": highest_month_row['month'], "actual": float(highest_month_row['total'])}
-            average_spend_per_month = float(df_monthly['total'].mean())
-
-    overview_data = {"highestSpendMonth": highest_spend_month_data, "averageSpendPerMonth": average_spend_per_month}
+    wanted = set(panels) if panels else set(PANELS)
+    # Velocity and the monthly breakdown are only filled for ranges, the composition only for a month.
+    day_panels = {"overview", "transactionHeatmap"} | ({"spendingComposition"} if is_monthly_view else {"spendingVelocity", "monthlyBreakdown"})
+    days, category_rows = scan_spend(db, start_date, end_date, include_capital_transfers, user_id,
+                                     by_day=bool(wanted & day_panels), by_category=bool(wanted & CATEGORY_PANELS))
+    in_range = sorted(day for day in days if start_date <= day < end_date)
+    payload = {}
+
+    if "overview" in wanted:
+        monthly_totals = {}
+        for day in sorted(days):
+            month = (day.year, day.month)
+            monthly_totals[month] = monthly_totals.get(month, 0) + days[day].total
+        monthly_totals = {f"{year}-{month:02d}": total for (year, month), total in monthly_totals.items()}
+
+        highest_spend_month_data = None
+        average_spend_per_month = 0
+        if monthly_totals:
+            highest_month = max(monthly_totals, key=monthly_totals.get)
+            highest_spend_month_data = {"month": highest_month, "actual": float(monthly_totals[highest_month])}
+            average_spend_per_month = float(sum(monthly_totals.values()) / len(monthly_totals))
+
+        payload["overview"] = {"highestSpendMonth": highest_spend_month_data, "averageSpendPerMonth": average_spend_per_month}
     
     # //! THIS IS THE FIX: Initialize keys with empty lists
     spending_velocity = []
@@ -96,57 +140,39 @@ def get_analytics_data(db: Session, time_period: str, include_capital_transfers:
     monthly_breakdown = []
 
     if is_monthly_view:
-        composition_rows = base_query.with_entities(
-            func.extract('day', Transaction.txn_date).cast(Integer).label('day'),
-            func.sum(case((Transaction.amount < 1000, Transaction.amount), else_=0)).label('small_total'),
-            func.sum(case((Transaction.amount >= 1000, Transaction.amount), else_=0)).label('large_total')
-        ).group_by('day').order_by('day').all()
-        df_composition = pd.DataFrame(composition_rows, columns=['day', 'small_total', 'large_total'])
-        df_all_days = pd.DataFrame({'day': range(1, calendar.monthrange(start_date.year, start_date.month)[1] + 1)})
-        df_merged = pd.merge(df_all_days, df_composition, on='day', how='left').fillna(0)
-        df_merged['cumulative_small'] = df_merged['small_total'].cumsum()
-        df_merged['cumulative_large'] = df_merged['large_total'].cumsum()
-        spending_composition = df_merged[['day', 'cumulative_small', 'cumulative_large']].to_dict(orient='records')
+        if "spendingComposition" in wanted:
+            cumulative_small = cumulative_large = 0.0
+            for day_of_month in range(1, calendar.monthrange(start_date.year, start_date.month)[1] + 1):
+                row = days.get(start_date.replace(day=day_of_month))
+                if row:
+                    cumulative_small += row.small_total
+                    cumulative_large += row.large_total
+                spending_composition.append({"day": day_of_month, "cumulative_small": cumulative_small, "cumulative_large": cumulative_large})
     else:
-        current_month_start_for_velocity = today.replace(day=1)
-        current_month_end_for_velocity = current_month_start_for_velocity + relativedelta(months=1)
-        df_current = get_cumulative_spend_for_period(db, current_month_start_for_velocity, current_month_end_for_velocity, transactions_to_exclude, user_id)
-        df_current.rename(columns={'cumulative_spend': 'current'}, inplace=True)
-        df_current.loc[df_current['day'] > today.day, 'current'] = None
-        prev_month_start = current_month_start_for_velocity - relativedelta(months=1)
-        df_prev = get_cumulative_spend_for_period(db, prev_month_start, current_month_start_for_velocity, transactions_to_exclude, user_id)
-        df_prev.rename(columns={'cumulative_spend': 'previous'}, inplace=True)
-        historical_period_start = start_date
-        historical_period_end = current_month_start_for_velocity
-        all_months_query = db.query(func.extract('day', Transaction.txn_date).cast(Integer).label('day'), func.to_char(Transaction.txn_date, 'YYYY-MM').label('month'), func.sum(Transaction.amount).label('daily_total')).filter(Transaction.user_id == user_id, Transaction.type == 'debit', Transaction.txn_date >= historical_period_start, Transaction.txn_date < historical_period_end, Transaction.id.notin_(transactions_to_exclude)).group_by('day', 'month').all()
-        if all_months_query:
-            df_pivot = pd.DataFrame(all_months_query, columns=['day', 'month', 'daily_total']).pivot_table(index='day', columns='month', values='daily_total', fill_value=0)
-            num_historical_months = len(df_pivot.columns)
-            df_avg = pd.DataFrame(df_pivot.cumsum(axis=0).sum(axis=1) / num_historical_months, columns=['average']).reset_index() if num_historical_months > 0 else pd.DataFrame({'day': range(1, 32), 'average': [0]*31})
-        else:
-            df_avg = pd.DataFrame({'day': range(1, 32), 'average': [0]*31})
-        df_merged = pd.merge(pd.DataFrame({'day': range(1, 32)}), df_current, on='day', how='left').merge(df_prev, on='day', how='left').merge(df_avg, on='day', how='left')
-        spending_velocity = df_merged.to_dict(orient='records')
-        monthly_rows = base_query.with_entities(func.to_char(Transaction.txn_date, 'YYYY-MM').label('month'), func.sum(Transaction.amount).label('total')).group_by('month').order_by('month').all()
-        monthly_breakdown = [{"month": row.month, "spend": float(row.total)} for row in monthly_rows]
-
-    habit_identifier_rows = base_query.join(Category).with_entities(Category.name.label("category"), func.count(Transaction.id).label("transaction_count"), func.sum(Transaction.amount).label("total_spend"), func.avg(Transaction.amount).label("average_spend")).group_by(Category.name).having(func.count(Transaction.id) > 0).all()
-    habit_identifier_data = [{"category": r.category, "transaction_count": int(r.transaction_count), "total_spend": float(r.total_spend), "average_spend": float(r.average_spend)} for r in habit_identifier_rows]
-    
-    category_distribution_rows = base_query.join(Category).with_entities(Category.name.label("category"), func.coalesce(func.sum(Transaction.amount), 0).label("total"), Category.icon_name.label("icon_name")).group_by(Category.name, Category.icon_name).all()
-    total_overall = sum(float(row.total) for row in category_distribution_rows) or 1
-    category_distribution = [{"category": row.category, "total": float(row.total), "percentage": round((float(row.total) / total_overall) * 100, 2), "icon_name": row.icon_name} for row in category_distribution_rows]
-
-    heatmap_query = base_query.with_entities(func.date(Transaction.txn_date).label('date'), func.sum(Transaction.amount).label('spend')).group_by(func.date(Transaction.txn_date)).all()
-    transaction_heatmap = [{"date": res.date.isoformat(), "spend": float(res.spend)} for res in heatmap_query]
-
-    final_payload = {
-        "overview": overview_data,
-        "spendingVelocity": spending_velocity,
-        "spendingComposition": spending_composition,
-        "habitIdentifier": habit_identifier_data,
-        "categoryDistribution": category_distribution,
-        "transactionHeatmap": transaction_heatmap,
-        "monthlyBreakdown": monthly_breakdown
-    }
-    return clean_nan_values(final_payload)
\ No newline at end of file
+        if "spendingVelocity" in wanted:
+            spending_velocity = _spending_velocity(days, start_date, today)
+
+        if "monthlyBreakdown" in wanted:
+            for day in in_range:
+                month = day.strftime('%Y-%m')
+                if monthly_breakdown and monthly_breakdown[-1]["month"] == month:
+                    monthly_breakdown[-1]["spend"] += days[day].total
+                else:
+                    monthly_breakdown.append({"month": month, "spend": float(days[day].total)})
+
+    payload["spendingVelocity"] = spending_velocity
+    payload["spendingComposition"] = spending_composition
+
+    if "habitIdentifier" in wanted:
+        payload["habitIdentifier"] = [{"category": r.name, "transaction_count": int(r.range_count), "total_spend": float(r.range_total), "average_spend": float(r.range_total / r.range_count)} for r in category_rows]
+
+    if "categoryDistribution" in wanted:
+        total_overall = sum(float(r.range_total) for r in category_rows) or 1
+        payload["categoryDistribution"] = [{"category": r.name, "total": float(r.range_total), "percentage": round((float(r.range_total) / total_overall) * 100, 2), "icon_name": r.icon_name} for r in category_rows]
+
+    if "transactionHeatmap" in wanted:
+        payload["transactionHeatmap"] = [{"date": day.isoformat(), "spend": float(days[day].total)} for day in in_range]
+
+    payload["monthlyBreakdown"] = monthly_breakdown
+    # Same key order as the full payload, restricted to the requested panels.
+    return {key: payload[key] for key in PANELS if key in wanted}
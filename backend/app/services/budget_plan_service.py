@@ -1,73 +1,66 @@
 # File: app/services/budget_plan_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
-from app.models.transaction import Transaction
+from sqlalchemy import text
 from app.models.goal import Goal
 from app.models.category import Category
-from app.models.tag import Tag
-from app.models.transaction_tag import TransactionTag
-from app.models.alert import Alert
-from app.crud import goal_crud, alert_crud
+from app.crud import goal_crud
+from app.services import alert_service, category_average_service, month_snapshot_service
 from app.schemas.budget_plan_schema import BudgetPlanUpdate
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
-import pandas as pd
-import math
 from decimal import Decimal
 
-BUDGET_THRESHOLDS = [Decimal("100.0"), Decimal("90.0"), Decimal("75.0")]
-
-def clean_nan_values(data):
-    if isinstance(data, dict): return {k: clean_nan_values(v) for k, v in data.items()}
-    if isinstance(data, list): return [clean_nan_values(i) for i in data]
-    if pd.isna(data) or (isinstance(data, float) and math.isnan(data)): return None
-    return data
+# Suggestions of the empty state: the average spend of the 3 months before.
+SUGGESTION_WINDOW = 3
+SUGGESTION_STATISTIC = "average"
 
 def update_budget_plan(db: Session, plan_data: BudgetPlanUpdate, user_id: int):
-    for item in plan_data.budgets:
-        goal_crud.upsert_budget_for_category(db, item.category_id, plan_data.month, item.limit_amount, user_id)
+    #! CHANGE: One set-based upsert for the whole plan instead of one lookup and write per category.
+    # A category listed twice keeps its last amount, as when they were saved one by one.
+    goal_crud.upsert_budgets(db, plan_data.month, {item.category_id: item.limit_amount for item in plan_data.budgets}, user_id)
+    # A lowered budget can put spend the month already has over a threshold.
+    alert_service.evaluate_budget_alerts(db, user_id, datetime.strptime(plan_data.month, "%Y-%m").date())
     db.commit()
     return {"message": "Budgets saved successfully"}
 
 def delete_budget_plan(db: Session, month: str, user_id: int):
     return goal_crud.delete_goals_by_month(db, month, user_id)
 
-def get_budget_plan(db: Session, month: str, user_id: int):
+def get_budget_plan(db: Session, month: str, user_id: int,
+                    window: int = SUGGESTION_WINDOW, statistic: str = SUGGESTION_STATISTIC):
+    """
+    A closed month's plan is built once and then served from its snapshot. `window` (months)
+    and `statistic` pick the suggestions of the empty state from the precomputed averages;
+    other choices than the default are already one lookup, so they aren't snapshotted.
+    """
+    if (window, statistic) != (SUGGESTION_WINDOW, SUGGESTION_STATISTIC):
+        return _build_budget_plan(db, month, user_id, window, statistic)
+    month_start = datetime.strptime(month, "%Y-%m").date()
+    snapshot, data_version = month_snapshot_service.get_snapshot(db, user_id, "budget_plan", month_start)
+    if snapshot is not None:
+        return snapshot
+    plan = _build_budget_plan(db, month, user_id)
+    month_snapshot_service.save_snapshot(user_id, "budget_plan", month_start, plan, data_version)
+    return plan
+
+def _build_budget_plan(db: Session, month: str, user_id: int,
+                       window: int = SUGGESTION_WINDOW, statistic: str = SUGGESTION_STATISTIC):
     month_start = datetime.strptime(month, "%Y-%m").date()
+    next_month_start = month_start + relativedelta(months=1)
     today = date.today()
-    
-    exclude_tag = db.query(Tag).filter(Tag.name == "Exclude from Analytics", Tag.user_id == user_id).first()
-    transactions_to_exclude = []
-    if exclude_tag:
-        transactions_to_exclude = [t.transaction_id for t in db.query(TransactionTag.transaction_id).filter(TransactionTag.tag_id == exclude_tag.id).all()]
 
     existing_goals = db.query(Goal).filter(Goal.month == month, Goal.user_id == user_id).all()
 
     if existing_goals:
-        spent_subq = db.query(
-            Transaction.category_id.label("category_id"),
-            func.coalesce(func.sum(Transaction.amount), 0).label("spent")
-        ).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "debit", 
-            func.to_char(Transaction.txn_date, "YYYY-MM") == month,
-            Transaction.id.notin_(transactions_to_exclude)
-        ).group_by(Transaction.category_id).subquery()
-        
-        goal_map = {goal.category_id: goal for goal in existing_goals}
-        all_categories = db.query(Category).filter(Category.is_income == False, Category.user_id == user_id).all()
+        #! CHANGE: Spend and goals come from a few batched queries, not one per category.
+        evaluations = alert_service.evaluate_budgets(db, user_id, month, goals=existing_goals)
         response_plan = []
         day_of_month = today.day if month_start.strftime("%Y-%m") == today.strftime("%Y-%m") else 31
 
         # ✅ --- THIS IS THE FIX ---
         # The loop will now process every available category, not just those with a budget.
-        for cat in all_categories:
-            goal = goal_map.get(cat.id)
-            # If a goal exists, use its budget. Otherwise, the budget is 0.
-            budget = Decimal(goal.limit_amount) if goal else Decimal(0)
-            
-            spent_row = db.query(spent_subq.c.spent).filter(spent_subq.c.category_id == cat.id).first()
-            spent = Decimal(spent_row[0]) if spent_row else Decimal(0)
+        for evaluation in evaluations:
+            cat, budget, spent = evaluation["category"], evaluation["budget"], evaluation["spent"]
             remaining = budget - spent
             
             # Perform calculations, which will work correctly even if the budget is 0.
@@ -82,31 +75,13 @@ def get_budget_plan(db: Session, month: str, user_id: int):
                 "progress": float((spent / budget) * 100) if budget > 0 else 0.0,
                 "daysLeft": round(float(days_left))
             })
-            
-            # The retroactive alert checking logic remains, but only runs if a budget is set.
-            if goal and budget > 0:
-                spent_percentage = (spent / budget) * 100
-                for threshold in BUDGET_THRESHOLDS:
-                    if spent_percentage >= threshold:
-                        alert_exists = db.query(Alert).filter(
-                            Alert.user_id == user_id,
-                            Alert.goal_id == goal.id,
-                            Alert.threshold_percentage == threshold
-                        ).first()
-                        if not alert_exists:
-                            alert_crud.create_alert(db, user_id=user_id, alert_in={
-                                "goal_id": goal.id,
-                                "threshold_percentage": threshold
-                            })
-                        break 
-        
-        db.commit()
+        # A pure read: budget alerts are created by the writes (alert_service.evaluate_budget_alerts).
 
         # Pacing Data (no changes here)
         pacing_query = text("""
             WITH daily_sums AS (
-                SELECT date(txn_date) as day, SUM(amount) as daily_total FROM transactions
-                WHERE user_id = :user_id AND type = 'debit' AND to_char(txn_date, 'YYYY-MM') = :month AND id NOT IN :excluded_ids GROUP BY 1
+                SELECT day, SUM(total) as daily_total FROM daily_spend
+                WHERE user_id = :user_id AND type = 'debit' AND NOT excluded AND day >= :month_start AND day < :next_month_start GROUP BY 1
             ), all_days AS (
                 SELECT generate_series(date_trunc('month', CAST(:month_start AS date)), 
                 date_trunc('month', CAST(:month_start AS date)) + interval '1 month - 1 day', '1 day'::interval)::date AS day
@@ -115,42 +90,27 @@ def get_budget_plan(db: Session, month: str, user_id: int):
             FROM all_days d LEFT JOIN daily_sums ds ON d.day = ds.day
         """)
         pacing_result = db.execute(pacing_query, {
-            "user_id": user_id, "month": month, "month_start": month_start, 
-            "excluded_ids": tuple(transactions_to_exclude) if transactions_to_exclude else (0,)
+            "user_id": user_id, "month_start": month_start, "next_month_start": next_month_start
         }).fetchall()
-        df = pd.DataFrame(pacing_result, columns=['day', 'cumulative_spend']).ffill()
-        pacing_data = [{"day": row.day.day, "actualSpend": float(row.cumulative_spend)} for index, row in df.iterrows()]
+        pacing_data = [{"day": row.day.day, "actualSpend": float(row.cumulative_spend)} for row in pacing_result]
         
         # Sort the final list by the amount spent
-        final_payload = {"plan": sorted(response_plan, key=lambda x: x['spent'], reverse=True), "historicalData": None, "pacingData": pacing_data}
-        return clean_nan_values(final_payload)
+        return {"plan": sorted(response_plan, key=lambda x: x['spent'], reverse=True), "historicalData": None, "pacingData": pacing_data}
     else:
-        # --- SMART EMPTY STATE LOGIC (No changes below this line) ---
-        avg_period_end = month_start
-        avg_period_start = avg_period_end - relativedelta(months=3)
-        
-        historical_base_query = db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "debit",
-            Transaction.txn_date >= avg_period_start,
-            Transaction.txn_date < avg_period_end,
-            Transaction.id.notin_(transactions_to_exclude)
-        )
+        # --- SMART EMPTY STATE LOGIC ---
+        #! CHANGE: Read from the maintained rolling averages: one indexed lookup instead of three aggregations.
+        averages = category_average_service.get_category_averages(db, user_id, month_start)
 
-        historical_spend_rows = historical_base_query.with_entities(func.to_char(Transaction.txn_date, "YYYY-MM").label("month"), func.sum(Transaction.amount).label("total_spend")).group_by("month").order_by("month").all()
-        historical_spend = [{"month": row.month, "totalSpend": float(row.total_spend)} for row in historical_spend_rows]
-        average_total_spend = sum(h['totalSpend'] for h in historical_spend) / 3 if historical_spend else 0
-        
-        avg_spend_rows = historical_base_query.with_entities(Transaction.category_id, (func.sum(Transaction.amount) / 3).label("average_spend")).group_by(Transaction.category_id).all()
-        suggested_budgets_map = {row[0]: float(row[1]) for row in avg_spend_rows}
-        
-        current_month_spend_rows = db.query(Transaction.category_id, func.sum(Transaction.amount).label("current_spend")).filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "debit", 
-            func.to_char(Transaction.txn_date, "YYYY-MM") == month, 
-            Transaction.id.notin_(transactions_to_exclude)
-        ).group_by(Transaction.category_id).all()
-        current_spend_map = {row[0]: float(row[1]) for row in current_month_spend_rows}
+        # Oldest month first, only the months that had any spend.
+        historical_spend = []
+        for months_back in range(window, 0, -1):
+            totals = [row.history[months_back - 1] for row in averages if row.history[months_back - 1] is not None]
+            if totals:
+                historical_spend.append({"month": (month_start - relativedelta(months=months_back)).strftime("%Y-%m"), "totalSpend": sum(totals)})
+        average_total_spend = sum(h['totalSpend'] for h in historical_spend) / window if historical_spend else 0
+
+        suggested_budgets_map = {row.category_id: getattr(row, f"{statistic}_{window}") for row in averages}
+        current_spend_map = {row.category_id: row.month_total or 0 for row in averages}
         
         all_categories = db.query(Category).filter(Category.is_income == False, Category.user_id == user_id).all()
         suggested_budgets = []
@@ -166,5 +126,4 @@ def get_budget_plan(db: Session, month: str, user_id: int):
             "averageTotalSpend": round(average_total_spend),
             "suggestedBudgets": sorted(suggested_budgets, key=lambda x: (x['currentSpend'], x['suggestedAmount']), reverse=True)
         }
-        final_payload = {"plan": None, "historicalData": historical_data}
-        return clean_nan_values(final_payload)
\ No newline at end of file
+        return {"plan": None, "historicalData": historical_data}
\ No newline at end of file
@@ -0,0 +1,191 @@
+# File: app/services/categorization_service.py
+import re
+import threading
+
+import numpy as np
+from rapidfuzz import fuzz as rapidfuzz_fuzz, process as rapidfuzz_process
+from thefuzz import utils as fuzz_utils
+
+
+def _trie_to_regex(node: dict) -> str:
+    """Turns a character trie into a regex body. A terminal node with children becomes an
+    optional group, so the engine always prefers the longest keyword at a position."""
+    branches = [re.escape(ch) + _trie_to_regex(child) for ch, child in sorted(node.items()) if ch != '']
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    return f'(?:{body})?' if '' in node else body
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword that occurs in a text with one regex scan.
+
+    The keywords are compiled into a single trie-shaped pattern wrapped in a
+    lookahead, so overlapping occurrences are reported and the cost per text
+    depends on its length and the trie depth, not on the number of keywords.
+    At each position the regex reports the longest keyword; shorter keywords
+    that start at the same position are always prefixes of it and are added
+    from a precomputed table.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = frozenset(keywords)
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[''] = True
+        self._pattern = re.compile(f"(?=({_trie_to_regex(trie)}))") if self.keywords else None
+        self._with_prefixes = {
+            keyword: frozenset(keyword[:i] for i in range(1, len(keyword) + 1) if keyword[:i] in self.keywords)
+            for keyword in self.keywords
+        }
+
+    def find_all(self, text: str) -> set:
+        if self._pattern is None:
+            return set()
+        found = set()
+        for match in self._pattern.finditer(text):
+            found |= self._with_prefixes[match.group(1)]
+        return found
+
+
+def category_ids_by_name(user_categories: dict) -> dict:
+    """Maps lower-cased category names to ids; the first category wins on a clash."""
+    lookup = {}
+    for cat_id, cat_name in user_categories.items():
+        lookup.setdefault(cat_name.lower(), cat_id)
+    return lookup
+
+
+class RuleCategorizer:
+    """
+    Applies the transfer keywords and merchant rules to transaction descriptions.
+
+    Build one per rule set and reuse it; `bind()` resolves the rules against a
+    user's merchants and categories once, after which every description costs a
+    single scan plus dict lookups.
+    """
+
+    def __init__(self, transfer_keywords, merchant_rules: dict):
+        self.transfer_keywords = frozenset(transfer_keywords)
+        self.merchant_rules = dict(merchant_rules)
+        self.matcher = KeywordMatcher(self.transfer_keywords | set(self.merchant_rules))
+
+    def bind(self, merchants_map: dict, category_lookup: dict) -> "BoundRules":
+        resolved = {}
+        for priority, (keyword, (merchant_name, category_name)) in enumerate(self.merchant_rules.items()):
+            merchant_id, category_id = merchants_map.get(merchant_name), category_lookup.get(category_name.lower())
+            # A rule that resolves to neither a merchant nor a category never wins.
+            if merchant_id or category_id:
+                resolved[keyword] = (priority, merchant_id, category_id)
+        return BoundRules(self, resolved, category_lookup.get('transfers'))
+
+
+class BoundRules:
+    def __init__(self, categorizer: RuleCategorizer, resolved: dict, transfer_category_id):
+        self._categorizer = categorizer
+        self._resolved = resolved
+        self._transfer_category_id = transfer_category_id
+
+    def match(self, description: str):
+        """
+        Returns (merchant_id, category_id) for a description. A transfer keyword
+        takes precedence over every merchant rule; among merchant rules the
+        first one in rule order wins.
+        """
+        found = self._categorizer.matcher.find_all(description.lower())
+        if not found:
+            return None, None
+        if not found.isdisjoint(self._categorizer.transfer_keywords):
+            return None, self._transfer_category_id
+        hits = [self._resolved[keyword] for keyword in found if keyword in self._resolved]
+        if not hits:
+            return None, None
+        _, merchant_id, category_id = min(hits)
+        return merchant_id, category_id
+
+
+# --- FUZZY CATEGORY MATCHING ---
+# A user remark is written between slashes in the description, e.g. "UPI-.../food/".
+REMARK_PATTERN = re.compile(r'/([^/]+)/', re.IGNORECASE)
+CATEGORY_ALIASES = { "miscellaneous": ["misc", "miscelleaneous"], "entertainment": ["ent"], "transportation": ["transport"] }
+FUZZY_MATCH_THRESHOLD = 85 # % confidence a remark needs to map to a category
+# Memoized remark results kept per matcher before the memo is reset.
+REMARK_MEMO_SIZE = 10000
+
+
+class CategoryMatcher:
+    """
+    Fuzzy-matches user remarks (e.g. the "food" in "UPI-.../food/") to one user's categories.
+
+    The choices (category names plus their aliases) are pre-processed once, and
+    `match_many` scores every distinct, not-yet-seen remark against all of them in
+    a single RapidFuzz `cdist` call. Results are memoized, so a remark is only ever
+    scored once per matcher. Scoring is the same as thefuzz's `extractOne`:
+    WRatio on fully processed strings, the first best choice wins, and its rounded
+    score must reach FUZZY_MATCH_THRESHOLD.
+    """
+
+    def __init__(self, user_categories: dict):
+        choices = {}
+        for cat_id, cat_name in user_categories.items():
+            cat_name_lower = cat_name.lower()
+            choices[cat_name_lower] = cat_id
+            for alias in CATEGORY_ALIASES.get(cat_name_lower, []):
+                choices[alias] = cat_id
+        self._choice_ids = list(choices.values())
+        self._processed_choices = [fuzz_utils.full_process(choice) for choice in choices]
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _process(remark: str) -> str:
+        return fuzz_utils.full_process(remark.lower().strip())
+
+    def match(self, remark: str) -> int | None:
+        return self.match_many([remark])[remark]
+
+    def match_many(self, remarks) -> dict:
+        """Returns {remark: category id or None} for every remark given."""
+        processed = {remark: self._process(remark) for remark in set(remarks)}
+        with self._lock:
+            unseen = list({query for query in processed.values() if query not in self._memo})
+            if unseen:
+                if len(self._memo) + len(unseen) > REMARK_MEMO_SIZE:
+                    self._memo.clear()
+                self._memo.update(zip(unseen, self._score(unseen)))
+            return {remark: self._memo[query] for remark, query in processed.items()}
+
+    def _score(self, queries: list) -> list:
+        if not self._processed_choices:
+            return [None] * len(queries)
+        scores = rapidfuzz_process.cdist(queries, self._processed_choices, scorer=rapidfuzz_fuzz.WRatio, dtype=np.float64)
+        best = scores.argmax(axis=1)
+        return [
+            self._choice_ids[idx] if round(row[idx]) >= FUZZY_MATCH_THRESHOLD else None
+            for row, idx in zip(scores, best)
+        ]
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+def get_category_matcher(user_id: int, user_categories: dict) -> CategoryMatcher:
+    """
+    Returns the cached matcher for a user, rebuilding it when their categories differ
+    from the ones it was built from. `user_categories` maps category id -> name.
+    """
+    signature = tuple(sorted(user_categories.items()))
+    with _matchers_lock:
+        cached = _matchers.get(user_id)
+        if cached is None or cached[0] != signature:
+            cached = _matchers[user_id] = (signature, CategoryMatcher(dict(signature)))
+        return cached[1]
+
+def invalidate_category_matcher(user_id: int):
+    """Drops a user's matcher; call after their categories change."""
+    with _matchers_lock:
+        _matchers.pop(user_id, None)
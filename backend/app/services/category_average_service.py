@@ -0,0 +1,78 @@
+# File: app/services/category_average_service.py
+from datetime import date, datetime
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.category_spend_average import CategorySpendAverage
+
+# Rolling windows (in months) kept precomputed for the budget suggestions, and the statistics
+# kept for each; `category_spend_averages` has an <statistic>_<window> column for every pair.
+ROLLING_WINDOWS = (3, 6, 12)
+STATISTICS = ("average", "median")
+HISTORY_MONTHS = max(ROLLING_WINDOWS)
+
+_STAT_COLUMNS = ", ".join(f"{statistic}_{window}" for window in ROLLING_WINDOWS for statistic in STATISTICS)
+_STAT_VALUES = ", ".join(f"s{window}.{statistic}" for window in ROLLING_WINDOWS for statistic in STATISTICS)
+# Months without spend count as 0, so an average is the window's spend over its length.
+_STAT_LATERALS = ",\n".join(f"""
+    LATERAL (
+        SELECT SUM(COALESCE(x, 0)) / {window} AS average, percentile_cont(0.5) WITHIN GROUP (ORDER BY COALESCE(x, 0)) AS median
+        FROM unnest(r.totals[2:{window + 1}]) AS x
+    ) AS s{window}""" for window in ROLLING_WINDOWS)
+
+DELETE_MONTHS = text("DELETE FROM category_spend_averages WHERE user_id = :user_id AND month BETWEEN :first_month AND :last_month")
+SPEND_BOUNDS = text("SELECT MIN(month) AS first_day, MAX(month) AS last_day FROM monthly_spend WHERE user_id = :user_id")
+# One row per (month in first_month..last_month, category with debit spend in it or the
+# HISTORY_MONTHS before it), from the monthly spend counters. `totals` is the month itself
+# followed by its history; uncategorized spend is keyed 0 so the joins can hash.
+INSERT_MONTHS = text(f"""
+    INSERT INTO category_spend_averages (user_id, month, category_id, month_total, history, {_STAT_COLUMNS})
+    WITH monthly AS (
+        SELECT month, COALESCE(category_id, 0) AS category_key, total
+        FROM monthly_spend
+        WHERE user_id = :user_id
+          AND month BETWEEN CAST(:first_month AS date) - interval '{HISTORY_MONTHS} months' AND :last_month
+    ), pairs AS (
+        SELECT DISTINCT (m.month + make_interval(months => ahead.n))::date AS month, m.category_key
+        FROM monthly m, generate_series(0, {HISTORY_MONTHS}) AS ahead(n)
+        WHERE m.month + make_interval(months => ahead.n) BETWEEN CAST(:first_month AS date) AND CAST(:last_month AS date)
+    ), rows AS (
+        SELECT p.month, p.category_key, array_agg(h.total ORDER BY back.n) AS totals
+        FROM pairs p CROSS JOIN generate_series(0, {HISTORY_MONTHS}) AS back(n)
+        LEFT JOIN monthly h ON h.month = (p.month - make_interval(months => back.n))::date AND h.category_key = p.category_key
+        GROUP BY 1, 2
+    )
+    SELECT :user_id, r.month, NULLIF(r.category_key, 0), r.totals[1], r.totals[2:], {_STAT_VALUES}
+    FROM rows r,{_STAT_LATERALS}
+""")
+
+def refresh_category_averages(db: Session, user_id: int, first_day: date | None = None, last_day: date | None = None):
+    """
+    Rebuilds the user's rows for the months of first_day..last_day and the HISTORY_MONTHS
+    after them, whose history covers those days (every month when omitted), from `monthly_spend`.
+    Called by `refresh_daily_spend` once the rollup and its counters are updated, in the same transaction.
+    """
+    if first_day is None or last_day is None:
+        db.execute(DELETE_MONTHS, {"user_id": user_id, "first_month": date.min, "last_month": date.max})
+        bounds = db.execute(SPEND_BOUNDS, {"user_id": user_id}).first()
+        if bounds.first_day is None:
+            return
+        first_day, last_day = bounds.first_day, bounds.last_day
+    params = {
+        "user_id": user_id,
+        "first_month": _month_of(first_day),
+        "last_month": _month_of(last_day) + relativedelta(months=HISTORY_MONTHS),
+    }
+    db.execute(DELETE_MONTHS, params)
+    db.execute(INSERT_MONTHS, params)
+
+def get_category_averages(db: Session, user_id: int, month_start: date) -> list:
+    """The month's rows, one per category with spend in it or the HISTORY_MONTHS before it."""
+    return db.query(CategorySpendAverage).filter(
+        CategorySpendAverage.user_id == user_id, CategorySpendAverage.month == month_start
+    ).all()
+
+def _month_of(value) -> date:
+    return (value.date() if isinstance(value, datetime) else value).replace(day=1)
@@ -4,12 +4,32 @@ from sqlalchemy import func, text
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 import calendar
-import pandas as pd
 
 from app.models.transaction import Transaction
 from app.models.category import Category
-from app.models.tag import Tag
-from app.models.transaction_tag import TransactionTag
+from app.models.daily_spend import DailySpend
+from app.services.spend_rollup_service import debit_spend
+from app.services.parallel_query_service import run_queries
+from app.services import month_snapshot_service
+
+CUMULATIVE_SPEND = text("""
+    WITH daily_sums AS (
+        SELECT day, SUM(total) AS daily_total
+        FROM daily_spend
+        WHERE user_id = :user_id AND type = 'debit' AND NOT excluded
+        AND day >= :month_start AND day < :next_month_start
+        GROUP BY 1
+    )
+    SELECT
+        d.day,
+        SUM(COALESCE(ds.daily_total, 0)) OVER (ORDER BY d.day) as cumulative_total
+    FROM generate_series(
+        date_trunc('month', CAST(:month_start AS date)),
+        LEAST(date_trunc('month', CAST(:month_start AS date)) + interval '1 month - 1 day', CAST(:today AS date)),
+        '1 day'::interval
+    ) d(day)
+    LEFT JOIN daily_sums ds ON d.day = ds.day;
+""")
 
 #! CHANGE: Function now requires user_id
 def get_dashboard_data(db: Session, month: str, user_id: int):
@@ -24,93 +44,69 @@ def get_dashboard_data(db: Session, month: str, user_id: int):
     days_in_month = calendar.monthrange(month_start.year, month_start.month)[1]
     day_number_for_avg = days_in_month if month_start.replace(day=1) != today.replace(day=1) else today.day
 
-    # --- CORE EXCLUSION LOGIC (scoped to user) ---
-    exclude_tag = db.query(Tag).filter(Tag.name == "Exclude from Analytics", Tag.user_id == user_id).first()
-    transactions_to_exclude = []
-    if exclude_tag:
-        transactions_to_exclude = [t.transaction_id for t in db.query(TransactionTag.transaction_id).filter(TransactionTag.tag_id == exclude_tag.id).all()]
-
-    # --- BASE QUERY (scoped to user) ---
-    base_query_this_month = db.query(Transaction).filter(
-        Transaction.user_id == user_id, #! ADDED
-        Transaction.type == "debit",
-        Transaction.txn_date >= month_start,
-        Transaction.txn_date < next_month_start,
-        Transaction.id.notin_(transactions_to_exclude)
-    )
-
-    # --- CORE METRICS ---
-    total_spent = float(base_query_this_month.with_entities(func.coalesce(func.sum(Transaction.amount), 0)).scalar() or 0)
-    
     prev_month_start = month_start - relativedelta(months=1)
-    base_query_prev_month = db.query(Transaction).filter(
-        Transaction.user_id == user_id, #! ADDED
-        Transaction.type == "debit",
-        Transaction.txn_date >= prev_month_start,
-        Transaction.txn_date < month_start,
-        Transaction.id.notin_(transactions_to_exclude)
-    )
-    prev_total_spent = float(base_query_prev_month.with_entities(func.coalesce(func.sum(Transaction.amount), 0)).scalar() or 0)
 
-    percent_change = ((total_spent - prev_total_spent) / prev_total_spent) * 100 if prev_total_spent > 0 else (100.0 if total_spent > 0 else 0.0)
-    daily_average_spend = total_spent / day_number_for_avg if day_number_for_avg > 0 else 0
-    projected_monthly_spend = daily_average_spend * days_in_month
+    # The reads below don't depend on each other; run_queries runs them in order on `db`, or
+    # side by side on pooled connections when PARALLEL_QUERIES is on. Each takes the session to use.
+
+    # --- CORE METRICS (daily_spend rollup, excluded spend left out) ---
+    def month_total(start, end):
+        return lambda s: float(debit_spend(s, user_id, start, end).with_entities(func.coalesce(func.sum(DailySpend.total), 0)).scalar() or 0)
 
     # --- CHART AND LIST DATA ---
-    top_categories_query = base_query_this_month.join(Category).with_entities(
-        Category.id, Category.name, func.sum(Transaction.amount).label("total"), Category.icon_name
-    ).group_by(Category.id, Category.name, Category.icon_name).order_by(func.sum(Transaction.amount).desc()).limit(5).all()
-    
-    top_spending_categories = [{"id": cat_id, "category": cat_name, "amount": float(total), "icon_name": icon_name} for cat_id, cat_name, total, icon_name in top_categories_query]
-    
+    def top_spending_categories(s):
+        top_categories_query = debit_spend(s, user_id, month_start, next_month_start).join(Category).with_entities(
+            Category.id, Category.name, func.sum(DailySpend.total).label("total"), Category.icon_name
+        ).group_by(Category.id, Category.name, Category.icon_name).order_by(func.sum(DailySpend.total).desc()).limit(5).all()
+        return [{"id": cat_id, "category": cat_name, "amount": float(total), "icon_name": icon_name} for cat_id, cat_name, total, icon_name in top_categories_query]
+
     # --- CUMULATIVE SPEND (Raw SQL must also be scoped) ---
-    cumulative_spend_query = text("""
-        WITH daily_sums AS (
-            SELECT date_trunc('day', txn_date)::date AS day, SUM(amount) AS daily_total
-            FROM transactions
-            WHERE user_id = :user_id AND type = 'debit' AND to_char(txn_date, 'YYYY-MM') = :month
-            AND id NOT IN :excluded_ids
-            GROUP BY 1
-        )
-        SELECT
-            d.day,
-            SUM(COALESCE(ds.daily_total, 0)) OVER (ORDER BY d.day) as cumulative_total
-        FROM generate_series(
-            date_trunc('month', CAST(:month_start AS date)),
-            LEAST(date_trunc('month', CAST(:month_start AS date)) + interval '1 month - 1 day', CAST(:today AS date)),
-            '1 day'::interval
-        ) d(day)
-        LEFT JOIN daily_sums ds ON d.day = ds.day;
-    """)
-    
-    cumulative_spend_rows = db.execute(
-        cumulative_spend_query, 
-        {
-            "user_id": user_id, #! PASS user_id to query
-            "month_start": month_start.strftime("%Y-%m-%d"), 
-            "today": today.strftime("%Y-%m-%d"), 
-            "month": month,
-            "excluded_ids": tuple(transactions_to_exclude) if transactions_to_exclude else (0,)
-        }
-    ).fetchall()
-    
-    df = pd.DataFrame(cumulative_spend_rows, columns=['day', 'cumulative_total']).ffill()
-    spending_trend_data = [{"day": row.day.day, "cumulative_spend": float(row.cumulative_total)} for index, row in df.iterrows()]
+    def spending_trend(s):
+        cumulative_spend_rows = s.execute(
+            CUMULATIVE_SPEND,
+            {
+                "user_id": user_id, #! PASS user_id to query
+                "month_start": month_start.strftime("%Y-%m-%d"),
+                "next_month_start": next_month_start,
+                "today": today.strftime("%Y-%m-%d")
+            }
+        ).fetchall()
+        return [{"day": row.day.day, "cumulative_spend": float(row.cumulative_total)} for row in cumulative_spend_rows]
 
     # --- RECENT TRANSACTIONS (scoped to user) ---
-    recent_txns_query = db.query(Transaction).filter(
-        Transaction.user_id == user_id, #! ADDED
-        Transaction.id.notin_(transactions_to_exclude)
-    ).order_by(Transaction.txn_date.desc()).limit(5).all()
-    
-    recent_transactions = [{"id": txn.id, "description": txn.description, "amount": float(txn.amount), "txn_date": txn.txn_date.isoformat(), "category_id": txn.category_id} for txn in recent_txns_query]
+    def recent_transactions(s):
+        recent_txns_query = s.query(Transaction).filter(
+            Transaction.user_id == user_id, #! ADDED
+            Transaction.excluded.is_(False)
+        ).order_by(Transaction.txn_date.desc()).limit(5).all()
+        return [{"id": txn.id, "description": txn.description, "amount": float(txn.amount), "txn_date": txn.txn_date.isoformat(), "category_id": txn.category_id} for txn in recent_txns_query]
+
+    # ✅ --- NEW: A closed month's figures come from its snapshot; only the recent transactions,
+    # which aren't tied to the month, are read ---
+    snapshot, data_version = month_snapshot_service.get_snapshot(db, user_id, "dashboard", month_start)
+    if snapshot is not None:
+        return {**snapshot, "recentTransactions": recent_transactions(db)}
+
+    results = run_queries(db, {
+        "total_spent": month_total(month_start, next_month_start),
+        "prev_total_spent": month_total(prev_month_start, month_start),
+        "top_spending_categories": top_spending_categories,
+        "spending_trend": spending_trend,
+        "recent_transactions": recent_transactions,
+    })
+    total_spent, prev_total_spent = results["total_spent"], results["prev_total_spent"]
+
+    percent_change = ((total_spent - prev_total_spent) / prev_total_spent) * 100 if prev_total_spent > 0 else (100.0 if total_spent > 0 else 0.0)
+    daily_average_spend = total_spent / day_number_for_avg if day_number_for_avg > 0 else 0
+    projected_monthly_spend = daily_average_spend * days_in_month
 
-    return {
+    month_data = {
         "totalSpent": round(total_spent, 2),
         "percentChangeFromLastMonth": round(percent_change, 2),
         "dailyAverageSpend": round(daily_average_spend, 2),
         "projectedMonthlySpend": round(projected_monthly_spend, 2),
-        "topSpendingCategories": top_spending_categories,
-        "spendingTrend": spending_trend_data,
-        "recentTransactions": recent_transactions,
-    }
\ No newline at end of file
+        "topSpendingCategories": results["top_spending_categories"],
+        "spendingTrend": results["spending_trend"],
+    }
+    month_snapshot_service.save_snapshot(user_id, "dashboard", month_start, month_data, data_version)
+    return {**month_data, "recentTransactions": results["recent_transactions"]}
\ No newline at end of file
@@ -0,0 +1,139 @@
+# File: app/services/ingest_history_service.py
+import hashlib
+import json
+from bisect import bisect_right
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.ingested_range import IngestedRange
+from app.models.upload_job import UploadJob, UploadJobFile
+
+# --- FILE FINGERPRINTS ---
+def file_fingerprint(content_sha256: str | None, account_map: dict) -> str | None:
+    """
+    Combines a file's content hash with the accounts it is parsed against, so a file that
+    was imported before an account existed still counts as new once it does.
+    """
+    if not content_sha256:
+        return None
+    accounts = json.dumps(sorted(account_map.items()))
+    return hashlib.sha256(f"{content_sha256}:{accounts}".encode()).hexdigest()
+
+def find_ingested_file(db: Session, user_id: int, fingerprint: str, exclude_id: int | None = None):
+    """The user's earliest completed upload with this fingerprint, if any."""
+    query = db.query(UploadJobFile).join(UploadJob).filter(
+        UploadJob.user_id == user_id,
+        UploadJobFile.fingerprint == fingerprint,
+        UploadJobFile.status == "completed",
+    )
+    if exclude_id is not None:
+        query = query.filter(UploadJobFile.id != exclude_id)
+    return query.order_by(UploadJobFile.id).first()
+
+def forget_ingested_files(db: Session, user_id: int):
+    """Lets identical files be imported again, e.g. after imported rows were deleted."""
+    job_ids = db.query(UploadJob.id).filter(UploadJob.user_id == user_id)
+    db.query(UploadJobFile).filter(
+        UploadJobFile.job_id.in_(job_ids), UploadJobFile.fingerprint.isnot(None)
+    ).update({UploadJobFile.fingerprint: None}, synchronize_session=False)
+
+# --- INGESTED RANGES ---
+# Rows of an (account, source) dated within a span a file was imported for are usually
+# already in the database, but not always: an earlier upload may have been a partial export
+# of the span, or taken mid-day. So the spans only pick the rows worth checking, and a row
+# is dropped once one lookup per chunk confirms it exists: by unique_key, or, for keyless
+# rows (Paytm, which the (user_id, unique_key) dedupe can't catch), by account, timestamp,
+# amount, type and description. Everything else is categorized and inserted.
+EXISTING_KEYS = text("SELECT unique_key FROM transactions WHERE user_id = :user_id AND unique_key = ANY(:keys)")
+EXISTING_KEYLESS_ROWS = text("""
+    SELECT t.account_id, t.source, t.txn_date, t.amount, t.type, t.description
+    FROM transactions t
+    WHERE t.user_id = :user_id AND t.txn_date = ANY(CAST(:txn_dates AS timestamp[])) AND t.account_id = ANY(:account_ids)
+""")
+
+def _keyless_identity(row) -> tuple:
+    return row['account_id'], row['source'], row['txn_date'], row['amount'], row['type'], row['description']
+
+class IngestedRanges:
+    """The user's imported spans, looked up by (account_id, source)."""
+
+    def __init__(self, ranges: dict):
+        self._starts = {key: [first for first, _ in spans] for key, spans in ranges.items()}
+        self._spans = ranges
+
+    def covers(self, account_id, source, txn_date) -> bool:
+        key = (account_id, source)
+        starts = self._starts.get(key)
+        if not starts:
+            return False
+        i = bisect_right(starts, txn_date) - 1
+        return i >= 0 and txn_date <= self._spans[key][i][1]
+
+    def split(self, db: Session, user_id: int, rows: list):
+        """Returns (rows still to process, number of rows already imported)."""
+        covered = [row for row in rows if self.covers(row['account_id'], row['source'], row['txn_date'])]
+        if not covered:
+            return rows, 0
+        keys = [row['unique_key'] for row in covered if row['unique_key'] is not None]
+        existing_keys = set(db.execute(EXISTING_KEYS, {"user_id": user_id, "keys": keys}).scalars()) if keys else set()
+        keyless = [row for row in covered if row['unique_key'] is None]
+        existing_rows = {tuple(r) for r in db.execute(EXISTING_KEYLESS_ROWS, {
+            "user_id": user_id,
+            "txn_dates": sorted({row['txn_date'] for row in keyless}),
+            "account_ids": sorted({row['account_id'] for row in keyless}),
+        })} if keyless else set()
+        already = {id(row) for row in covered if (
+            row['unique_key'] in existing_keys if row['unique_key'] is not None else _keyless_identity(row) in existing_rows
+        )}
+        fresh = [row for row in rows if id(row) not in already]
+        return fresh, len(rows) - len(fresh)
+
+def load_ingested_ranges(db: Session, user_id: int) -> IngestedRanges:
+    ranges = {}
+    for r in db.query(IngestedRange).filter(IngestedRange.user_id == user_id).order_by(IngestedRange.first_txn_date):
+        ranges.setdefault((r.account_id, r.source), []).append((r.first_txn_date, r.last_txn_date))
+    return IngestedRanges(ranges)
+
+def extend_bounds(bounds: dict, rows: list) -> dict:
+    """Folds rows into {(account_id, source): (first_txn_date, last_txn_date)}."""
+    for row in rows:
+        key, txn_date = (row['account_id'], row['source']), row['txn_date']
+        first, last = bounds.get(key, (txn_date, txn_date))
+        bounds[key] = (min(first, txn_date), max(last, txn_date))
+    return bounds
+
+def record_ingested_ranges(db: Session, user_id: int, bounds: dict):
+    """
+    Adds the spans of a fully imported file, merging them with any overlapping or
+    touching span already recorded. Call in the same transaction as the inserts.
+    """
+    for (account_id, source), (first, last) in bounds.items():
+        first, last = _to_datetime(first), _to_datetime(last)
+        overlapping = db.query(IngestedRange).filter(
+            IngestedRange.user_id == user_id,
+            IngestedRange.account_id == account_id,
+            IngestedRange.source == source,
+            IngestedRange.first_txn_date <= last,
+            IngestedRange.last_txn_date >= first,
+        ).all()
+        for r in overlapping:
+            first, last = min(first, r.first_txn_date), max(last, r.last_txn_date)
+        if overlapping:
+            db.query(IngestedRange).filter(IngestedRange.id.in_([r.id for r in overlapping])).delete(synchronize_session=False)
+        db.add(IngestedRange(user_id=user_id, account_id=account_id, source=source, first_txn_date=first, last_txn_date=last))
+
+def forget_ingested_range(db: Session, user_id: int, account_id: int, source: str, txn_date):
+    """Drops the span containing a deleted row, so re-uploading its statement restores it."""
+    forgotten = db.query(IngestedRange).filter(
+        IngestedRange.user_id == user_id,
+        IngestedRange.account_id == account_id,
+        IngestedRange.source == source,
+        IngestedRange.first_txn_date <= txn_date,
+        IngestedRange.last_txn_date >= txn_date,
+    ).delete(synchronize_session=False)
+    if forgotten:
+        forget_ingested_files(db, user_id)
+
+def _to_datetime(value):
+    return value.to_pydatetime() if hasattr(value, "to_pydatetime") else value
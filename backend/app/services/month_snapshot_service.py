@@ -0,0 +1,86 @@
+# File: app/services/month_snapshot_service.py
+import json
+from datetime import date, datetime
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+
+# A month's budget plan suggests budgets from the 3 months before it (and its dashboard compares
+# with the month before), so spend dated in month M feeds the snapshots of M to M + 3.
+SNAPSHOT_LOOKBACK_MONTHS = 3
+# Serializes saving and invalidating a user's snapshots (pg_advisory_xact_lock(class, user_id)).
+SNAPSHOT_LOCK_CLASS = 1102
+
+LOOKUP = text("""
+    SELECT u.data_version, s.payload
+    FROM users u LEFT JOIN month_snapshots s ON s.user_id = u.id AND s.month = :month AND s.kind = :kind
+    WHERE u.id = :user_id
+""")
+# Only stored if no write has committed since the payload's data was read (the version is
+# still the one returned by LOOKUP); a write that is still open holds the lock.
+SAVE = text("""
+    INSERT INTO month_snapshots (user_id, month, kind, payload)
+    SELECT :user_id, :month, :kind, CAST(:payload AS json)
+    FROM users WHERE id = :user_id AND data_version = :data_version
+    ON CONFLICT ON CONSTRAINT _month_snapshot_key_uc DO NOTHING
+""")
+DELETE_MONTHS = text("DELETE FROM month_snapshots WHERE user_id = :user_id AND month BETWEEN :first_month AND :last_month")
+LOCK = text("SELECT pg_advisory_xact_lock(:lock_class, :user_id)")
+# Saving never waits: while a write holds the lock the payload is about to go stale anyway.
+TRY_LOCK = text("SELECT pg_try_advisory_xact_lock(:lock_class, :user_id)")
+
+def is_closed(month_start: date) -> bool:
+    return month_start < date.today().replace(day=1)
+
+def get_snapshot(db: Session, user_id: int, kind: str, month_start: date):
+    """
+    Returns (payload or None, data_version) for a closed month, in one indexed lookup; pass
+    the version to `save_snapshot` after building a missing payload. (None, None) for the
+    current and future months, which are never snapshotted, without a query.
+    """
+    if not is_closed(month_start):
+        return None, None
+    row = db.execute(LOOKUP, {"user_id": user_id, "month": month_start, "kind": kind}).first()
+    return row.payload, row.data_version
+
+def save_snapshot(user_id: int, kind: str, month_start: date, payload: dict, data_version: int | None):
+    """
+    Stores a payload built after `get_snapshot` missed. Written and committed in a short
+    session of its own, so the read that built the payload never writes or commits; skipped
+    while a write of the user's data is in progress.
+    """
+    if data_version is None:
+        return
+    db = SessionLocal()
+    try:
+        if not db.execute(TRY_LOCK, {"lock_class": SNAPSHOT_LOCK_CLASS, "user_id": user_id}).scalar():
+            return
+        db.execute(SAVE, {
+            "user_id": user_id, "month": month_start, "kind": kind, "payload": json.dumps(payload), "data_version": data_version
+        })
+        db.commit()
+    finally:
+        db.close()
+
+def invalidate_snapshots(db: Session, user_id: int, first_day: date | None = None, last_day: date | None = None,
+                         months_after: int = SNAPSHOT_LOOKBACK_MONTHS):
+    """
+    Drops the user's snapshots built from data dated first_day..last_day (every snapshot when
+    omitted); for spend that is its months and the `months_after` that look back at them.
+    Call it in the write's transaction, before the commit: the lock it takes is held until
+    then, so a payload read before the write can't be saved after it.
+    """
+    db.execute(LOCK, {"lock_class": SNAPSHOT_LOCK_CLASS, "user_id": user_id})
+    first_month = _month_of(first_day) or date.min
+    last_month = _month_of(last_day) + relativedelta(months=months_after) if last_day else date.max
+    db.execute(DELETE_MONTHS, {"user_id": user_id, "first_month": first_month, "last_month": last_month})
+
+def _month_of(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
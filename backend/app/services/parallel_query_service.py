@@ -0,0 +1,41 @@
+# File: app/services/parallel_query_service.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal, engine
+
+# Run the independent read queries of a dashboard or analytics request side by side, each on its
+# own pooled connection, instead of one after another on the request's session.
+PARALLEL_QUERIES = os.getenv("PARALLEL_QUERIES", "false").lower() in ("1", "true", "yes")
+# Extra connections the parallel queries of all requests may hold at once (each request still
+# runs one of its queries on its own session).
+PARALLEL_QUERY_WORKERS = int(os.getenv("PARALLEL_QUERY_WORKERS", "4"))
+
+_executor = ThreadPoolExecutor(max_workers=PARALLEL_QUERY_WORKERS, thread_name_prefix="query")
+# The pooled queries are single read statements, so they skip the BEGIN/ROLLBACK round trips.
+_read_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+
+def _run_on_own_session(query):
+    db = SessionLocal(bind=_read_engine)
+    try:
+        return query(db)
+    finally:
+        db.close()
+
+def run_queries(db: Session, queries: dict) -> dict:
+    """
+    Runs {name: query(session)} and returns {name: result}. Queries must only read and must return
+    plain values, not ORM objects. By default they all run in order on `db`. With PARALLEL_QUERIES
+    the first one runs on `db` while the rest go to the pool, each on a session of its own, so the
+    call takes about as long as the slowest query. Under READ COMMITTED every statement sees its
+    own snapshot either way, so the results are no less consistent than in sequence.
+    """
+    names = list(queries)
+    if not PARALLEL_QUERIES or len(names) < 2:
+        return {name: queries[name](db) for name in names}
+    futures = {name: _executor.submit(_run_on_own_session, queries[name]) for name in names[1:]}
+    results = {names[0]: queries[names[0]](db)}
+    results.update({name: future.result() for name, future in futures.items()})
+    return results
@@ -0,0 +1,114 @@
+# File: app/services/response_cache_service.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+# Budget for the cached JSON bodies kept in this process; 0 turns the cache off.
+RESPONSE_CACHE_MAX_BYTES = int(float(os.getenv("RESPONSE_CACHE_MAX_MB", "64")) * 2**20)
+
+class ResponseCache:
+    """
+    Thread-safe LRU of serialized JSON bodies keyed by (user_id, endpoint, params).
+    Each entry is stamped with the user's `data_version` and the day it was built; a lookup
+    with any other stamp is a miss, so a write (which bumps the version) or a new day makes
+    the old body unreachable without scanning. Least recently used bodies are evicted once
+    their total size passes `max_bytes`.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, stamp) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, stamp, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[1])
+            self._entries[key] = (stamp, body)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES)
+
+def cached_response(user: User, endpoint: str, params: dict, build, headers=None) -> Response:
+    """
+    Returns the JSON body `build()` produced for this user, endpoint and params, computing
+    it only when the user's data changed (or the day rolled over) since it was cached.
+    The body is stored already serialized, so a hit skips both the queries and the encoding.
+    `headers` (e.g. the ETag set by `deps.check_etag`) are added to the response.
+    """
+    headers = dict(headers or {})
+    if RESPONSE_CACHE_MAX_BYTES <= 0:
+        return JSONResponse(jsonable_encoder(build()), headers=headers)
+    key = (user.id, endpoint, tuple(sorted(params.items())))
+    stamp = (user.data_version, date.today())
+    body = response_cache.get(key, stamp)
+    if body is not None:
+        return Response(body, media_type="application/json", headers={**headers, "X-Cache": "HIT"})
+    body = JSONResponse(jsonable_encoder(build())).body
+    response_cache.put(key, stamp, body)
+    return Response(body, media_type="application/json", headers={**headers, "X-Cache": "MISS"})
+
+def data_etag(user: User, path: str, query_items) -> str:
+    """
+    Strong ETag for a GET of `path` with these (name, value) query parameters. Like the cache
+    stamp it changes with the user's `data_version` and the day, and with nothing else.
+    """
+    key = repr((user.id, user.data_version, date.today().isoformat(), path, sorted(query_items)))
+    return '"%s"' % hashlib.sha256(key.encode()).hexdigest()[:32]
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: `*`, or any listed tag with or without W/."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+def bump_data_version(db: Session, user_id: int):
+    """
+    Marks everything cached for the user as stale, in this process and in their browser (the
+    ETags change too). Call it in the same transaction as any write to data a read endpoint
+    returns (transactions, tags, categories, goals, accounts, merchants, alerts), before the commit.
+    """
+    db.query(User).filter(User.id == user_id).update({User.data_version: User.data_version + 1}, synchronize_session=False)
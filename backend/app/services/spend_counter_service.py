@@ -0,0 +1,75 @@
+# File: app/services/spend_counter_service.py
+import argparse
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.services.response_cache_service import bump_data_version
+from app.services.spend_rollup_service import refresh_daily_spend
+
+# Counters are moved by many small float deltas; totals this close count as equal.
+TOTAL_TOLERANCE = 0.005
+
+# Every (user, month, category) whose counter disagrees with the budgeted spend (debit, not
+# excluded) summed from `transactions`, including counters missing on either side.
+# Uncategorized spend is keyed 0 so the full join can hash.
+RECONCILE = text("""
+    WITH actual AS (
+        SELECT user_id, date_trunc('month', txn_date)::date AS month, COALESCE(category_id, 0) AS category_key,
+               SUM(amount) AS total, COUNT(*) AS txn_count
+        FROM transactions
+        WHERE type = 'debit' AND NOT excluded AND (CAST(:user_id AS int) IS NULL OR user_id = :user_id)
+        GROUP BY 1, 2, 3
+    ), counted AS (
+        SELECT user_id, month, COALESCE(category_id, 0) AS category_key, total, txn_count
+        FROM monthly_spend
+        WHERE CAST(:user_id AS int) IS NULL OR user_id = :user_id
+    )
+    SELECT COALESCE(c.user_id, a.user_id) AS user_id, COALESCE(c.month, a.month) AS month,
+           NULLIF(COALESCE(c.category_key, a.category_key), 0) AS category_id,
+           c.total AS counted_total, a.total AS actual_total, c.txn_count AS counted_count, a.txn_count AS actual_count
+    FROM counted c
+    FULL JOIN actual a ON a.user_id = c.user_id AND a.month = c.month AND a.category_key = c.category_key
+    WHERE c.txn_count IS DISTINCT FROM a.txn_count OR abs(COALESCE(c.total, 0) - COALESCE(a.total, 0)) > :tolerance
+    ORDER BY 1, 2, 3
+""")
+
+def find_counter_drift(db: Session, user_id: int | None = None) -> list:
+    """
+    The `monthly_spend` counters (of one user, or everyone) that disagree with `transactions`,
+    as rows of (user_id, month, category_id, counted_total, actual_total, counted_count,
+    actual_count); NULL on the side where the row is missing. Empty when they all match.
+    """
+    return db.execute(RECONCILE, {"user_id": user_id, "tolerance": TOTAL_TOLERANCE}).all()
+
+def reconcile_spend_counters(user_id: int | None = None, repair: bool = False) -> list:
+    """
+    Verifies the spend counters against the source rows and returns the drifted ones. With
+    `repair`, rebuilds the rollup and counters of each user with drift in its own transaction.
+    """
+    db = SessionLocal()
+    try:
+        drift = find_counter_drift(db, user_id)
+        if repair:
+            for drifted_user_id in sorted({row.user_id for row in drift}):
+                refresh_daily_spend(db, drifted_user_id)
+                bump_data_version(db, drifted_user_id)
+                db.commit()
+        return drift
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Run from cron or by hand; exits 1 if any counter had drifted, repaired or not.
+    parser = argparse.ArgumentParser(description="Verify the monthly spend counters against transactions.")
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--repair", action="store_true", help="rebuild the counters of users with drift")
+    args = parser.parse_args()
+    drift = reconcile_spend_counters(args.user_id, args.repair)
+    for row in drift:
+        print(f"user {row.user_id} {row.month:%Y-%m} category {row.category_id}: "
+              f"counted {row.counted_total} ({row.counted_count} txns), actual {row.actual_total} ({row.actual_count} txns)")
+    print(f"{len(drift)} drifted counter(s){', repaired' if args.repair and drift else ''}.")
+    sys.exit(1 if drift else 0)
@@ -0,0 +1,114 @@
+# File: app/services/spend_rollup_service.py
+from datetime import date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.daily_spend import DailySpend
+from app.services import category_average_service, month_snapshot_service
+
+EXCLUDE_TAG_NAME = "Exclude from Analytics"
+SMALL_SPEND_LIMIT = 1000 # Transactions below this count towards `small_total`
+# Serializes rollup refreshes per user (pg_advisory_xact_lock(class, user_id)), so two
+# concurrent writers can't both rebuild the same day from different snapshots.
+ROLLUP_LOCK_CLASS = 1101
+
+# Budgeted spend (debit, not excluded) of the `daily_spend` rows a statement removed or inserted
+# (`changed`), added to the monthly counters with `sign`; one upsert per statement.
+_MOVE_MONTHLY_SPEND = """
+    INSERT INTO monthly_spend AS m (user_id, month, category_id, total, txn_count)
+    SELECT user_id, date_trunc('month', day)::date, category_id, {sign}SUM(total), {sign}SUM(txn_count)
+    FROM changed
+    WHERE type = 'debit' AND NOT excluded
+    GROUP BY 1, 2, 3
+    ON CONFLICT ON CONSTRAINT _monthly_spend_key_uc
+    DO UPDATE SET total = m.total + EXCLUDED.total, txn_count = m.txn_count + EXCLUDED.txn_count
+"""
+
+DELETE_DAYS = text("""
+    WITH changed AS (
+        DELETE FROM daily_spend WHERE user_id = :user_id AND day BETWEEN :first_day AND :last_day
+        RETURNING user_id, day, category_id, type, excluded, total, txn_count
+    )
+""" + _MOVE_MONTHLY_SPEND.format(sign="-"))
+INSERT_DAYS = text("""
+    WITH changed AS (
+        INSERT INTO daily_spend (user_id, day, category_id, type, excluded, total, txn_count, small_total, large_total)
+        SELECT t.user_id, t.txn_date::date, t.category_id, t.type, t.excluded,
+               SUM(t.amount), COUNT(*),
+               SUM(CASE WHEN t.amount < :small_limit THEN t.amount ELSE 0 END),
+               SUM(CASE WHEN t.amount >= :small_limit THEN t.amount ELSE 0 END)
+        FROM transactions t
+        WHERE t.user_id = :user_id AND t.txn_date >= :first_day AND t.txn_date < CAST(:last_day AS date) + 1
+        GROUP BY 1, 2, 3, 4, 5
+        RETURNING user_id, day, category_id, type, excluded, total, txn_count
+    )
+""" + _MOVE_MONTHLY_SPEND.format(sign=""))
+# A full refresh rebuilds the counters rather than moving them, so it also repairs any drift.
+CLEAR_MONTHLY_SPEND = text("DELETE FROM monthly_spend WHERE user_id = :user_id")
+PRUNE_MONTHLY_SPEND = text("""
+    DELETE FROM monthly_spend
+    WHERE user_id = :user_id AND month BETWEEN date_trunc('month', CAST(:first_day AS date)) AND :last_day AND txn_count = 0
+""")
+
+SYNC_EXCLUDED = text("""
+    UPDATE transactions t SET excluded = NOT t.excluded
+    WHERE t.user_id = :user_id AND t.excluded <> EXISTS (
+        SELECT 1 FROM transaction_tags tt JOIN tags g ON g.id = tt.tag_id
+        WHERE tt.transaction_id = t.id AND g.user_id = t.user_id AND g.name = :exclude_tag
+    )
+""")
+
+# --- MAINTENANCE ---
+def is_excluded(tags) -> bool:
+    """Whether a transaction carrying `tags` is left out of the analytics."""
+    return any(tag.name == EXCLUDE_TAG_NAME for tag in tags)
+
+def refresh_excluded_flags(db: Session, user_id: int):
+    """
+    Re-derives `transactions.excluded` for all of the user's rows from their tags; needed
+    when the exclusion tag itself is renamed or deleted. Follow it with a full
+    `refresh_daily_spend`, since the rollup is split on the flag.
+    """
+    db.flush()
+    db.execute(SYNC_EXCLUDED, {"user_id": user_id, "exclude_tag": EXCLUDE_TAG_NAME})
+
+def refresh_daily_spend(db: Session, user_id: int, first_day: date | None = None, last_day: date | None = None):
+    """
+    Rebuilds the user's rollup rows for the days first_day..last_day (inclusive; every day
+    when omitted) from `transactions`, moves the monthly spend counters by the difference
+    (rebuilds them when every day is refreshed), then the rolling category averages that sum
+    them, and drops the closed-month snapshots built from them.
+    Call it after the write is flushed and before the commit, so the rollup always changes in
+    the same transaction as the rows it sums.
+    """
+    db.flush()
+    params = {"user_id": user_id, "first_day": _as_day(first_day) or date.min, "last_day": _as_day(last_day) or date.max}
+    db.execute(text("SELECT pg_advisory_xact_lock(:lock_class, :user_id)"), {"lock_class": ROLLUP_LOCK_CLASS, "user_id": user_id})
+    month_snapshot_service.invalidate_snapshots(db, user_id, first_day, last_day)
+    db.execute(DELETE_DAYS, params)
+    if first_day is None or last_day is None:
+        db.execute(CLEAR_MONTHLY_SPEND, params)
+    db.execute(INSERT_DAYS, {**params, "small_limit": SMALL_SPEND_LIMIT})
+    db.execute(PRUNE_MONTHLY_SPEND, params)
+    category_average_service.refresh_category_averages(db, user_id, first_day, last_day)
+
+def refresh_days(db: Session, user_id: int, days):
+    """Refreshes each distinct day in `days` (dates or datetimes), e.g. a row's old and new date."""
+    for day in sorted({_as_day(d) for d in days if d is not None}):
+        refresh_daily_spend(db, user_id, day, day)
+
+def _as_day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+# --- READS ---
+def debit_spend(db: Session, user_id: int, start: date | None = None, end: date | None = None, include_excluded: bool = False):
+    """The user's debit rollup rows for days in [start, end), without excluded spend unless asked."""
+    query = db.query(DailySpend).filter(DailySpend.user_id == user_id, DailySpend.type == 'debit')
+    if start is not None:
+        query = query.filter(DailySpend.day >= start)
+    if end is not None:
+        query = query.filter(DailySpend.day < end)
+    if not include_excluded:
+        query = query.filter(DailySpend.excluded.is_(False))
+    return query
@@ -0,0 +1,307 @@
+# File: app/services/upload_job_service.py
+import hashlib
+import os
+import tempfile
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session, joinedload
+
+from app.db.session import SessionLocal
+from app.models.account import Account
+from app.models.upload_job import UploadJob, UploadJobFile
+from app.services import ingest_history_service, upload_service
+
+# Statement uploads are processed outside the request by this small worker pool.
+UPLOAD_JOB_WORKERS = int(os.getenv("UPLOAD_JOB_WORKERS", "2"))
+# A 'processing' job whose heartbeat (`updated_at`, bumped as each file is parsed and after
+# every file and chunk) hasn't moved for this long is treated as abandoned (e.g. the server restarted
+# mid-upload) and is picked up again: at startup, and by a watchdog checking this often.
+UPLOAD_JOB_STALE_AFTER = timedelta(minutes=int(os.getenv("UPLOAD_JOB_STALE_MINUTES", "10")))
+
+# Uploads are copied to this directory STAGE_BLOCK_BYTES at a time and kept there until
+# processed, so neither the request nor the job ever holds a whole file in memory. Jobs
+# resume from it after a restart, so point it at a persistent volume (shared by every
+# server that runs upload jobs).
+UPLOAD_STAGING_DIR = os.getenv("UPLOAD_STAGING_DIR", os.path.join(tempfile.gettempdir(), "statement-uploads"))
+STAGE_BLOCK_BYTES = 1024 * 1024
+
+_executor = ThreadPoolExecutor(max_workers=UPLOAD_JOB_WORKERS, thread_name_prefix="upload-job")
+_stop_watchdog = threading.Event()
+
+def _stage_file(source) -> tuple:
+    """Copies a readable binary file to UPLOAD_STAGING_DIR block by block. Returns (path, sha256 of the content)."""
+    os.makedirs(UPLOAD_STAGING_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=UPLOAD_STAGING_DIR, suffix=".csv")
+    digest = hashlib.sha256()
+    with os.fdopen(fd, "wb") as staged:
+        while block := source.read(STAGE_BLOCK_BYTES):
+            digest.update(block)
+            staged.write(block)
+    return path, digest.hexdigest()
+
+def _remove_staged(*paths):
+    for path in paths:
+        if path:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+def create_upload_job(db: Session, user_id: int, files: list) -> UploadJob:
+    """Persists a job and its files, given as (filename, readable binary file) pairs, staging each on disk."""
+    job = UploadJob(user_id=user_id, status="queued")
+    try:
+        for filename, source in files:
+            path, content_sha256 = _stage_file(source)
+            job.files.append(UploadJobFile(filename=filename or "", storage_path=path, content_hash=content_sha256, status="queued"))
+        db.add(job)
+        db.commit()
+    except Exception:
+        db.rollback()
+        _remove_staged(*(f.storage_path for f in job.files))
+        raise
+    db.refresh(job)
+    return job
+
+def get_upload_job(db: Session, job_id: int, user_id: int):
+    return db.query(UploadJob).options(joinedload(UploadJob.files)).filter(
+        UploadJob.id == job_id, UploadJob.user_id == user_id
+    ).first()
+
+def submit_upload_job(job_id: int):
+    _executor.submit(run_upload_job, job_id)
+
+def _is_pending():
+    """Queued jobs, plus 'processing' jobs whose progress stalled (compared on the DB clock)."""
+    return or_(
+        UploadJob.status == "queued",
+        (UploadJob.status == "processing") & (UploadJob.updated_at < func.now() - UPLOAD_JOB_STALE_AFTER),
+    )
+
+def _is_stale():
+    """Queued or 'processing' jobs nothing has touched for UPLOAD_JOB_STALE_AFTER."""
+    return UploadJob.status.in_(("queued", "processing")) & (UploadJob.updated_at < func.now() - UPLOAD_JOB_STALE_AFTER)
+
+def _heartbeat(job_id: int):
+    """
+    Marks a running job as alive. Committed in its own short session, since the rows of the
+    file being processed are only committed once it is done. Skipped while this worker's own
+    transaction holds the job row: its commit bumps `updated_at` anyway. Every write of
+    `updated_at` uses clock_timestamp() rather than now() (the transaction's start), so a
+    later write never moves the heartbeat back.
+    """
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(UploadJob)
+            .where(UploadJob.id.in_(
+                select(UploadJob.id).where(UploadJob.id == job_id, UploadJob.status == "processing").with_for_update(skip_locked=True, key_share=True)
+            ))
+            .values(updated_at=func.clock_timestamp())
+        )
+        db.commit()
+    finally:
+        db.close()
+
+def _claim_job(db: Session, job_id: int) -> bool:
+    """Atomically moves a pending job to 'processing' so only one worker runs it."""
+    claimed = db.execute(
+        update(UploadJob)
+        .where(UploadJob.id == job_id, _is_pending())
+        .values(status="processing", updated_at=func.clock_timestamp())
+        .returning(UploadJob.id)
+    ).first()
+    db.commit()
+    return claimed is not None
+
+def _record_duplicate(job_file: UploadJobFile, original: UploadJobFile):
+    """Short-circuits a file identical to one already processed: nothing is parsed or inserted."""
+    job_file.duplicate_of_id = original.id
+    job_file.row_count = original.row_count
+    if original.status == "completed":
+        job_file.status, job_file.already_ingested_count = "completed", original.row_count
+    else:
+        job_file.status, job_file.error = original.status, original.error
+
+def _insert_new_rows(db: Session, job: UploadJob, job_file: UploadJobFile, parsed: list, ranges):
+    """Inserts the rows not already imported, adding to the file's counts."""
+    fresh, already_ingested = ranges.split(db, job.user_id, parsed)
+    job_file.row_count += len(parsed)
+    job_file.already_ingested_count += already_ingested
+    if fresh:
+        result = upload_service.process_and_insert_transactions(db, fresh, user_id=job.user_id, commit=False)
+        job_file.inserted_count += result["inserted"]
+        job_file.skipped_count += result["skipped"]
+
+def _finish_file(db: Session, job: UploadJob, job_file: UploadJobFile, bounds: dict):
+    if not job_file.row_count:
+        job_file.status, job_file.error = "skipped", "The file did not contain any valid transactions for your configured accounts."
+        return
+    # The inserts, the file's ranges and its bookkeeping are committed together, so a
+    # resumed job never re-inserts a file it already finished.
+    ingest_history_service.record_ingested_ranges(db, job.user_id, bounds)
+    job_file.status = "completed"
+
+def _record_file(db: Session, job: UploadJob, job_file: UploadJobFile, parsed):
+    """Inserts one file's parsed rows (or records why it couldn't be parsed)."""
+    if isinstance(parsed, ValueError):
+        job_file.status, job_file.error = "skipped", str(parsed)
+        return
+    if isinstance(parsed, Exception):
+        raise parsed
+    _reset_counts(job_file)
+    if parsed:
+        _insert_new_rows(db, job, job_file, parsed, ingest_history_service.load_ingested_ranges(db, job.user_id))
+    _finish_file(db, job, job_file, ingest_history_service.extend_bounds({}, parsed))
+
+def _stream_file(db: Session, job: UploadJob, job_file: UploadJobFile, account_map: dict):
+    """Parses and inserts a large file one chunk at a time, so only a chunk's rows are held in memory."""
+    with open(job_file.storage_path, "rb") as source:
+        try:
+            chunks = upload_service.iter_statement_chunks(job_file.filename, source, account_map)
+        except ValueError as e:
+            job_file.status, job_file.error = "skipped", str(e)
+            return
+        _reset_counts(job_file)
+        ranges, bounds = ingest_history_service.load_ingested_ranges(db, job.user_id), {}
+        for parsed in chunks:
+            if parsed:
+                # Every chunk goes into the same transaction, committed with the file's bookkeeping.
+                _insert_new_rows(db, job, job_file, parsed, ranges)
+                ingest_history_service.extend_bounds(bounds, parsed)
+            _heartbeat(job.id)
+    _finish_file(db, job, job_file, bounds)
+
+def _reset_counts(job_file: UploadJobFile):
+    job_file.row_count = job_file.inserted_count = job_file.skipped_count = job_file.already_ingested_count = 0
+
+def run_upload_job(job_id: int):
+    """
+    Parses every unfinished file of a job, then inserts them one by one, recording
+    progress after each. Small files are parsed up front in parallel; files over
+    the streaming threshold are parsed and inserted chunk by chunk instead.
+    """
+    db = SessionLocal()
+    try:
+        if not _claim_job(db, job_id):
+            return
+        job = db.query(UploadJob).filter(UploadJob.id == job_id).first()
+        account_map = {acc.name: acc.id for acc in db.query(Account).filter(Account.user_id == job.user_id).all()}
+
+        pending = [f for f in job.files if f.status not in ("completed", "skipped", "failed")]
+        for job_file in pending:
+            job_file.status = "processing"
+            job_file.fingerprint = ingest_history_service.file_fingerprint(job_file.content_hash, account_map)
+            if not (job_file.storage_path and os.path.exists(job_file.storage_path)):
+                # e.g. a job resumed on a server that doesn't share UPLOAD_STAGING_DIR
+                job_file.status, job_file.error = "failed", "The uploaded file is no longer available. Please upload it again."
+                job_file.storage_path = None
+        db.commit()
+        pending = [f for f in pending if f.status == "processing"]
+
+        # Files identical to an already imported one (or to an earlier file of this job) are
+        # never parsed; they are resolved last, once any original in this job is done.
+        duplicates, originals = {}, {}
+        for job_file in pending:
+            if not job_file.fingerprint:
+                continue
+            original = originals.get(job_file.fingerprint) or ingest_history_service.find_ingested_file(
+                db, job.user_id, job_file.fingerprint, exclude_id=job_file.id
+            )
+            if original:
+                duplicates[job_file.id] = original
+            else:
+                originals[job_file.fingerprint] = job_file
+        to_process = [f for f in pending if f.id not in duplicates]
+
+        streamed = {f.id for f in to_process if os.path.getsize(f.storage_path) > upload_service.STREAM_THRESHOLD_BYTES}
+        parsed_in_full = [f for f in to_process if f.id not in streamed]
+        parsed_files = dict(zip(
+            [f.id for f in parsed_in_full],
+            upload_service.parse_statement_files(
+                [(f.filename, f.storage_path) for f in parsed_in_full], account_map, on_parsed=lambda: _heartbeat(job_id)
+            ),
+        ))
+
+        for job_file in to_process + [f for f in pending if f.id in duplicates]:
+            _heartbeat(job_id)
+            try:
+                if job_file.id in duplicates:
+                    _record_duplicate(job_file, duplicates[job_file.id])
+                elif job_file.id in streamed:
+                    _stream_file(db, job, job_file, account_map)
+                else:
+                    _record_file(db, job, job_file, parsed_files.pop(job_file.id))
+            except Exception as e:
+                db.rollback()
+                print(f"Upload job {job_id}: failed to process {job_file.filename}. Error: {e}")
+                traceback.print_exc()
+                job_file.status, job_file.error = "failed", str(e)
+            # The staged file is only needed until it has been processed.
+            staged, job_file.storage_path = job_file.storage_path, None
+            job.total_rows = sum(f.row_count for f in job.files)
+            job.inserted_count = sum(f.inserted_count for f in job.files)
+            job.skipped_count = sum(f.skipped_count for f in job.files)
+            job.already_ingested_count = sum(f.already_ingested_count for f in job.files)
+            job.updated_at = func.clock_timestamp()
+            db.commit()
+            _remove_staged(staged)
+
+        failed = all(f.status in ("failed", "skipped") for f in job.files) and any(f.status == "failed" for f in job.files)
+        job.status = "failed" if failed else "completed"
+        if failed:
+            job.error = "None of the uploaded files could be processed."
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        print(f"✅ Upload job {job_id} finished: {job.inserted_count} inserted, {job.skipped_count} skipped, {job.already_ingested_count} already imported.")
+    except Exception as e:
+        db.rollback()
+        print(f"Upload job {job_id} crashed. Error: {e}")
+        traceback.print_exc()
+        db.query(UploadJob).filter(UploadJob.id == job_id).update(
+            {UploadJob.status: "failed", UploadJob.error: str(e), UploadJob.finished_at: datetime.utcnow()}, synchronize_session=False
+        )
+        # A failed job is never resumed, so its staged files can go.
+        staged_files = db.query(UploadJobFile).filter(UploadJobFile.job_id == job_id, UploadJobFile.storage_path.isnot(None))
+        staged = [path for (path,) in staged_files.with_entities(UploadJobFile.storage_path).all()]
+        staged_files.update({UploadJobFile.storage_path: None}, synchronize_session=False)
+        db.commit()
+        _remove_staged(*staged)
+    finally:
+        db.close()
+
+def resume_pending_upload_jobs(stale_only: bool = False):
+    """
+    Re-submits jobs left queued or abandoned mid-processing, e.g. after a restart; with
+    `stale_only`, only those untouched for UPLOAD_JOB_STALE_AFTER (the rest are still queued
+    on or run by a live worker). A resumed job redoes only its unfinished files, and a job
+    abandoned again is retried again, with no limit on attempts.
+    """
+    db = SessionLocal()
+    try:
+        pending_ids = [row.id for row in db.query(UploadJob.id).filter(_is_stale() if stale_only else _is_pending()).all()]
+    finally:
+        db.close()
+    for job_id in pending_ids:
+        submit_upload_job(job_id)
+    if pending_ids:
+        print(f"Resumed {len(pending_ids)} pending upload job(s).")
+
+def _retry_stale_jobs():
+    while not _stop_watchdog.wait(UPLOAD_JOB_STALE_AFTER.total_seconds()):
+        try:
+            resume_pending_upload_jobs(stale_only=True)
+        except Exception as e:
+            print(f"Could not resume stale upload jobs. Error: {e}")
+
+def start_upload_job_watchdog():
+    """Re-submits jobs that go stale while the server keeps running (e.g. a crashed worker)."""
+    _stop_watchdog.clear()
+    threading.Thread(target=_retry_stale_jobs, name="upload-job-watchdog", daemon=True).start()
+
+def stop_upload_job_watchdog():
+    _stop_watchdog.set()
@@ -1,19 +1,27 @@
 # File: app/services/upload_service.py
+import numpy as np
 import pandas as pd
 import json
+import multiprocessing
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from datetime import datetime
-from thefuzz import process as fuzzy_process
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.models.transaction import Transaction
+from app.models.transaction_raw_data import TransactionRawData
 from app.models.account import Account
 from app.models.category import Category
 from app.models.merchant import Merchant
 from app.models.tag import Tag
 from app.crud import alert_crud
+from app.services.categorization_service import REMARK_PATTERN, RuleCategorizer, category_ids_by_name, get_category_matcher
+from app.services import alert_service, spend_rollup_service
+from app.services.response_cache_service import bump_data_version
 
-# --- DATA MAPPING RULES (No changes) ---
+# --- DATA MAPPING RULES ---
 TRANSFER_KEYWORDS = {
     'v revathi', 't prem', 'satish p', 'mohan kumar a', 'putte gowda', 'naveen b', 'madhu c s', 'perumal p',
     'saroja', 'c vamsi krishna', 'vivek kumar', 'pavan k', 'kiran kumar k', 'manjunath', 'sagar', 'm anand',
@@ -41,144 +49,419 @@ MERCHANT_CATEGORY_RULES = {
     'hairtel': ('Hairtel Salon', 'Personal Care'), 'bookmyshow': ('BookMyShow', 'Entertainment'),
     'nova gamin': ('Nova Gaming', 'Entertainment'), 'financewithsharan': ('FinanceWithSharan', 'Education'),
 }
+# Compiled once from the tables above; rebuild it if the rules change at runtime.
+RULE_CATEGORIZER = RuleCategorizer(TRANSFER_KEYWORDS, MERCHANT_CATEGORY_RULES)
+
+# --- PARSING FUNCTIONS ---
+# Both parsers work column-at-a-time: every step below is a vectorized pandas
+# operation over the whole statement instead of a per-row `iterrows()` loop.
+UPI_REF_PATTERN = r'(\d{12})'
+
+def _to_amount(df: pd.DataFrame, col) -> pd.Series:
+    """Coerces a column to floats, treating missing or unparseable values as 0."""
+    if col not in df.columns:
+        return pd.Series(0.0, index=df.index)
+    return pd.to_numeric(df[col], errors='coerce').fillna(0.0)
+
+def _as_str(series: pd.Series) -> pd.Series:
+    """Same result as calling str() on every cell (NaN -> 'nan', 412.0 -> '412.0')."""
+    return series.astype(object).map(str)
+
+def _parse_dates(values: pd.Series, cache: dict | None = None, **kwargs) -> pd.Series:
+    """
+    Parses a column of dates. Statements repeat the same few hundred dates, so
+    each distinct value is parsed once and the results are mapped back onto
+    the column. Pass the same `cache` dict for every chunk of a streamed file to
+    keep that true across chunks. Unparseable values become NaT.
+    """
+    parsed = {} if cache is None else cache
+    for value in values.dropna().unique():
+        if value in parsed:
+            continue
+        try:
+            parsed[value] = pd.to_datetime(value, **kwargs)
+        except (ValueError, TypeError, OverflowError):
+            parsed[value] = pd.NaT
+    return pd.to_datetime(values.map(parsed))
+
+def _extract_upi_refs(descriptions: pd.Series) -> pd.Series:
+    refs = descriptions.str.extract(UPI_REF_PATTERN, expand=False)
+    refs = refs.where(descriptions.str.contains('UPI', regex=False))
+    return refs.astype(object).where(refs.notna(), None)
+
+def _raw_rows(df: pd.DataFrame) -> list:
+    """Serializes each row to the same JSON string `row.to_json()` produced."""
+    if df.empty:
+        return []
+    return df.to_json(orient='records', lines=True, date_format='iso').splitlines()
+
+def _read_csv(file) -> pd.DataFrame:
+    """Accepts an UploadFile or any binary file-like object."""
+    return pd.read_csv(getattr(file, 'file', file))
+
+def parse_generic_frame(df: pd.DataFrame, account_id, source, date_col, desc_col, debit_col, credit_col, ref_col=None, unique_id_col=None, date_cache: dict | None = None):
+    """Parses an already-loaded HDFC/ICICI style DataFrame (columns must be cleaned)."""
+    if date_col not in df.columns:
+        return []
+    df = df[df[date_col].notna()]
+
+    withdrawal_amt, deposit_amt = _to_amount(df, debit_col), _to_amount(df, credit_col)
+    is_debit = withdrawal_amt > 0
+    is_credit = ~is_debit & (deposit_amt > 0)
+    keep = is_debit | is_credit
+    if not keep.any():
+        return []
+    df, is_debit = df[keep], is_debit[keep]
+    amounts = withdrawal_amt[keep].where(is_debit, deposit_amt[keep])
 
-# --- PARSING FUNCTIONS (No changes) ---
-def parse_generic_statement(file, account_id, source, date_col, desc_col, debit_col, credit_col, ref_col=None, unique_id_col=None):
     try:
-        df = pd.read_csv(file.file)
-        clean_col = lambda c: c.strip().replace('.', '')
+        txn_dates = _parse_dates(df[date_col], cache=date_cache, dayfirst=True)
+        descriptions = _as_str(df[desc_col])
+    except Exception as e:
+        print(f"Skipping {source} file due to error: {e}")
+        return []
+    valid = txn_dates.notna()
+    if not valid.all():
+        print(f"Skipping {int((~valid).sum())} row(s) in {source} file with unparseable dates.")
+        df, is_debit, amounts, txn_dates, descriptions = df[valid], is_debit[valid], amounts[valid], txn_dates[valid], descriptions[valid]
+        if df.empty:
+            return []
+
+    # unique_key = "{source}-{part}-{YYYYMMDD}-{amount}", where part prefers the
+    # bank's own row id, then the reference column, then description + row index.
+    if ref_col:
+        fallback_part = _as_str(df[ref_col]) if ref_col in df.columns else pd.Series('', index=df.index)
+    else:
+        fallback_part = descriptions.str[:10] + '-' + df.index.astype(str).to_series(index=df.index)
+    if unique_id_col and unique_id_col in df.columns:
+        unique_key_part = _as_str(df[unique_id_col]).where(df[unique_id_col].notna(), fallback_part)
+    else:
+        unique_key_part = fallback_part
+    unique_keys = source + '-' + unique_key_part + '-' + txn_dates.dt.strftime('%Y%m%d') + '-' + amounts.map('{:.2f}'.format)
+
+    rows = zip(
+        list(txn_dates), descriptions.tolist(), amounts.tolist(), is_debit.tolist(),
+        _extract_upi_refs(descriptions).tolist(), unique_keys.tolist(), _raw_rows(df),
+    )
+    return [
+        {'txn_date': d, 'description': desc, 'amount': amt, 'type': 'debit' if debit else 'credit', 'account_id': account_id, 'source': source, 'upi_ref': ref, 'unique_key': key, 'raw_data': raw}
+        for d, desc, amt, debit, ref, key, raw in rows
+    ]
+
+def _generic_parser(account_id, source, date_col, desc_col, debit_col, credit_col, ref_col=None, unique_id_col=None):
+    """Returns a function that cleans the column names of a raw HDFC/ICICI style DataFrame and parses it."""
+    clean_col = lambda c: c.strip().replace('.', '')
+    date_col, desc_col, debit_col, credit_col = map(clean_col, [date_col, desc_col, debit_col, credit_col])
+    if ref_col: ref_col = clean_col(ref_col)
+    if unique_id_col: unique_id_col = clean_col(unique_id_col)
+    date_cache = {}
+
+    def parse(df: pd.DataFrame) -> list:
         df.columns = [clean_col(c) for c in df.columns]
-        date_col, desc_col, debit_col, credit_col = map(clean_col, [date_col, desc_col, debit_col, credit_col])
-        if ref_col: ref_col = clean_col(ref_col)
-        if unique_id_col: unique_id_col = clean_col(unique_id_col)
+        return parse_generic_frame(df, account_id, source, date_col, desc_col, debit_col, credit_col, ref_col, unique_id_col, date_cache)
+    return parse
+
+def parse_generic_statement(file, account_id, source, date_col, desc_col, debit_col, credit_col, ref_col=None, unique_id_col=None):
+    try:
+        df = _read_csv(file)
     except Exception as e:
         print(f"Pandas could not read the CSV file for {source}. Error: {e}")
         return []
-        
-    transactions = []
-    for index, row in df.iterrows():
-        if pd.isna(row.get(date_col)): continue
-        try:
-            withdrawal_amt, deposit_amt = pd.to_numeric(row.get(debit_col), errors='coerce'), pd.to_numeric(row.get(credit_col), errors='coerce')
-            withdrawal_amt, deposit_amt = (withdrawal_amt if pd.notna(withdrawal_amt) else 0.0), (deposit_amt if pd.notna(deposit_amt) else 0.0)
-            if withdrawal_amt > 0: amount, txn_type = withdrawal_amt, 'debit'
-            elif deposit_amt > 0: amount, txn_type = deposit_amt, 'credit'
-            else: continue
-            
-            txn_date, description = pd.to_datetime(row[date_col], dayfirst=True), str(row[desc_col])
-            upi_ref = re.search(r'(\d{12})', description).group(1) if 'UPI' in description and re.search(r'(\d{12})', description) else None
-            unique_key_part = str(row[unique_id_col]) if unique_id_col and pd.notna(row.get(unique_id_col)) else (str(row.get(ref_col, '')) if ref_col else f"{description[:10]}-{index}")
-            unique_key = f"{source}-{unique_key_part}-{txn_date.strftime('%Y%m%d')}-{amount:.2f}"
-
-            transactions.append({'txn_date': txn_date, 'description': description, 'amount': amount, 'type': txn_type, 'account_id': account_id, 'source': source, 'upi_ref': upi_ref, 'unique_key': unique_key, 'raw_data': row.to_json(date_format='iso')})
-        except Exception as e:
-            print(f"Skipping row in {source} file due to error: {e}")
-    return transactions
+    return _generic_parser(account_id, source, date_col, desc_col, debit_col, credit_col, ref_col, unique_id_col)(df)
+
+PAYTM_REQUIRED_COLUMNS = ['Date', 'Time', 'Your Account', 'Amount', 'Transaction Details', 'UPI Ref No.']
+
+def parse_paytm_frame(df: pd.DataFrame, account_map: dict):
+    """Parses an already-loaded Paytm DataFrame (column names must be stripped)."""
+    if any(col not in df.columns for col in PAYTM_REQUIRED_COLUMNS):
+        print("Skipping Paytm file: missing one of the expected columns.")
+        return []
+    remarks = _as_str(df['Remarks']) if 'Remarks' in df.columns else pd.Series('', index=df.index)
+    df = df[df['Date'].notna() & ~remarks.str.contains('This is not included', regex=False)]
+
+    # Statements repeat a handful of account strings, so resolve each distinct one once.
+    account_strs = _as_str(df['Your Account'])
+    resolved = {s: next((acc_id for name, acc_id in account_map.items() if name in s), None) for s in account_strs.unique()}
+    provider_by_id = {}
+    for name, acc_id in account_map.items():
+        provider_by_id.setdefault(acc_id, name)
+    matched_accounts = account_strs.map(resolved)
+
+    amount_vals = pd.to_numeric(df['Amount'], errors='coerce')
+    upi_nums = pd.to_numeric(df['UPI Ref No.'], errors='coerce')
+    txn_dates = pd.to_datetime(_as_str(df['Date']) + ' ' + _as_str(df['Time']), format='%d/%m/%Y %H:%M:%S', errors='coerce')
+    keep = (
+        matched_accounts.notna() & amount_vals.notna() & (amount_vals != 0) & txn_dates.notna()
+        & (upi_nums.notna() | df['UPI Ref No.'].isna())
+    )
+    if not keep.any():
+        return []
+    df, amount_vals, upi_nums, txn_dates = df[keep], amount_vals[keep], upi_nums[keep], txn_dates[keep]
+    matched_accounts = matched_accounts[keep].astype(int)
+
+    rows = zip(
+        [ts.to_pydatetime() for ts in txn_dates], _as_str(df['Transaction Details']).tolist(), amount_vals.tolist(),
+        matched_accounts.tolist(), upi_nums.tolist(), _raw_rows(df),
+    )
+    return [
+        {'txn_date': d, 'description': desc, 'amount': abs(amt), 'type': 'credit' if amt > 0 else 'debit', 'account_id': acc_id, 'source': provider_by_id.get(acc_id, "Unknown"), 'upi_ref': str(int(ref)) if pd.notna(ref) else None, 'unique_key': None, 'raw_data': raw}
+        for d, desc, amt, acc_id, ref, raw in rows
+    ]
+
+def _paytm_parser(account_map: dict):
+    """Returns a function that strips the column names of a raw Paytm DataFrame and parses it."""
+    def parse(df: pd.DataFrame) -> list:
+        df.columns = [c.strip() for c in df.columns]
+        return parse_paytm_frame(df, account_map)
+    return parse
 
 def parse_paytm_statement(file, account_map):
     try:
-        df = pd.read_csv(file.file)
-        df.columns = [c.strip() for c in df.columns]
+        df = _read_csv(file)
     except Exception as e:
         print(f"Pandas could not read the CSV file for Paytm. Error: {e}")
         return []
-    transactions = []
-    for _, row in df.iterrows():
-        if pd.isna(row.get('Date')) or "This is not included" in str(row.get('Remarks', '')): continue
+    return _paytm_parser(account_map)(df)
+
+# --- STATEMENT LAYOUTS ---
+# Bank files are recognised by name; each layout needs the matching account to exist.
+HDFC_LAYOUT = dict(source="HDFC", date_col="Date", desc_col="Narration", debit_col="Withdrawal Amt", credit_col="Deposit Amt", ref_col="Chq/RefNo")
+ICICI_LAYOUT = dict(source="ICICI", date_col="Value Date", desc_col="Transaction Remarks", debit_col="Withdrawal Amount (INR )", credit_col="Deposit Amount (INR )", ref_col="Cheque Number", unique_id_col="S No.")
+
+def _statement_parser(filename: str, account_map: dict):
+    """
+    Picks the parser for a statement from its filename. Returns (label, parse), where
+    parse turns a raw DataFrame of the statement into transaction rows. Raises
+    ValueError when the file can't be processed for this user (unknown layout or
+    the bank's account isn't configured).
+    """
+    name = (filename or "").lower()
+    if 'hdfc' in name:
+        if "HDFC Bank" not in account_map:
+            raise ValueError("HDFC Bank account not configured.")
+        return "HDFC", _generic_parser(account_id=account_map["HDFC Bank"], **HDFC_LAYOUT)
+    if 'icici' in name:
+        if "ICICI Bank" not in account_map:
+            raise ValueError("ICICI Bank account not configured.")
+        return "ICICI", _generic_parser(account_id=account_map["ICICI Bank"], **ICICI_LAYOUT)
+    if 'paytm' in name:
+        return "Paytm", _paytm_parser(account_map)
+    raise ValueError("Unknown statement type. File names must contain 'hdfc', 'icici' or 'paytm'.")
+
+def parse_statement_file(filename: str, file, account_map: dict) -> list:
+    """Parses a whole statement at once. Raises ValueError like `_statement_parser`."""
+    label, parse = _statement_parser(filename, account_map)
+    try:
+        df = _read_csv(file)
+    except Exception as e:
+        print(f"Pandas could not read the CSV file for {label}. Error: {e}")
+        return []
+    return parse(df)
+
+# --- CHUNKED STREAMING ---
+# Statements larger than UPLOAD_STREAM_THRESHOLD_MB are read, parsed and inserted
+# UPLOAD_CHUNK_ROWS rows at a time, so memory is bounded by the chunk size rather
+# than by the file size.
+CHUNK_ROWS = max(1, int(os.getenv("UPLOAD_CHUNK_ROWS", "5000")))
+STREAM_THRESHOLD_BYTES = int(float(os.getenv("UPLOAD_STREAM_THRESHOLD_MB", "5")) * 1024 * 1024)
+
+def _merge_dtypes(a: np.dtype, b: np.dtype) -> np.dtype:
+    """The dtype read_csv gives a column whose parts were inferred as a and b."""
+    if a == b:
+        return a
+    if a.kind in 'iuf' and b.kind in 'iuf':
+        return np.result_type(a, b)
+    return np.dtype(object)
+
+def _read_csv_chunks(file, chunk_rows: int):
+    """
+    Reads a CSV chunk_rows rows at a time. A first pass only infers each column's
+    type across the whole file, so every chunk gets the dtypes a single read_csv
+    would have (e.g. an integer column with blanks further down is float in every
+    chunk) and the rows, unique keys included, match a non-streamed parse.
+    """
+    source = getattr(file, 'file', file)
+    start = source.tell()
+    dtypes = {}
+    with pd.read_csv(source, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            for col, dtype in chunk.dtypes.items():
+                dtypes[col] = _merge_dtypes(dtypes.get(col, dtype), dtype)
+    source.seek(start)
+    with pd.read_csv(source, chunksize=chunk_rows, dtype=dtypes) as reader:
+        yield from reader
+
+def _parse_chunks(label: str, parse, file, chunk_rows: int):
+    chunks = _read_csv_chunks(file, chunk_rows)
+    while True:
         try:
-            account_str = str(row['Your Account'])
-            matched_account = next((acc_id for name, acc_id in account_map.items() if name in account_str), None)
-            if not matched_account: continue
-            
-            source_provider = next((name for name, acc_id in account_map.items() if acc_id == matched_account), "Unknown")
-            amount_val = pd.to_numeric(row.get('Amount'), errors='coerce')
-            if pd.isna(amount_val) or amount_val == 0: continue
-            amount, txn_type = abs(amount_val), 'credit' if amount_val > 0 else 'debit'
-            txn_date = datetime.strptime(f"{row['Date']} {row['Time']}", '%d/%m/%Y %H:%M:%S')
-            description = str(row['Transaction Details'])
-            upi_ref = str(int(row['UPI Ref No.'])) if pd.notna(row['UPI Ref No.']) else None
-            transactions.append({'txn_date': txn_date, 'description': description, 'amount': amount, 'type': txn_type, 'account_id': matched_account, 'source': source_provider, 'upi_ref': upi_ref, 'unique_key': None, 'raw_data': row.to_json(date_format='iso')})
+            df = next(chunks, None)
         except Exception as e:
-            print(f"Skipping Paytm row due to error: {e}")
-    return transactions
-
-# ✅ --- NEW HELPER LOGIC ---
-CATEGORY_ALIASES = { "miscellaneous": ["misc", "miscelleaneous"], "entertainment": ["ent"], "transportation": ["transport"] }
-
-def get_category_by_fuzzy_matching(remark: str, user_categories: dict) -> int | None:
-    remark = remark.lower().strip()
-    choices = {}
-    for cat_id, cat_name in user_categories.items():
-        cat_name_lower = cat_name.lower()
-        choices[cat_name_lower] = cat_id
-        if cat_name_lower in CATEGORY_ALIASES:
-            for alias in CATEGORY_ALIASES[cat_name_lower]:
-                choices[alias] = cat_id
-    best_match = fuzzy_process.extractOne(remark, choices.keys())
-    if best_match and best_match[1] >= 85: # 85% confidence threshold
-        return choices[best_match[0]]
-    return None
-
-def process_and_insert_transactions(db: Session, transactions: list, user_id: int) -> int:
-    existing_unique_keys = {res[0] for res in db.query(Transaction.unique_key).filter(Transaction.user_id == user_id, Transaction.unique_key.isnot(None)).all()}
-    
+            print(f"Pandas could not read the CSV file for {label}. Error: {e}")
+            return
+        if df is None:
+            return
+        yield parse(df)
+
+def iter_statement_chunks(filename: str, file, account_map: dict, chunk_rows: int | None = None):
+    """
+    Streaming counterpart of `parse_statement_file`: returns an iterator of parsed
+    row lists, one per chunk of at most chunk_rows (default CHUNK_ROWS) lines.
+    Raises ValueError up front for files that can't be processed.
+    """
+    label, parse = _statement_parser(filename, account_map)
+    return _parse_chunks(label, parse, file, chunk_rows or CHUNK_ROWS)
+
+# --- PARALLEL PARSING ---
+# Parsing is CPU-bound pandas work, so multi-file uploads are parsed in a bounded
+# process pool. Set UPLOAD_PARSE_PROCESSES=1 to parse in-process.
+PARSE_PROCESSES = max(1, int(os.getenv("UPLOAD_PARSE_PROCESSES", str(os.cpu_count() or 1))))
+_parse_pool = None
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        # 'spawn' keeps the children clear of the server's threads and open DB connections.
+        _parse_pool = ProcessPoolExecutor(max_workers=PARSE_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+    return _parse_pool
+
+def _parse_statement_path(filename: str, path: str, account_map: dict) -> list:
+    with open(path, "rb") as file:
+        return parse_statement_file(filename, file, account_map)
+
+def _outcome(parse, *args):
+    try:
+        return parse(*args)
+    except Exception as e:
+        return e
+
+def parse_statement_files(files: list, account_map: dict, on_parsed=None) -> list:
+    """
+    Parses several (filename, path) statements concurrently, each read from disk by its worker. Returns one
+    entry per file, in order: the parsed rows, or the exception the parser raised.
+    `on_parsed`, if given, is called as each file finishes (e.g. to report progress).
+    """
+    if PARSE_PROCESSES == 1 or len(files) <= 1:
+        results = []
+        for filename, path in files:
+            results.append(_outcome(_parse_statement_path, filename, path, account_map))
+            if on_parsed: on_parsed()
+        return results
+    pool = _get_parse_pool()
+    futures = [pool.submit(_parse_statement_path, filename, path, account_map) for filename, path in files]
+    for _ in as_completed(futures):
+        if on_parsed: on_parsed()
+    return [_outcome(future.result) for future in futures]
+
+# Rows are written in chunks of this size with one multi-row INSERT each.
+INSERT_CHUNK_SIZE = 1000
+ALLOCATE_TRANSACTION_IDS = text("SELECT nextval(pg_get_serial_sequence('transactions', 'id')) FROM generate_series(1, :n)")
+
+def _insert_chunk(db: Session, rows: list) -> list:
+    """
+    Inserts a chunk of transaction rows, letting Postgres skip any (user_id, unique_key)
+    that already exists. Returns the positions in `rows` of the rows actually inserted.
+    Ids are drawn from the sequence up front so each inserted transaction's original
+    statement row can be written to `transaction_raw_data` under the right id.
+    """
+    ids = db.execute(ALLOCATE_TRANSACTION_IDS, {"n": len(rows)}).scalars().all()
+    raw_by_id, position_by_id = {}, {}
+    for position, (txn_id, row) in enumerate(zip(ids, rows)):
+        row['id'] = txn_id
+        position_by_id[txn_id] = position
+        raw = row.pop('raw_data', None)
+        raw_by_id[txn_id] = json.loads(raw) if isinstance(raw, str) else raw
+    stmt = pg_insert(Transaction).values(rows).on_conflict_do_nothing(
+        index_elements=[Transaction.user_id, Transaction.unique_key]
+    ).returning(Transaction.id)
+    inserted = db.execute(stmt).scalars().all()
+    raw_rows = [{'transaction_id': txn_id, 'data': raw_by_id[txn_id]} for txn_id in inserted if raw_by_id[txn_id] is not None]
+    if raw_rows:
+        db.execute(pg_insert(TransactionRawData).values(raw_rows))
+    return [position_by_id[txn_id] for txn_id in inserted]
+
+def categorize_transactions(db: Session, transactions: list, user_id: int):
+    """
+    Assigns a category (and merchant, when a rule matched) to parsed statement rows, in date
+    order. Returns the rows ready for `insert_transactions` and, by row index, the remark
+    names that matched none of the user's categories.
+    """
     merchants_map = {m.name: m.id for m in db.query(Merchant).filter(Merchant.user_id == user_id).all()}
     user_categories_db = db.query(Category).filter(Category.user_id == user_id).all()
     user_categories_map = {cat.id: cat.name for cat in user_categories_db}
+    category_lookup = category_ids_by_name(user_categories_map)
+    rules = RULE_CATEGORIZER.bind(merchants_map, category_lookup)
+    misc_cat_id = category_lookup.get('miscellaneous')
     
-    inserted_count = 0
-    newly_found_categories = set()
+    unmatched_remarks = {}
+    rows = []
 
-    for txn_data in sorted(transactions, key=lambda x: x['txn_date']):
-        if (txn_data.get('unique_key') and txn_data['unique_key'] in existing_unique_keys):
-            continue
-            
+    transactions = sorted(transactions, key=lambda x: x['txn_date'])
+    # All remarks in the upload are fuzzy-matched together, once per distinct remark.
+    remarks = [REMARK_PATTERN.search(txn_data['description']) for txn_data in transactions]
+    remark_categories = get_category_matcher(user_id, user_categories_map).match_many(
+        m.group(1) for m in remarks if m
+    )
+
+    for txn_data, remark_match in zip(transactions, remarks):
         detected_merchant_id, detected_category_id = None, None
         desc = txn_data['description']
         
         # ✅ --- NEW: Smart categorization from user remarks ---
-        remark_match = re.search(r'/([^/]+)/', desc, re.IGNORECASE)
         if remark_match:
             user_remark = remark_match.group(1)
-            matched_id = get_category_by_fuzzy_matching(user_remark, user_categories_map)
+            matched_id = remark_categories[user_remark]
             if matched_id:
                 detected_category_id = matched_id
             else:
-                newly_found_categories.add(user_remark.strip().title())
+                unmatched_remarks[len(rows)] = user_remark.strip().title()
 
         # ✅ --- MODIFIED: Fallback logic if remark parsing fails ---
         if not detected_category_id:
-            desc_lower = desc.lower()
-            if any(keyword in desc_lower for keyword in TRANSFER_KEYWORDS):
-                transfer_cat_id = next((_id for _id, name in user_categories_map.items() if name.lower() == 'transfers'), None)
-                if transfer_cat_id: detected_category_id = transfer_cat_id
-            else:
-                for keyword, (merchant_name, category_name) in MERCHANT_CATEGORY_RULES.items():
-                    if keyword in desc_lower:
-                        detected_merchant_id = merchants_map.get(merchant_name)
-                        cat_id = next((_id for _id, name in user_categories_map.items() if name.lower() == category_name.lower()), None)
-                        if cat_id: detected_category_id = cat_id
-                        if detected_merchant_id or detected_category_id: break
+            detected_merchant_id, detected_category_id = rules.match(desc)
         
         # ✅ --- MODIFIED: Default to Miscellaneous if all else fails ---
         if not detected_category_id:
-            misc_cat_id = next((_id for _id, name in user_categories_map.items() if name.lower() == 'miscellaneous'), None)
-            if misc_cat_id: detected_category_id = misc_cat_id
+            detected_category_id = misc_cat_id
 
-        raw_data_json_str = txn_data.pop('raw_data', '{}')
-        txn = Transaction(**txn_data, user_id=user_id, category_id=detected_category_id, merchant_id=detected_merchant_id, raw_data=json.loads(raw_data_json_str))
-        db.add(txn)
-        inserted_count += 1
-        
-        if txn_data.get('unique_key'): existing_unique_keys.add(txn_data['unique_key'])
+        rows.append({**txn_data, 'user_id': user_id, 'category_id': detected_category_id, 'merchant_id': detected_merchant_id})
+    return rows, unmatched_remarks
+
+def insert_transactions(db: Session, rows: list) -> list:
+    """Bulk-inserts categorized rows, INSERT_CHUNK_SIZE at a time. Returns the indexes of the new ones."""
+    inserted = []
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        inserted += [start + position for position in _insert_chunk(db, [dict(row) for row in rows[start:start + INSERT_CHUNK_SIZE]])]
+    return inserted
+
+def process_and_insert_transactions(db: Session, transactions: list, user_id: int, commit: bool = True) -> dict:
+    """
+    Categorizes parsed statement rows and bulk-inserts them for the user.
+    Duplicates are resolved by the `_user_id_unique_key_uc` constraint at insert time, so
+    existing keys are never loaded and a concurrent upload of the same rows is skipped
+    instead of failing the whole batch. Returns {"inserted": n, "skipped": n}.
+    Pass commit=False to leave the commit to the caller.
+    """
+    rows, unmatched_remarks = categorize_transactions(db, transactions, user_id)
+    inserted = insert_transactions(db, rows)
+    inserted_count = len(inserted)
+    # Only remarks of rows inserted now: a re-uploaded row's remark was alerted the first
+    # time, and that alert may since have been dismissed.
+    newly_found_categories = {unmatched_remarks[i] for i in inserted if i in unmatched_remarks}
+    skipped_count = len(transactions) - inserted_count
+    if inserted_count:
+        # Rows are sorted by date, so this is the span the new rows can fall in.
+        spend_rollup_service.refresh_daily_spend(db, user_id, rows[0]['txn_date'], rows[-1]['txn_date'])
+        alert_service.evaluate_budget_alerts(db, user_id, rows[0]['txn_date'], rows[-1]['txn_date'])
+        bump_data_version(db, user_id)
 
     # ✅ --- NEW: Create alerts after processing all transactions ---
     for cat_name in newly_found_categories:
         alert_crud.create_new_category_alert(db, user_id=user_id, category_name=cat_name)
 
     # ✅ --- MODIFIED: Commit if new transactions OR new categories were found ---
-    if inserted_count > 0 or newly_found_categories:
+    if commit and (inserted_count > 0 or newly_found_categories):
         db.commit()
 
-    print(f"✅ Committed {inserted_count} new transactions and found {len(newly_found_categories)} new categories for user {user_id}.")
-    return inserted_count
\ No newline at end of file
+    print(f"✅ Committed {inserted_count} new transactions ({skipped_count} duplicates skipped) and found {len(newly_found_categories)} new categories for user {user_id}.")
+    return {"inserted": inserted_count, "skipped": skipped_count}
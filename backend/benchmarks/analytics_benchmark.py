@@ -0,0 +1,59 @@
+# File: benchmarks/analytics_benchmark.py
+"""
+Database round trips and p50/p95 latency of `get_analytics_data` for the user
+with the most transactions in DATABASE_URL, per time period. Optionally seeds
+synthetic statement rows first. --panels times a subset of the payload, the way a
+single chart requests it.
+
+Run from the backend/ directory:
+    python -m benchmarks.analytics_benchmark --seed-rows 100000 --repeat 30
+    python -m benchmarks.analytics_benchmark --panels transactionHeatmap
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import event, func
+
+from app.db.session import SessionLocal, engine
+from app.models.transaction import Transaction
+from app.services.analytics_service import get_analytics_data
+from benchmarks.transaction_list_benchmark import seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed-rows", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--panels", default=None, help="comma-separated panel keys (default: all)")
+    args = parser.parse_args()
+    panels = args.panels.split(",") if args.panels else None
+
+    queries = [0]
+    def count_query(*_):
+        queries[0] += 1
+    event.listen(engine, "before_cursor_execute", count_query)
+
+    db = SessionLocal()
+    try:
+        if args.seed_rows:
+            seed(db, args.seed_rows)
+        user_id, count = db.query(Transaction.user_id, func.count()).group_by(Transaction.user_id).order_by(func.count().desc()).first()
+        latest_month = db.query(func.max(Transaction.txn_date)).filter(Transaction.user_id == user_id).scalar().strftime("%Y-%m")
+        print(f"user {user_id}: {count} transactions")
+        print(f"{'period':<10}{'queries':>8}{'p50 ms':>9}{'p95 ms':>9}")
+        for period in [latest_month, "6m", "1y", "all"]:
+            samples = []
+            for _ in range(args.repeat):
+                queries[0] = 0
+                started = time.perf_counter()
+                get_analytics_data(db, period, False, user_id, panels=panels)
+                samples.append((time.perf_counter() - started) * 1000)
+            p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+            print(f"{period:<10}{queries[0]:>8}{statistics.median(samples):>9.1f}{p95:>9.1f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
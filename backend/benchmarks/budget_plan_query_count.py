@@ -0,0 +1,110 @@
+# File: benchmarks/budget_plan_query_count.py
+"""
+Database round trips of `get_budget_plan`, of the budget alert evaluation run by
+writes (`evaluate_budget_alerts`) and of saving the whole plan (`update_budget_plan`,
+every budget changed and one zeroed; also its p50 latency) for the current month,
+as the number of budgeted categories grows, for a throwaway user seeded in
+DATABASE_URL (spend at 50-120% of each budget, so the first evaluation creates
+alerts and the second finds them). Exits 1 if a count changes with the number of
+categories, i.e. if a per-category or per-goal query has crept back in. The user
+is deleted afterwards.
+
+Run from the backend/ directory:
+    python -m benchmarks.budget_plan_query_count --sizes 5 20 80
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import date
+
+from sqlalchemy import event
+
+from app.db.session import SessionLocal, engine
+from app.models import Alert, Category, DailySpend, Goal, MonthlySpend, MonthSnapshot
+from app.models.user import User
+from app.services.alert_service import evaluate_budget_alerts
+from app.schemas.budget_plan_schema import BudgetPlanUpdate
+from app.services.budget_plan_service import get_budget_plan, update_budget_plan
+
+SPEND_RATIOS = [0.5, 0.8, 0.95, 1.2]
+
+
+def seed(db, categories: int, month_start: date) -> int:
+    user = User(username=f"plan-count-{categories}", email=f"plan-count-{categories}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    for i in range(categories):
+        category = Category(name=f"Category {i}", is_income=False, user_id=user.id)
+        db.add(category)
+        db.flush()
+        db.add(Goal(category_id=category.id, month=month_start.strftime("%Y-%m"), limit_amount=1000, user_id=user.id))
+        spent = 1000 * SPEND_RATIOS[i % len(SPEND_RATIOS)]
+        db.add(DailySpend(user_id=user.id, day=month_start, category_id=category.id, type="debit", excluded=False,
+                          total=spent, txn_count=1, small_total=0, large_total=spent))
+        db.add(MonthlySpend(user_id=user.id, month=month_start, category_id=category.id, total=spent, txn_count=1))
+    db.commit()
+    return user.id
+
+def remove(db, user_id: int):
+    for model in (Alert, Goal, DailySpend, MonthlySpend, MonthSnapshot, Category):
+        db.query(model).filter(model.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 20, 80])
+    parser.add_argument("--repeat", type=int, default=10, help="plan saves timed per size")
+    args = parser.parse_args()
+
+    queries = [0]
+    def count_query(*_):
+        queries[0] += 1
+    event.listen(engine, "before_cursor_execute", count_query)
+
+    month_start = date.today().replace(day=1)
+    month = month_start.strftime("%Y-%m")
+    counts = {}
+    db = SessionLocal()
+    print(f"{'categories':>10}{'plan q':>8}{'alerts':>8}{'1st eval q':>12}{'2nd eval q':>12}{'save q':>8}{'save ms':>9}")
+    for size in args.sizes:
+        user_id = seed(db, size, month_start)
+        try:
+            runs = []
+            for fn in (lambda: get_budget_plan(db, month, user_id),
+                       lambda: evaluate_budget_alerts(db, user_id, month_start), lambda: evaluate_budget_alerts(db, user_id, month_start)):
+                queries[0] = 0
+                fn()
+                runs.append(queries[0])
+            alerts = db.query(Alert).filter(Alert.user_id == user_id).count()
+
+            category_ids = [category_id for (category_id,) in db.query(Category.id).filter(Category.user_id == user_id).all()]
+            save_ms = []
+            for attempt in range(args.repeat):
+                limit_amount = 2000 + attempt % 2
+                plan = BudgetPlanUpdate(month=month, budgets=[
+                    {"category_id": category_id, "limit_amount": 0 if category_id == category_ids[-1] else limit_amount}
+                    for category_id in category_ids
+                ])
+                queries[0] = 0
+                started = time.perf_counter()
+                update_budget_plan(db, plan, user_id)
+                save_ms.append((time.perf_counter() - started) * 1000)
+                if attempt == 0:
+                    runs.append(queries[0])
+            counts[size] = tuple(runs)
+            print(f"{size:>10}{runs[0]:>8}{alerts:>8}{runs[1]:>12}{runs[2]:>12}{runs[3]:>8}{statistics.median(save_ms):>9.1f}")
+        finally:
+            db.rollback()
+            remove(db, user_id)
+    db.close()
+
+    if len(set(counts.values())) > 1:
+        print("FAIL: query count grows with the number of categories")
+        sys.exit(1)
+    print("OK: constant query count")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# File: benchmarks/etag_benchmark.py
+"""
+Repeat navigation over the read endpoints for the user with the most
+transactions in DATABASE_URL, through the full app: p50 latency and body bytes
+of a plain GET (200) vs a revalidation with the ETag it returned (304). The
+in-process response cache is turned off, so the 200s measure the real work.
+
+Run from the backend/ directory:
+    python -m benchmarks.etag_benchmark --repeat 30
+"""
+import argparse
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.main import app as api
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services import response_cache_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_id, count = db.query(Transaction.user_id, func.count()).group_by(Transaction.user_id).order_by(func.count().desc()).first()
+        email = db.get(User, user_id).email
+        month = db.query(func.max(Transaction.txn_date)).filter(Transaction.user_id == user_id).scalar().strftime("%Y-%m")
+    finally:
+        db.close()
+    print(f"user {user_id}: {count} transactions")
+
+    response_cache_service.RESPONSE_CACHE_MAX_BYTES = 0
+    client = TestClient(api)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+    endpoints = [
+        ("/dashboard", {"month": month}), ("/analytics", {"time_period": "6m"}), ("/budgets/plan", {"month": month}),
+        ("/transactions", {"page": 1, "limit": 50}), ("/categories", {}), ("/tags", {}), ("/accounts", {}),
+    ]
+    print(f"{'endpoint':<15}{'200 ms':>8}{'bytes':>8}{'304 ms':>8}{'bytes':>6}")
+    totals = [0, 0, 0.0, 0.0]
+    for path, params in endpoints:
+        full, revalidated = [], []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            response = client.get("/api/v1" + path, params=params, headers=headers)
+            full.append(time.perf_counter() - started)
+            etag, full_bytes = response.headers["ETag"], len(response.content)
+            started = time.perf_counter()
+            response = client.get("/api/v1" + path, params=params, headers={**headers, "If-None-Match": etag})
+            revalidated.append(time.perf_counter() - started)
+            assert response.status_code == 304, response.status_code
+        full_ms, revalidated_ms = statistics.median(full) * 1000, statistics.median(revalidated) * 1000
+        totals = [totals[0] + full_bytes, totals[1] + len(response.content), totals[2] + full_ms, totals[3] + revalidated_ms]
+        print(f"{path:<15}{full_ms:>8.1f}{full_bytes:>8}{revalidated_ms:>8.1f}{len(response.content):>6}")
+    print(f"{'all screens':<15}{totals[2]:>8.1f}{totals[0]:>8}{totals[3]:>8.1f}{totals[1]:>6}")
+
+
+if __name__ == "__main__":
+    main()
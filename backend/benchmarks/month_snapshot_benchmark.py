@@ -0,0 +1,73 @@
+# File: benchmarks/month_snapshot_benchmark.py
+"""
+p50/p95 latency and database round trips of the dashboard and budget plan for a
+closed month, built from the rollup (its snapshot deleted first) vs served from
+`month_snapshots`, for the user with the most transactions in DATABASE_URL.
+Commits: snapshots are written and deleted for that user.
+
+Run from the backend/ directory:
+    python -m benchmarks.month_snapshot_benchmark --repeat 30
+"""
+import argparse
+import statistics
+import time
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import event, func
+
+from app.db.session import SessionLocal, engine
+from app.models.month_snapshot import MonthSnapshot
+from app.models.transaction import Transaction
+from app.services.budget_plan_service import get_budget_plan
+from app.services.dashboard_service import get_dashboard_data
+
+
+def _p50_p95(samples):
+    p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+    return statistics.median(samples), p95
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    queries = [0]
+    def count_query(*_):
+        queries[0] += 1
+    event.listen(engine, "before_cursor_execute", count_query)
+
+    db = SessionLocal()
+    try:
+        user_id, count = db.query(Transaction.user_id, func.count()).group_by(Transaction.user_id).order_by(func.count().desc()).first()
+        latest = db.query(func.max(Transaction.txn_date)).filter(Transaction.user_id == user_id).scalar()
+        month = (latest.replace(day=1) - relativedelta(months=1)).strftime("%Y-%m")
+        print(f"user {user_id}: {count} transactions, closed month {month}")
+        cases = [
+            ("dashboard", lambda: get_dashboard_data(db, month, user_id)),
+            ("budget_plan", lambda: get_budget_plan(db, month, user_id)),
+        ]
+        print(f"{'view':<13}{'built q':>8}{'p50 ms':>8}{'p95 ms':>8}{'snap q':>8}{'p50 ms':>8}{'p95 ms':>8}")
+        for name, fn in cases:
+            built, served = [], []
+            for _ in range(args.repeat):
+                db.query(MonthSnapshot).filter(MonthSnapshot.user_id == user_id, MonthSnapshot.kind == name).delete()
+                db.commit()
+                queries[0] = 0
+                started = time.perf_counter()
+                fn()
+                built.append(time.perf_counter() - started)
+                built_queries = queries[0]
+                queries[0] = 0
+                started = time.perf_counter()
+                fn()
+                served.append(time.perf_counter() - started)
+                served_queries = queries[0]
+                db.rollback()
+            (b50, b95), (s50, s95) = _p50_p95(built), _p50_p95(served)
+            print(f"{name:<13}{built_queries:>8}{b50 * 1000:>8.1f}{b95 * 1000:>8.1f}{served_queries:>8}{s50 * 1000:>8.1f}{s95 * 1000:>8.1f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# File: benchmarks/multifile_benchmark.py
+"""
+Wall time to parse a multi-file upload (a year of monthly statements) with the
+parse pool at different sizes. 1 process is the old one-file-at-a-time path.
+
+Run from the backend/ directory:
+    python -m benchmarks.multifile_benchmark --files 12 --rows 5000 --processes 1 2 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.services import upload_service
+from benchmarks.parse_benchmark import PAYTM_ACCOUNTS, make_hdfc_csv, make_icici_csv, make_paytm_csv
+
+
+def make_upload(files: int, rows: int) -> list:
+    makers = [("hdfc", make_hdfc_csv), ("icici", make_icici_csv), ("paytm", make_paytm_csv)]
+    upload = []
+    for i in range(files):
+        prefix, make = makers[i % len(makers)]
+        upload.append((f"{prefix}_{i + 1:02d}.csv", make(rows, seed=i)))
+    return upload
+
+def write_upload(upload: list, directory: str) -> list:
+    """Writes (filename, content) pairs to `directory`, as the job stages them; returns (filename, path) pairs."""
+    staged = []
+    for filename, content in upload:
+        path = os.path.join(directory, filename)
+        with open(path, "wb") as f:
+            f.write(content)
+        staged.append((filename, path))
+    return staged
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    staging = tempfile.TemporaryDirectory()
+    upload = write_upload(make_upload(args.files, args.rows), staging.name)
+    account_map = dict(PAYTM_ACCOUNTS)
+    print(f"{args.files} files x {args.rows} rows, {os.cpu_count()} CPU(s)")
+    print(f"{'processes':>10}{'wall s':>10}{'rows/s':>12}")
+    baseline = None
+    for processes in args.processes:
+        upload_service.PARSE_PROCESSES, upload_service._parse_pool = processes, None
+        if processes > 1:
+            # Warm the pool up so the timing doesn't include interpreter start-up.
+            upload_service.parse_statement_files(upload[:processes], account_map)
+        started = time.perf_counter()
+        results = upload_service.parse_statement_files(upload, account_map)
+        elapsed = time.perf_counter() - started
+        errors = [r for r in results if isinstance(r, Exception)]
+        assert not errors, errors
+        rows = sum(len(r) for r in results)
+        baseline = baseline or results
+        assert results == baseline, "parallel output differs from the in-process output"
+        print(f"{processes:>10}{elapsed:>10.2f}{rows / elapsed:>12,.0f}")
+        if upload_service._parse_pool is not None:
+            upload_service._parse_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# File: benchmarks/parallel_query_benchmark.py
+"""
+p50/p95 latency of `get_dashboard_data` with its independent queries run in
+sequence on one session vs side by side on pooled connections (PARALLEL_QUERIES),
+for the user with the most transactions in DATABASE_URL. For the sequential runs
+it also reports the summed and the slowest statement time, the two bounds the
+parallel mode sits between. The gain comes from overlapping round trips, so
+measure it against the database as deployed, not over a local socket.
+
+Run from the backend/ directory:
+    python -m benchmarks.parallel_query_benchmark --seed-rows 100000 --repeat 30
+"""
+import argparse
+import statistics
+import time
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import event, func
+
+from app.db.session import SessionLocal, engine
+from app.models.transaction import Transaction
+from app.services import parallel_query_service
+from app.services.dashboard_service import get_dashboard_data
+from benchmarks.transaction_list_benchmark import seed
+
+
+def _p50_p95(samples):
+    p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+    return statistics.median(samples), p95
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed-rows", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    statement_ms = []
+    def before(conn, *_):
+        conn.info["query_started"] = time.perf_counter()
+    def after(conn, *_):
+        statement_ms.append((time.perf_counter() - conn.info.pop("query_started")) * 1000)
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+
+    db = SessionLocal()
+    try:
+        if args.seed_rows:
+            seed(db, args.seed_rows)
+        user_id, count = db.query(Transaction.user_id, func.count()).group_by(Transaction.user_id).order_by(func.count().desc()).first()
+        latest = db.query(func.max(Transaction.txn_date)).filter(Transaction.user_id == user_id).scalar()
+        print(f"user {user_id}: {count} transactions, {parallel_query_service.PARALLEL_QUERY_WORKERS} workers")
+        months = [latest.strftime("%Y-%m"), (latest.replace(day=1) - relativedelta(months=1)).strftime("%Y-%m")]
+        cases = [(f"dashboard {month}", lambda month=month: get_dashboard_data(db, month, user_id)) for month in months]
+        print(f"{'case':<20}{'sum ms':>8}{'max ms':>8}{'seq p50':>9}{'seq p95':>9}{'par p50':>9}{'par p95':>9}")
+        for name, fn in cases:
+            timings = {}
+            for parallel in (False, True):
+                parallel_query_service.PARALLEL_QUERIES = parallel
+                fn()  # warm up the pool connections
+                samples, sums, slowest = [], [], []
+                for _ in range(args.repeat):
+                    statement_ms.clear()
+                    started = time.perf_counter()
+                    fn()
+                    samples.append((time.perf_counter() - started) * 1000)
+                    if not parallel:
+                        sums.append(sum(statement_ms))
+                        slowest.append(max(statement_ms))
+                timings[parallel] = _p50_p95(samples)
+                if not parallel:
+                    statements = (statistics.median(sums), statistics.median(slowest))
+            print(f"{name:<20}{statements[0]:>8.1f}{statements[1]:>8.1f}"
+                  f"{timings[False][0]:>9.1f}{timings[False][1]:>9.1f}{timings[True][0]:>9.1f}{timings[True][1]:>9.1f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# File: benchmarks/parse_benchmark.py
+"""
+Rows/sec for the statement parsers, before (row-by-row `iterrows`) and after
+(column-at-a-time) for the HDFC, ICICI and Paytm layouts.
+
+Run from the backend/ directory:
+    python -m benchmarks.parse_benchmark --rows 20000
+"""
+import argparse
+import io
+import re
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from app.services import upload_service
+from benchmarks.statement_generator import make_hdfc_csv, make_icici_csv, make_paytm_csv
+
+HDFC_ARGS = upload_service.HDFC_LAYOUT
+ICICI_ARGS = upload_service.ICICI_LAYOUT
+PAYTM_ACCOUNTS = {"HDFC Bank": 1, "ICICI Bank": 2}
+
+
+class _Upload:
+    """Stands in for FastAPI's UploadFile, which only exposes `.file` to the parsers."""
+    def __init__(self, data: bytes):
+        self.file = io.BytesIO(data)
+
+
+# --- Legacy row-by-row parsers, kept only as the "before" baseline ---
+def legacy_parse_generic_statement(file, account_id, source, date_col, desc_col, debit_col, credit_col, ref_col=None, unique_id_col=None):
+    df = pd.read_csv(file.file)
+    clean_col = lambda c: c.strip().replace('.', '')
+    df.columns = [clean_col(c) for c in df.columns]
+    date_col, desc_col, debit_col, credit_col = map(clean_col, [date_col, desc_col, debit_col, credit_col])
+    if ref_col: ref_col = clean_col(ref_col)
+    if unique_id_col: unique_id_col = clean_col(unique_id_col)
+    transactions = []
+    for index, row in df.iterrows():
+        if pd.isna(row.get(date_col)): continue
+        try:
+            withdrawal_amt, deposit_amt = pd.to_numeric(row.get(debit_col), errors='coerce'), pd.to_numeric(row.get(credit_col), errors='coerce')
+            withdrawal_amt, deposit_amt = (withdrawal_amt if pd.notna(withdrawal_amt) else 0.0), (deposit_amt if pd.notna(deposit_amt) else 0.0)
+            if withdrawal_amt > 0: amount, txn_type = withdrawal_amt, 'debit'
+            elif deposit_amt > 0: amount, txn_type = deposit_amt, 'credit'
+            else: continue
+            txn_date, description = pd.to_datetime(row[date_col], dayfirst=True), str(row[desc_col])
+            upi_ref = re.search(r'(\d{12})', description).group(1) if 'UPI' in description and re.search(r'(\d{12})', description) else None
+            unique_key_part = str(row[unique_id_col]) if unique_id_col and pd.notna(row.get(unique_id_col)) else (str(row.get(ref_col, '')) if ref_col else f"{description[:10]}-{index}")
+            unique_key = f"{source}-{unique_key_part}-{txn_date.strftime('%Y%m%d')}-{amount:.2f}"
+            transactions.append({'txn_date': txn_date, 'description': description, 'amount': amount, 'type': txn_type, 'account_id': account_id, 'source': source, 'upi_ref': upi_ref, 'unique_key': unique_key, 'raw_data': row.to_json(date_format='iso')})
+        except Exception:
+            pass
+    return transactions
+
+def legacy_parse_paytm_statement(file, account_map):
+    df = pd.read_csv(file.file)
+    df.columns = [c.strip() for c in df.columns]
+    transactions = []
+    for _, row in df.iterrows():
+        if pd.isna(row.get('Date')) or "This is not included" in str(row.get('Remarks', '')): continue
+        try:
+            account_str = str(row['Your Account'])
+            matched_account = next((acc_id for name, acc_id in account_map.items() if name in account_str), None)
+            if not matched_account: continue
+            source_provider = next((name for name, acc_id in account_map.items() if acc_id == matched_account), "Unknown")
+            amount_val = pd.to_numeric(row.get('Amount'), errors='coerce')
+            if pd.isna(amount_val) or amount_val == 0: continue
+            amount, txn_type = abs(amount_val), 'credit' if amount_val > 0 else 'debit'
+            txn_date = datetime.strptime(f"{row['Date']} {row['Time']}", '%d/%m/%Y %H:%M:%S')
+            description = str(row['Transaction Details'])
+            upi_ref = str(int(row['UPI Ref No.'])) if pd.notna(row['UPI Ref No.']) else None
+            transactions.append({'txn_date': txn_date, 'description': description, 'amount': amount, 'type': txn_type, 'account_id': matched_account, 'source': source_provider, 'upi_ref': upi_ref, 'unique_key': None, 'raw_data': row.to_json(date_format='iso')})
+        except Exception:
+            pass
+    return transactions
+
+
+def _bench(label: str, fn, data: bytes, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(_Upload(data))
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    layouts = [
+        ("HDFC", make_hdfc_csv(args.rows),
+         lambda f: legacy_parse_generic_statement(f, 1, **HDFC_ARGS), lambda f: upload_service.parse_generic_statement(f, 1, **HDFC_ARGS)),
+        ("ICICI", make_icici_csv(args.rows),
+         lambda f: legacy_parse_generic_statement(f, 2, **ICICI_ARGS), lambda f: upload_service.parse_generic_statement(f, 2, **ICICI_ARGS)),
+        ("Paytm", make_paytm_csv(args.rows),
+         lambda f: legacy_parse_paytm_statement(f, PAYTM_ACCOUNTS), lambda f: upload_service.parse_paytm_statement(f, PAYTM_ACCOUNTS)),
+    ]
+    print(f"{'layout':<8}{'rows':>9}{'before rows/s':>16}{'after rows/s':>16}{'speedup':>10}  outputs")
+    for name, data, before_fn, after_fn in layouts:
+        before, before_s = _bench(name, before_fn, data, args.repeat)
+        after, after_s = _bench(name, after_fn, data, args.repeat)
+        match = "identical" if before == after else "DIFFERENT"
+        print(f"{name:<8}{args.rows:>9}{args.rows / before_s:>16,.0f}{args.rows / after_s:>16,.0f}{before_s / after_s:>9.1f}x  {match}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# File: benchmarks/query_plan_check.py
+"""
+EXPLAINs the SQL the dashboard, analytics, budget, alert, transaction list and
+rollup paths really send, for one user in DATABASE_URL, and fails (exit 1) unless
+every read of `transactions`, `daily_spend`, `monthly_spend` and
+`category_spend_averages` is an index scan on one of the indexes expected for that path.
+
+The statements are captured while the services run inside a transaction that is
+rolled back, then re-sent as `EXPLAIN (FORMAT JSON)` with the same parameters.
+The planner only prefers indexes once there is data, so seed a few users first
+(rows are generated in SQL and committed; run it again without --seed-users to
+re-check the same data):
+
+Run from the backend/ directory:
+    python -m benchmarks.query_plan_check --seed-users 20 --rows-per-user 20000
+"""
+import argparse
+import re
+import sys
+import uuid
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import event, func, text
+from sqlalchemy.orm import Session
+
+from app.crud import goal_crud
+from app.db.session import engine
+from app.models.account import Account
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services import alert_service, spend_rollup_service
+from app.services.analytics_service import get_analytics_data
+from app.services.budget_plan_service import get_budget_plan
+from app.services.dashboard_service import get_dashboard_data
+from app.services.transaction_service import get_filtered_transactions
+
+CHECKED_TABLES = ("transactions", "daily_spend", "monthly_spend", "category_spend_averages")
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+ROLLUP_READ = {"daily_spend": {"ix_daily_spend_user_type_day"}}
+# The (user_id, day, ...) unique key serves single-category month lookups as well.
+ROLLUP_LOOKUP = {"daily_spend": {"ix_daily_spend_user_type_day", "_daily_spend_key_uc"}}
+COUNTER_LOOKUP = {"monthly_spend": {"_monthly_spend_key_uc"}}
+AVERAGES_LOOKUP = {"category_spend_averages": {"_category_spend_average_key_uc"}}
+CATEGORY_NAMES = ["Food", "Travel", "Shopping", "Bills", "Transfers", "Entertainment", "Health", "Salary"]
+SEED_TRANSACTIONS = text("""
+    INSERT INTO transactions (txn_date, description, amount, type, source, account_id, category_id, user_id, unique_key, excluded)
+    SELECT date_trunc('day', CAST(:first_day AS timestamp) + random() * (:span_days * interval '1 day')),
+           'plan check ' || g, round((random() * random() * 5000)::numeric, 2),
+           CASE WHEN random() < 0.85 THEN 'debit' ELSE 'credit' END, 'plan-check', :account_id,
+           (CAST(:category_ids AS int[]))[1 + floor(random() * :category_count)::int], :user_id,
+           'plan-check-' || g, random() < 0.02
+    FROM generate_series(1, :rows) g
+""")
+
+
+def seed(users: int, rows_per_user: int, span_days: int = 3 * 365):
+    tag = uuid.uuid4().hex[:8]
+    first_day = date.today() - relativedelta(days=span_days)
+    with Session(engine) as db:
+        for i in range(users):
+            user = User(username=f"plan-check-{tag}-{i}", email=f"plan-check-{tag}-{i}@example.com", hashed_password="x")
+            db.add(user)
+            db.flush()
+            account = Account(name="HDFC Bank", type="bank", provider="HDFC", user_id=user.id)
+            categories = [Category(name=name, is_income=name == "Salary", user_id=user.id) for name in CATEGORY_NAMES]
+            db.add_all([account] + categories)
+            db.flush()
+            db.execute(SEED_TRANSACTIONS, {
+                "first_day": first_day, "span_days": span_days, "account_id": account.id, "user_id": user.id,
+                "category_ids": [c.id for c in categories], "category_count": len(categories), "rows": rows_per_user,
+            })
+            spend_rollup_service.refresh_daily_spend(db, user.id)
+            db.commit()
+    print(f"seeded {users} users x {rows_per_user} transactions")
+
+def _capture(fn) -> list:
+    statements = []
+    def listen(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and re.search(r"\b(%s)\b" % "|".join(CHECKED_TABLES), statement):
+            statements.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", listen)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listen)
+    return statements
+
+def _scans(plan: dict):
+    """(node type, relation, index) for every node that reads a checked table."""
+    if plan.get("Relation Name") in CHECKED_TABLES and plan["Node Type"].endswith("Scan"):
+        index = plan.get("Index Name") or ", ".join(
+            child.get("Index Name", "") for child in plan.get("Plans", []) if child["Node Type"] == "Bitmap Index Scan")
+        yield plan["Node Type"], plan["Relation Name"], index
+    for child in plan.get("Plans", []):
+        yield from _scans(child)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed-users", type=int, default=0)
+    parser.add_argument("--rows-per-user", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.seed_users:
+        seed(args.seed_users, args.rows_per_user)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE transactions"))
+        conn.execute(text("VACUUM ANALYZE daily_spend"))
+        conn.execute(text("VACUUM ANALYZE monthly_spend"))
+        conn.execute(text("VACUUM ANALYZE category_spend_averages"))
+
+    connection = engine.connect()
+    outer = connection.begin()
+    # Commits inside the services only release a savepoint; everything is rolled back below.
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        user_id = db.query(Transaction.user_id).group_by(Transaction.user_id).order_by(func.count().desc()).limit(1).scalar()
+        latest = db.query(func.max(Transaction.txn_date)).filter(Transaction.user_id == user_id).scalar().date()
+        month, month_start = latest.strftime("%Y-%m"), latest.replace(day=1)
+        category_id = db.query(Category.id).filter(Category.user_id == user_id, Category.is_income == False).order_by(Category.id).limit(1).scalar()
+        print(f"user {user_id}, month {month}, {db.query(Transaction).count()} transactions in total")
+
+        def budget_plan_with_goal():
+            goal_crud.upsert_budget_for_category(db, category_id, month, 5000, user_id)
+            get_budget_plan(db, month, user_id)
+        # (name, call, {table: indexes it may be read through})
+        cases = [
+            ("dashboard", lambda: get_dashboard_data(db, month, user_id),
+             {**ROLLUP_READ, "transactions": {"ix_transactions_user_excluded_date"}}),
+            ("analytics month", lambda: get_analytics_data(db, month, False, user_id), ROLLUP_READ),
+            ("analytics 6m", lambda: get_analytics_data(db, "6m", False, user_id), ROLLUP_READ),
+            ("analytics heatmap", lambda: get_analytics_data(db, "6m", False, user_id, panels=["transactionHeatmap"]), ROLLUP_READ),
+            ("analytics by category", lambda: get_analytics_data(db, "6m", False, user_id, panels=["categoryDistribution"]), ROLLUP_READ),
+            ("budget plan history", lambda: get_budget_plan(db, (month_start + relativedelta(months=1)).strftime("%Y-%m"), user_id), AVERAGES_LOOKUP),
+            ("budget plan", budget_plan_with_goal, {**ROLLUP_LOOKUP, **COUNTER_LOOKUP}),
+            ("budget alert total", lambda: alert_service.get_total_spend_for_category_in_month(db, user_id, category_id, month), COUNTER_LOOKUP),
+            ("transaction list", lambda: get_filtered_transactions(db, {"page": 1, "limit": 10}, user_id),
+             {"transactions": {"ix_transactions_user_date"}}),
+            ("list month + type", lambda: get_filtered_transactions(db, {"start_date": month_start, "end_date": latest, "type": "debit"}, user_id),
+             {"transactions": {"ix_transactions_user_type_date", "ix_transactions_user_date"}}),
+            ("list category", lambda: get_filtered_transactions(db, {"category_id": category_id}, user_id),
+             {"transactions": {"ix_transactions_user_category"}}),
+            ("rollup refresh day", lambda: spend_rollup_service.refresh_days(db, user_id, [latest]),
+             {**ROLLUP_LOOKUP, **COUNTER_LOOKUP, **AVERAGES_LOOKUP, "transactions": {"ix_transactions_user_date"}}),
+        ]
+        failures = 0
+        for name, fn, expected in cases:
+            for statement, parameters in _capture(fn):
+                plan = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()[0]["Plan"]
+                for node, relation, index in _scans(plan):
+                    ok = node in INDEX_SCANS and index in expected[relation]
+                    failures += not ok
+                    print(f"{'ok ' if ok else 'FAIL'} {name:<22}{relation:<24}{node:<18}{index}")
+        print("every checked scan uses an expected index" if not failures else f"{failures} scans not on an expected index")
+        sys.exit(1 if failures else 0)
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
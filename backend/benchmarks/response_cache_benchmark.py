@@ -0,0 +1,69 @@
+# File: benchmarks/response_cache_benchmark.py
+"""
+Cold (recomputed) vs warm (cached) latency of the dashboard, analytics and budget
+plan responses through `cached_response`, for the user with the most transactions
+in DATABASE_URL. A cold call is forced by bumping the user's data version, exactly
+as a write would (the budget plan commits, so the bumps persist; they are harmless).
+
+Run from the backend/ directory:
+    python -m benchmarks.response_cache_benchmark --repeat 30
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import func
+
+from app.db.session import SessionLocal
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.analytics_service import get_analytics_data
+from app.services.budget_plan_service import get_budget_plan
+from app.services.dashboard_service import get_dashboard_data
+from app.services.response_cache_service import bump_data_version, cached_response, response_cache
+
+
+def _ms(samples):
+    p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+    return statistics.median(samples) * 1000, p95 * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_id, count = db.query(Transaction.user_id, func.count()).group_by(Transaction.user_id).order_by(func.count().desc()).first()
+        month = db.query(func.max(Transaction.txn_date)).filter(Transaction.user_id == user_id).scalar().strftime("%Y-%m")
+        user = db.get(User, user_id)
+        print(f"user {user_id}: {count} transactions")
+        endpoints = [
+            ("dashboard", {"month": month}, lambda: get_dashboard_data(db, month=month, user_id=user_id)),
+            ("analytics", {"time_period": "6m", "include_capital_transfers": False}, lambda: get_analytics_data(db, "6m", False, user_id)),
+            ("budget_plan", {"month": month}, lambda: get_budget_plan(db, month=month, user_id=user_id)),
+        ]
+        print(f"{'endpoint':<13}{'cold p50 ms':>12}{'cold p95 ms':>12}{'warm p50 us':>12}{'warm p95 us':>12}")
+        for endpoint, params, build in endpoints:
+            cold, warm = [], []
+            for _ in range(args.repeat):
+                bump_data_version(db, user_id)
+                db.flush()
+                db.refresh(user)
+                started = time.perf_counter()
+                cached_response(user, endpoint, params, build)
+                cold.append(time.perf_counter() - started)
+                started = time.perf_counter()
+                cached_response(user, endpoint, params, build)
+                warm.append(time.perf_counter() - started)
+            cold_p50, cold_p95 = _ms(cold)
+            warm_p50, warm_p95 = _ms(warm)
+            print(f"{endpoint:<13}{cold_p50:>12.1f}{cold_p95:>12.1f}{warm_p50 * 1000:>12.1f}{warm_p95 * 1000:>12.1f}")
+        print(response_cache.stats())
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
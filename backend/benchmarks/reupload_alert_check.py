@@ -0,0 +1,71 @@
+# File: benchmarks/reupload_alert_check.py
+"""
+Checks that re-uploading rows already imported raises no new-category alerts, for a
+throwaway user in DATABASE_URL. A synthetic HDFC statement (with unknown /remark/
+categories) is imported in two overlapping parts, then again whole, its alerts
+dismissed before each import. Fails (exit 1) if the overlapping part alerts a remark
+found only on rows already imported, or if the full re-upload creates any alert at all.
+
+Everything runs in one transaction that is rolled back at the end.
+
+Run from the backend/ directory:
+    python -m benchmarks.reupload_alert_check --rows 3000
+"""
+import argparse
+import io
+import sys
+
+from app.db.session import SessionLocal
+from app.models.alert import Alert
+from app.services import upload_service
+from benchmarks.statement_generator import make_hdfc_csv
+from benchmarks.upload_benchmark import FILENAMES, create_bench_user
+
+
+def _new_category_alerts(db, user_id: int) -> dict:
+    alerts = db.query(Alert).filter(Alert.user_id == user_id, Alert.type == "new_category").all()
+    return {alert.id: alert.context["category_name"] for alert in alerts}
+
+def _import(db, user_id: int, rows: list) -> dict:
+    """Dismisses every alert, imports `rows` and returns the new-category alerts it created, by id."""
+    db.query(Alert).filter(Alert.user_id == user_id).update({"is_acknowledged": True})
+    before = _new_category_alerts(db, user_id)
+    upload_service.process_and_insert_transactions(db, [dict(row) for row in rows], user_id=user_id, commit=False)
+    db.flush()
+    return {alert_id: name for alert_id, name in _new_category_alerts(db, user_id).items() if alert_id not in before}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_id, account_map = create_bench_user(db)
+        parsed = upload_service.parse_statement_file(FILENAMES["hdfc"], io.BytesIO(make_hdfc_csv(args.rows)), account_map)
+        parsed.sort(key=lambda row: row["txn_date"])
+        first, overlap_start = parsed[:len(parsed) * 2 // 3], len(parsed) // 3
+
+        alerted = _import(db, user_id, first)
+        _, unmatched = upload_service.categorize_transactions(db, parsed[len(first):], user_id)
+        in_new_rows = set(unmatched.values())
+        realerted = _import(db, user_id, parsed[overlap_start:])
+        repeated = _import(db, user_id, parsed)
+
+        stray = {name for name in realerted.values() if name not in in_new_rows}
+        print(f"first part: {len(alerted)} alerts; overlapping upload: {len(realerted)} "
+              f"({len(stray)} for already imported rows); full re-upload: {len(repeated)}")
+        if not alerted:
+            print("FAIL: the statement raised no new-category alerts to begin with")
+            sys.exit(1)
+        if stray or repeated:
+            print(f"FAIL: re-uploaded rows raised alerts again: {sorted(stray | set(repeated.values()))}")
+            sys.exit(1)
+        print("OK: only newly inserted rows raise new-category alerts")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# File: benchmarks/statement_generator.py
+"""
+Reproducible synthetic HDFC, ICICI and Paytm statement CSVs in the layouts the
+upload parsers expect. Descriptions mix merchant keywords from
+MERCHANT_CATEGORY_RULES, transfers to people in TRANSFER_KEYWORDS, user remarks
+in the /category/ form (known names, aliases, typos and unknown ones), salary
+credits and unrecognised merchants. Dates are ascending with several rows per
+day, and amounts follow a long-tailed distribution.
+
+Write files from the backend/ directory:
+    python -m benchmarks.statement_generator --rows 100000 --out /tmp/statements
+"""
+import argparse
+import os
+import random
+from datetime import date, datetime, timedelta
+
+from app.services import upload_service
+
+MERCHANT_KEYWORDS = sorted(upload_service.MERCHANT_CATEGORY_RULES)
+TRANSFER_NAMES = sorted(upload_service.TRANSFER_KEYWORDS)
+# Remarks users type between slashes: category names, aliases, typos and new categories.
+REMARKS = ["food", "groceries", "travel", "shopping", "bills", "rent", "misc", "ent", "transport",
+           "fod", "grocery", "shoping", "gym", "pets", "gifts", "medical"]
+UNKNOWN_MERCHANTS = ["sri lakshmi stores", "ganesh tiffin", "corner bakery", "city parking", "fresh juice point"]
+# Share of rows of each kind; the rest are payments to an unknown merchant.
+ROW_KINDS = [("merchant", 0.50), ("remark", 0.15), ("transfer", 0.15), ("salary", 0.02), ("atm", 0.05)]
+MAX_SPAN_DAYS = 3 * 365
+
+
+class _Rows:
+    """Draws the shared content of one synthetic row at a time."""
+
+    def __init__(self, rows: int, seed: int, start: date = date(2023, 1, 1)):
+        self.rng = random.Random(seed)
+        self.rows = rows
+        self.start = start
+        self.span_days = max(1, min(MAX_SPAN_DAYS, rows // 5))
+
+    def day(self, i: int) -> date:
+        return self.start + timedelta(days=i * self.span_days // self.rows)
+
+    def amount(self) -> float:
+        return round(min(200000.0, max(1.0, self.rng.lognormvariate(5.5, 1.2))), 2)
+
+    def ref(self) -> int:
+        return self.rng.randrange(10**11, 10**12)
+
+    def kind(self) -> str:
+        roll = self.rng.random()
+        for kind, share in ROW_KINDS:
+            if roll < share:
+                return kind
+            roll -= share
+        return "unknown"
+
+    def counterparty(self, kind: str) -> str:
+        if kind in ("merchant", "remark"):
+            return self.rng.choice(MERCHANT_KEYWORDS)
+        if kind == "transfer":
+            return self.rng.choice(TRANSFER_NAMES)
+        return self.rng.choice(UNKNOWN_MERCHANTS)
+
+
+def _bank_narration(rows: _Rows, i: int):
+    """Returns (narration, is_credit) for an HDFC/ICICI style row."""
+    kind = rows.kind()
+    if kind == "salary":
+        return f"NEFT CR-CITI0000001-ACME SOFTWARE PVT LTD-SALARY {rows.day(i):%b %Y}".upper(), True
+    if kind == "atm":
+        return f"ATW-{rows.rng.randrange(10**5, 10**6)}-NWD-BANGALORE", False
+    counterparty = rows.counterparty(kind)
+    handle = counterparty.replace(" ", "").lower()[:12]
+    narration = f"UPI-{counterparty.upper()}-{handle}@ybl-HDFC0000{rows.rng.randrange(100, 999)}-{rows.ref()}-UPI"
+    if kind == "remark":
+        narration += f"-/{rows.rng.choice(REMARKS)}/"
+    return narration, kind == "transfer" and rows.rng.random() < 0.4
+
+
+def make_hdfc_csv(rows: int, seed: int = 7) -> bytes:
+    gen, balance = _Rows(rows, seed), 50000.0
+    lines = ["Date,Narration,Chq./Ref.No.,Value Dt,Withdrawal Amt.,Deposit Amt.,Closing Balance"]
+    for i in range(rows):
+        d = f"{gen.day(i):%d/%m/%y}"
+        narration, is_credit = _bank_narration(gen, i)
+        amount = gen.amount() * (20 if "SALARY" in narration else 1)
+        balance += amount if is_credit else -amount
+        debit, credit = ("", amount) if is_credit else (amount, "")
+        lines.append(f"{d},{narration},{gen.ref():016d},{d},{debit},{credit},{balance:.2f}")
+    return "\n".join(lines).encode()
+
+def make_icici_csv(rows: int, seed: int = 11) -> bytes:
+    gen, balance = _Rows(rows, seed), 50000.0
+    lines = ["S No.,Value Date,Transaction Date,Cheque Number,Transaction Remarks,Withdrawal Amount (INR ),Deposit Amount (INR ),Balance (INR )"]
+    for i in range(rows):
+        d = f"{gen.day(i):%d/%m/%Y}"
+        narration, is_credit = _bank_narration(gen, i)
+        amount = gen.amount() * (20 if "SALARY" in narration else 1)
+        balance += amount if is_credit else -amount
+        debit, credit = (0, amount) if is_credit else (amount, 0)
+        lines.append(f"{i + 1},{d},{d},-,{narration},{debit},{credit},{balance:.2f}")
+    return "\n".join(lines).encode()
+
+def make_paytm_csv(rows: int, seed: int = 13) -> bytes:
+    gen = _Rows(rows, seed)
+    lines = ["Date,Time,Transaction Details,Other Transaction Details (UPI ID or A/c No),Your Account,Amount,UPI Ref No.,Order ID,Remarks,Tags,Comment"]
+    seconds_per_row = gen.span_days * 86400 // rows
+    start = datetime.combine(gen.start, datetime.min.time())
+    for i in range(rows):
+        ts = start + timedelta(seconds=i * seconds_per_row + gen.rng.randrange(max(1, seconds_per_row)))
+        kind = gen.kind()
+        counterparty = gen.counterparty(kind).title()
+        if kind == "transfer" and gen.rng.random() < 0.4:
+            details, amount = f"Received from {counterparty}", gen.amount()
+        else:
+            details, amount = f"Paid to {counterparty}", -gen.amount()
+        if kind == "remark":
+            details += f" /{gen.rng.choice(REMARKS)}/"
+        account = gen.rng.choice(["HDFC Bank - 1234", "ICICI Bank - 5678"])
+        remark = "This is not included in total paid/received calculations" if gen.rng.random() < 0.02 else ""
+        lines.append(f"{ts:%d/%m/%Y},{ts:%H:%M:%S},{details},{counterparty.replace(' ', '').lower()}@ybl,{account},{amount},{gen.ref()},,{remark},,")
+    return "\n".join(lines).encode()
+
+GENERATORS = {"hdfc": make_hdfc_csv, "icici": make_icici_csv, "paytm": make_paytm_csv}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--layouts", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--seed", type=int, default=None, help="Defaults to each layout's fixed seed.")
+    parser.add_argument("--out", default=".")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for layout in args.layouts:
+        kwargs = {} if args.seed is None else {"seed": args.seed}
+        path = os.path.join(args.out, f"{layout}_{args.rows}.csv")
+        with open(path, "wb") as f:
+            f.write(GENERATORS[layout](args.rows, **kwargs))
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
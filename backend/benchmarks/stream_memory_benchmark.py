@@ -0,0 +1,132 @@
+# File: benchmarks/stream_memory_benchmark.py
+"""
+Peak memory of an upload job streaming a statement, along the real path: the statement
+is written to disk, opened and handed to `create_upload_job` as the router does (which
+stages it in UPLOAD_STAGING_DIR block by block), then `run_upload_job` streams it from
+there into DATABASE_URL. Each file is uploaded by a fresh process, and the peak is how far
+its resident memory rose above what it used before the upload, so anything that buffers
+the whole file shows up in it, C allocations (pandas, psycopg2) included. Linux only: the
+peak is read from /proc/self/status.
+
+The peak must stay under a ceiling set by the chunk size alone,
+    --base-mib + --chunk-rows * --kib-per-row / 1024  (MiB),
+for every --rows; the script exits 1 if it doesn't. Holding a whole file adds at least
+its size to the peak, so a run proves nothing for a file that would still fit under the
+ceiling (flagged in the output); use enough --rows for the files to exceed that headroom.
+
+Runs as a throwaway user whose rows are deleted at the end.
+
+Run from the backend/ directory:
+    python -m benchmarks.stream_memory_benchmark --rows 50000 200000 --chunk-rows 5000
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from app.db.session import SessionLocal
+from app.models.upload_job import UploadJob
+from app.services import upload_job_service, upload_service
+from benchmarks.parse_benchmark import make_hdfc_csv
+from benchmarks.upload_benchmark import create_bench_user
+
+# Children first: the rest of the user's rows go with the user (ON DELETE CASCADE).
+DELETE_USER = [
+    "DELETE FROM transactions WHERE user_id = :user_id",
+    "DELETE FROM daily_spend WHERE user_id = :user_id",
+    "DELETE FROM monthly_spend WHERE user_id = :user_id",
+    "DELETE FROM category_spend_averages WHERE user_id = :user_id",
+    "DELETE FROM goals WHERE user_id = :user_id",
+    "DELETE FROM merchants WHERE user_id = :user_id",
+    "DELETE FROM categories WHERE user_id = :user_id",
+    "DELETE FROM accounts WHERE user_id = :user_id",
+    "DELETE FROM tags WHERE user_id = :user_id",
+    "DELETE FROM users WHERE id = :user_id",
+]
+
+
+def _upload(path: str, user_id: int) -> UploadJob:
+    db = SessionLocal()
+    try:
+        with open(path, "rb") as statement:
+            job = upload_job_service.create_upload_job(db, user_id=user_id, files=[("hdfc.csv", statement)])
+        upload_job_service.run_upload_job(job.id)
+        db.refresh(job)
+        return job
+    finally:
+        db.close()
+
+def _memory_status(field: str) -> int:
+    """A VmRSS/VmHWM line of /proc/self/status, in bytes."""
+    with open("/proc/self/status") as status:
+        line = next(line for line in status if line.startswith(field + ":"))
+    return int(line.split()[1]) * 1024
+
+def _measure(path: str, user_id: int, staging_dir: str, chunk_rows: int, results):
+    """Runs in its own process, so its peak RSS belongs to this upload alone."""
+    # Every file is streamed, whatever its size, in chunks of chunk_rows.
+    upload_service.STREAM_THRESHOLD_BYTES, upload_service.CHUNK_ROWS = 0, chunk_rows
+    upload_job_service.UPLOAD_STAGING_DIR = staging_dir
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")  # resets the peak (VmHWM) to the current RSS
+    before = _memory_status("VmRSS")
+    started = time.perf_counter()
+    job = _upload(path, user_id)
+    results.put((job.status, job.error, job.total_rows, _memory_status("VmHWM") - before, time.perf_counter() - started))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[50000, 200000])
+    parser.add_argument("--chunk-rows", type=int, default=upload_service.CHUNK_ROWS)
+    parser.add_argument("--base-mib", type=float, default=32, help="fixed part of the ceiling")
+    parser.add_argument("--kib-per-row", type=float, default=4, help="part of the ceiling per chunk row")
+    args = parser.parse_args()
+
+    ceiling = (args.base_mib + args.chunk_rows * args.kib_per_row / 1024) * 2**20
+    staging = tempfile.TemporaryDirectory()
+    staging_dir = os.path.join(staging.name, "staged")
+    spawn = multiprocessing.get_context("spawn")
+    results = spawn.Queue()
+
+    db = SessionLocal()
+    user_id, _ = create_bench_user(db)
+    db.commit()
+    print(f"chunk rows {args.chunk_rows}, ceiling {ceiling / 2**20:.1f} MiB")
+    print(f"{'rows':>8}{'file MiB':>10}{'peak MiB':>10}{'seconds':>9}")
+    over = []
+    try:
+        for rows in sorted(args.rows):
+            path = os.path.join(staging.name, f"hdfc_{rows}.csv")
+            with open(path, "wb") as f:
+                f.write(make_hdfc_csv(rows, seed=rows))
+            worker = spawn.Process(target=_measure, args=(path, user_id, staging_dir, args.chunk_rows, results))
+            worker.start()
+            status, error, total_rows, peak, elapsed = results.get()
+            worker.join()
+            assert status == "completed" and total_rows == rows, (status, error, total_rows, rows)
+            assert not os.listdir(staging_dir), "the staged file was not removed"
+            size = os.path.getsize(path)
+            print(f"{rows:>8}{size / 2**20:>10.1f}{peak / 2**20:>10.1f}{elapsed:>9.1f}"
+                  f"{'  (file fits in the headroom: buffering it would go unseen)' if peak + size <= ceiling else ''}")
+            if peak > ceiling:
+                over.append(rows)
+    finally:
+        db.rollback()
+        for statement in DELETE_USER:
+            db.execute(text(statement), {"user_id": user_id})
+        db.commit()
+        db.close()
+        staging.cleanup()
+
+    if over:
+        print(f"FAIL: peak memory exceeded the ceiling for {over} rows")
+        sys.exit(1)
+    print("OK: peak memory is bounded by the chunk size")
+
+
+if __name__ == "__main__":
+    main()
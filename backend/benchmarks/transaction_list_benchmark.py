@@ -0,0 +1,92 @@
+# File: benchmarks/transaction_list_benchmark.py
+"""
+Table sizes and latency of the transaction read paths (paginated list, dashboard
+recent transactions, single-transaction details) for the user with the most
+transactions in DATABASE_URL. Optionally seeds synthetic statement rows first.
+
+Run from the backend/ directory:
+    python -m benchmarks.transaction_list_benchmark --seed-rows 100000
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import func, text
+
+from app.db.session import SessionLocal
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services import upload_service
+from app.services.transaction_service import get_filtered_transactions
+from benchmarks.parse_benchmark import HDFC_ARGS, make_hdfc_csv, _Upload
+
+TABLES = ["transactions", "transaction_raw_data"]
+
+
+def seed(db, rows: int):
+    user = User(username="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    account = Account(name="HDFC Bank", type="bank", provider="HDFC", user_id=user.id)
+    db.add(account)
+    db.commit()
+    parsed = upload_service.parse_generic_statement(_Upload(make_hdfc_csv(rows)), account.id, **HDFC_ARGS)
+    upload_service.process_and_insert_transactions(db, parsed, user_id=user.id)
+
+def _timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed-rows", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.seed_rows:
+            seed(db, args.seed_rows)
+        db.execute(text("ANALYZE"))
+        for table in TABLES:
+            size = db.execute(text("SELECT pg_total_relation_size(to_regclass(:t))"), {"t": table}).scalar()
+            if size is not None:
+                print(f"{table:<22}{size / 2**20:>10.1f} MiB")
+
+        user_id, count = db.query(Transaction.user_id, func.count()).group_by(Transaction.user_id).order_by(func.count().desc()).first()
+        print(f"user {user_id}: {count} transactions")
+        some_id = db.query(Transaction.id).filter(Transaction.user_id == user_id).order_by(Transaction.id.desc()).first()[0]
+
+        def list_page(limit):
+            db.expunge_all()
+            [t.tags for t in get_filtered_transactions(db, {"page": 3, "limit": limit}, user_id)["transactions"]]
+
+        def recent():
+            db.expunge_all()
+            db.query(Transaction).filter(Transaction.user_id == user_id).order_by(Transaction.txn_date.desc()).limit(5).all()
+
+        def details():
+            db.expunge_all()
+            db.query(Transaction).filter(Transaction.id == some_id).first().raw_data
+
+        def full_scan():
+            db.expunge_all()
+            db.query(Transaction).filter(Transaction.user_id == user_id).all()
+
+        for label, fn, repeat in [("list page (limit 10)", lambda: list_page(10), args.repeat),
+                                  ("list page (limit 100)", lambda: list_page(100), args.repeat),
+                                  ("recent transactions", recent, args.repeat),
+                                  ("single txn + raw_data", details, args.repeat),
+                                  ("load all user rows", full_scan, 3)]:
+            print(f"{label:<24}{_timed(fn, repeat):>9.2f} ms (median)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# File: benchmarks/upload_benchmark.py
+"""
+Upload throughput per stage (parse, categorize, insert) for synthetic HDFC, ICICI
+and Paytm statements of growing size, against the database in DATABASE_URL.
+Reports rows/s and peak traced memory (tracemalloc) for each stage.
+
+Everything runs inside one transaction for a throwaway user that is rolled back
+at the end, so the database is left as it was (only the id sequences advance).
+Timings come from an untraced run; peaks from a second, traced run of the same
+stage (skip it with --no-memory). Both insert runs are rolled back to a savepoint.
+
+Run from the backend/ directory:
+    python -m benchmarks.upload_benchmark --rows 1000 10000 100000
+"""
+import argparse
+import io
+import time
+import tracemalloc
+import uuid
+
+from app.db.session import SessionLocal
+from app.models.account import Account
+from app.models.category import Category
+from app.models.merchant import Merchant
+from app.models.user import User
+from app.services import categorization_service, upload_service
+from benchmarks.statement_generator import GENERATORS
+
+FILENAMES = {"hdfc": "hdfc_statement.csv", "icici": "icici_statement.csv", "paytm": "paytm_statement.csv"}
+EXTRA_CATEGORIES = ["Transfers", "Miscellaneous", "Entertainment", "Transportation"]
+
+
+def create_bench_user(db) -> tuple:
+    """A user with the accounts, categories and merchants a real import would resolve against."""
+    tag = uuid.uuid4().hex[:8]
+    user = User(username=f"upload-bench-{tag}", email=f"upload-bench-{tag}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    accounts = [Account(name=name, type="bank", provider=name.split()[0], user_id=user.id) for name in ("HDFC Bank", "ICICI Bank")]
+    names = {category for _, category in upload_service.MERCHANT_CATEGORY_RULES.values()} | set(EXTRA_CATEGORIES)
+    db.add_all(accounts + [Category(name=name, user_id=user.id) for name in sorted(names)])
+    db.add_all([Merchant(name=name, user_id=user.id) for name in sorted({m for m, _ in upload_service.MERCHANT_CATEGORY_RULES.values()})])
+    db.flush()
+    return user.id, {account.name: account.id for account in accounts}
+
+def _run(fn, trace: bool):
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if trace else None
+    if trace:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+def _measure(fn, memory: bool, before=None):
+    """Returns (result, seconds, peak bytes or None). `before` runs ahead of each pass, untimed."""
+    if before: before()
+    result, elapsed, _ = _run(fn, trace=False)
+    peak = None
+    if memory:
+        if before: before()
+        _, _, peak = _run(fn, trace=True)
+    return result, elapsed, peak
+
+def _inserted_in_savepoint(db, rows):
+    savepoint = db.begin_nested()
+    try:
+        return len(upload_service.insert_transactions(db, rows))
+    finally:
+        savepoint.rollback()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--layouts", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced runs used for peak memory.")
+    args = parser.parse_args()
+    memory = not args.no_memory
+
+    db = SessionLocal()
+    try:
+        user_id, account_map = create_bench_user(db)
+        print(f"{'layout':<8}{'rows':>9}  {'stage':<12}{'seconds':>9}{'rows/s':>12}{'peak MiB':>10}")
+        for layout in args.layouts:
+            for rows in sorted(args.rows):
+                data = GENERATORS[layout](rows)
+                parsed, parse_s, parse_peak = _measure(
+                    lambda: upload_service.parse_statement_file(FILENAMES[layout], io.BytesIO(data), account_map), memory)
+                # Each pass starts from a cold matcher, as the first upload after a restart would.
+                (categorized, _), categorize_s, categorize_peak = _measure(
+                    lambda: upload_service.categorize_transactions(db, parsed, user_id), memory,
+                    before=lambda: categorization_service.invalidate_category_matcher(user_id))
+                inserted, insert_s, insert_peak = _measure(lambda: _inserted_in_savepoint(db, categorized), memory)
+
+                for stage, seconds, peak in [("parse", parse_s, parse_peak), ("categorize", categorize_s, categorize_peak), ("insert", insert_s, insert_peak)]:
+                    peak_mib = f"{peak / 2**20:>10.1f}" if peak is not None else f"{'-':>10}"
+                    print(f"{layout:<8}{rows:>9}  {stage:<12}{seconds:>9.2f}{len(parsed) / seconds:>12,.0f}{peak_mib}")
+                print(f"{layout:<8}{rows:>9}  {'total':<12}{parse_s + categorize_s + insert_s:>9.2f}"
+                      f"{len(parsed) / (parse_s + categorize_s + insert_s):>12,.0f}{'':>10}  ({len(parsed)} parsed, {inserted} inserted)")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,28 @@
 // File: src/Settings/components/DataSyncCard.tsx
 import React, { useState, useRef } from 'react';
 import { Upload } from 'lucide-react';
-import { uploadStatements } from '../../api/apiClient';
+import { uploadStatements, getUploadJob } from '../../api/apiClient';
+import type { UploadJob } from '../../types';
 import toast from 'react-hot-toast';
 
+const POLL_INTERVAL_MS = 1500;
+
+const waitForJob = async (job: UploadJob, onProgress: (job: UploadJob) => void): Promise<UploadJob> => {
+  while (job.status === 'queued' || job.status === 'processing') {
+    await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
+    job = await getUploadJob(job.id);
+    onProgress(job);
+  }
+  return job;
+};
+
+const summarize = (job: UploadJob): string => {
+  const problems = job.files.filter(f => f.status === 'skipped' || f.status === 'failed').map(f => `${f.filename}: ${f.error}`);
+  const alreadyImported = job.already_ingested_count ? ` ${job.already_ingested_count} rows were already imported and not processed again.` : '';
+  const summary = `Found ${job.total_rows} potential transactions, inserted ${job.inserted_count} new records and skipped ${job.skipped_count} duplicates.${alreadyImported}`;
+  return problems.length ? `${summary}\n${problems.join('\n')}` : summary;
+};
+
 const DataSyncCard: React.FC = () => {
   const [isUploading, setIsUploading] = useState(false);
   const fileInputRef = useRef<HTMLInputElement>(null);
@@ -16,8 +35,15 @@ const DataSyncCard: React.FC = () => {
     const uploadToast = toast.loading('Uploading files...');
 
     try {
-      const response = await uploadStatements(Array.from(files));
-      toast.success(response.message, { id: uploadToast });
+      const queued = await uploadStatements(Array.from(files));
+      const job = await waitForJob(queued, progress =>
+        toast.loading(`Processing files... (${progress.processed_files}/${progress.total_files})`, { id: uploadToast })
+      );
+      if (job.status === 'failed') {
+        toast.error(job.error || summarize(job), { id: uploadToast });
+      } else {
+        toast.success(summarize(job), { id: uploadToast });
+      }
     } catch (error: any) {
       const errorMessage = error.response?.data?.detail || "An error occurred during upload.";
       toast.error(errorMessage, { id: uploadToast });
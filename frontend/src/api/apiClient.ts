@@ -2,7 +2,7 @@
 
 import axios from 'axios';
 import toast from 'react-hot-toast'; // Import toast for the interceptor
-import type { DashboardData, BudgetPageData, Category, Transaction, Tag, Account, AnalyticsData, User, Alert } from '../types';
+import type { DashboardData, BudgetPageData, Category, Transaction, Tag, Account, AnalyticsData, User, Alert, UploadJob } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api/v1';
 
@@ -114,13 +114,17 @@ export const deleteMyAccount = (data: { password: string }): Promise<any> => {
 };
 
 // 5. File Upload
-export const uploadStatements = (files: File[]): Promise<any> => {
+// Uploads are processed in the background; poll getUploadJob with the returned job id.
+export const uploadStatements = (files: File[]): Promise<UploadJob> => {
   const formData = new FormData();
   files.forEach(file => formData.append('files', file));
-  return apiClient.post('/settings/upload-statements', formData, {
+  return apiClient.post<UploadJob>('/settings/upload-statements', formData, {
     headers: { 'Content-Type': 'multipart/form-data' },
   }).then(res => res.data);
 };
+export const getUploadJob = (jobId: number): Promise<UploadJob> => {
+  return apiClient.get<UploadJob>(`/settings/upload-jobs/${jobId}`).then(res => res.data);
+};
 
 // 6. Analytics
 //! THIS IS THE FIX: The function now accepts the second argument and passes it as a parameter.
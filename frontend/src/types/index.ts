@@ -195,4 +195,29 @@ export interface Alert {
       name: string;
     }
   } | null;
-}
\ No newline at end of file
+}
+// --- Statement Upload Jobs ---
+export interface UploadJobFile {
+  id: number;
+  filename: string;
+  status: 'queued' | 'processing' | 'completed' | 'skipped' | 'failed';
+  row_count: number;
+  inserted_count: number;
+  skipped_count: number;
+  already_ingested_count: number;
+  duplicate_of_id: number | null;
+  error: string | null;
+}
+
+export interface UploadJob {
+  id: number;
+  status: 'queued' | 'processing' | 'completed' | 'failed';
+  error: string | null;
+  total_files: number;
+  processed_files: number;
+  total_rows: number;
+  inserted_count: number;
+  skipped_count: number;
+  already_ingested_count: number;
+  files: UploadJobFile[];
+}